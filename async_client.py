@@ -0,0 +1,122 @@
+"""
+asyncio client for concurrent fan-out against the Acceler8 API
+Mirrors the sync ApiClient surface with bounded concurrency and shared org auth
+"""
+import asyncio
+import contextlib
+
+from config import API_HOST, org_headers, refresh_rejected_headers
+from client import DEFAULT_TIMEOUT
+
+try:
+    import httpx
+except ImportError:  # Optional: only load and seeding tools need the async client
+    httpx = None
+
+DEFAULT_CONCURRENCY = 32  # In-flight requests per client
+
+
+def _is_stream(value) -> bool:
+    """True for file objects and iterators, which the first send has already consumed"""
+    return any(hasattr(value, attr) for attr in ("read", "__next__", "__anext__"))
+
+
+def _replayable(kwargs: dict) -> bool:
+    """Whether the request body can be sent a second time (see config.refresh_on_401)"""
+    files = kwargs.get("files") or {}
+    for value in (files.values() if isinstance(files, dict) else (v for _, v in files)):
+        if _is_stream(value[1] if isinstance(value, tuple) else value):
+            return False
+    return not any(_is_stream(kwargs.get(key)) for key in ("content", "data"))
+
+
+class AsyncApiClient:
+    """
+    httpx-based async client with the same get/post/put/delete surface as ApiClient
+    Requests without explicit headers use config.org_headers(org_id); a 401 on
+    an org token refreshes it once and replays the request, unless the body was
+    a file or stream the first attempt already consumed.
+    The underlying connection pool is bound to the running event loop and is
+    recreated if the client is reused from a new loop (e.g. repeated asyncio.run);
+    the previous loop's pool is closed when that happens.
+    """
+
+    def __init__(self, base_url: str = API_HOST, *, org_id: str | None = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                 http2: bool = False):
+        if httpx is None:
+            raise RuntimeError("AsyncApiClient needs httpx (pip install httpx, plus h2 for http2=True)")
+        self.base_url = base_url.rstrip("/")
+        self.org_id = org_id
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.http2 = http2
+        self._loop = None
+        self._client = None
+        self._slots = None
+
+    def url(self, path: str) -> str:
+        """Join a relative path onto base_url"""
+        if "://" in path:
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._client is not None:
+                with contextlib.suppress(RuntimeError):  # Sockets of a loop that is already closed
+                    await self._client.aclose()
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def request(self, method: str, url: str, *, headers=None, **kwargs):
+        client = await self._bind()
+        if headers is None:
+            headers = await asyncio.to_thread(org_headers, self.org_id)
+        headers = dict(headers)
+        if "files" in kwargs:
+            headers.pop("Content-Type", None)  # httpx sets the multipart boundary
+        async with self._slots:
+            r = await client.request(method, self.url(url), headers=headers, **kwargs)
+            if r.status_code == 401 and "Authorization" in headers and _replayable(kwargs):
+                fresh = await asyncio.to_thread(refresh_rejected_headers, headers["Authorization"])
+                if fresh is not None:
+                    headers["Authorization"] = fresh["Authorization"]
+                    r = await client.request(method, self.url(url), headers=headers, **kwargs)
+        return r
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self):
+        """Close the connection pool, whichever event loop it was opened on"""
+        if self._client is not None:
+            with contextlib.suppress(RuntimeError):
+                await self._client.aclose()
+        self._loop = self._client = self._slots = None
+
+    async def __aenter__(self):
+        await self._bind()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,139 @@
+"""
+Chunked, concurrent writer for the question bulk endpoints
+Splits a stream of question changes into size-tuned chunks for
+/assessment/{id}/question/bulk or /question/bulk and merges the results in order
+"""
+import asyncio
+import json
+import time
+
+from sdk import AsyncAcceler8
+
+CREATE = "questions_to_create"
+UPDATE = "questions_to_update"
+DELETE = "question_ids_to_delete"
+
+CHUNK_SIZE = 200  # Starting number of changes per request
+MIN_CHUNK, MAX_CHUNK = 20, 2000
+MAX_CHUNK_BYTES = 1_000_000  # Request bodies are cut before they grow past this
+TARGET_LATENCY = 1.0  # Seconds per chunk the size tuner steers towards
+CONCURRENCY = 4  # Chunks in flight
+
+
+def create(body: dict):
+    return CREATE, body
+
+
+def update(body: dict):
+    return UPDATE, body
+
+
+def delete(question_id):
+    return DELETE, question_id
+
+
+def _question_id(op, payload):
+    return payload if op == DELETE else payload.get("id")
+
+
+class BulkStats:
+    """Chunk count, change count and wall time of one bulk write"""
+
+    def __init__(self):
+        self.chunks = 0
+        self.changes = 0
+        self.seconds = 0.0
+
+    @property
+    def changes_per_sec(self) -> float:
+        return self.changes / self.seconds if self.seconds else 0.0
+
+
+async def write_questions(changes, *, assessment_id=None, sdk=None, chunk_size: int = CHUNK_SIZE,
+                          concurrency: int = CONCURRENCY, stats: BulkStats | None = None):
+    """
+    Apply a stream of (op, payload) question changes through the bulk endpoint
+    Chunks are sent `concurrency` at a time; the input is only read as fast as
+    chunks are accepted. Chunk size adapts so each request takes about TARGET_LATENCY.
+    A change to a question id that is still in flight waits for those chunks first,
+    so repeated changes to one question apply in stream order.
+    Returns the questions the API returned, in chunk order.
+    """
+    own_sdk = sdk is None
+    sdk = sdk or AsyncAcceler8()
+    stats = stats if stats is not None else BulkStats()
+    slots = asyncio.Semaphore(concurrency)
+    results = {}
+    tasks = {}  # chunk task -> question ids it touches
+    size = chunk_size
+    started = time.perf_counter()
+
+    async def send(index, body, count):
+        nonlocal size
+        try:
+            t0 = time.perf_counter()
+            questions = await sdk.questions.bulk(
+                assessment_id,
+                create=body[CREATE], update=body[UPDATE], delete=body[DELETE],
+            )
+            latency = time.perf_counter() - t0
+            results[index] = questions or []
+            stats.chunks += 1
+            stats.changes += count
+            # Steer towards TARGET_LATENCY, moving at most 2x per chunk
+            factor = min(2.0, max(0.5, TARGET_LATENCY / latency)) if latency else 2.0
+            size = int(min(MAX_CHUNK, max(MIN_CHUNK, size * factor)))
+        finally:
+            slots.release()
+
+    async def drain():
+        await asyncio.gather(*tasks)
+
+    async def dispatch(index, body, count, ids):
+        await slots.acquire()
+        # Surface failures from chunks that already finished
+        for task in tasks:
+            if task.done():
+                task.result()
+        tasks[asyncio.ensure_future(send(index, body, count))] = ids
+
+    def empty():
+        return {CREATE: [], UPDATE: [], DELETE: []}
+
+    body, count, nbytes, ids = empty(), 0, 0, set()
+    index = 0
+    try:
+        for op, payload in changes:
+            qid = _question_id(op, payload)
+            if qid is not None and any(qid in touched for t, touched in tasks.items() if not t.done()):
+                await drain()
+            body[op].append(payload)
+            count += 1
+            nbytes += len(json.dumps(payload, default=str))
+            if qid is not None:
+                ids.add(qid)
+            if count >= size or nbytes >= MAX_CHUNK_BYTES:
+                await dispatch(index, body, count, ids)
+                index += 1
+                body, count, nbytes, ids = empty(), 0, 0, set()
+        if count:
+            await dispatch(index, body, count, ids)
+        await drain()
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        stats.seconds = time.perf_counter() - started
+        if own_sdk:
+            await sdk.client.aclose()
+
+    merged = []
+    for i in sorted(results):
+        merged.extend(results[i])
+    return merged
+
+
+def bulk_write(changes, **kwargs):
+    """Synchronous entry point for write_questions"""
+    return asyncio.run(write_questions(changes, **kwargs))
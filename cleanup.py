@@ -0,0 +1,218 @@
+"""
+Dependency-aware teardown for resources created during a test run
+Resources are registered with their parent (employee -> assessment -> organisation);
+at the end of the run they are deleted concurrently, one level at a time, children first.
+Children whose parent delete already cascades over them are skipped.
+Every registration and successful delete is also written to the run journal.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from client import api
+from journal import journal as run_journal
+from rate_limit import TokenBucket
+
+ORGANISATION = "organisation"
+ASSESSMENT = "assessment"
+EMPLOYEE = "employee"
+ACTION_ITEM = "action_item"
+PREPARE_CONTENT = "prepare_content"
+QUESTION = "question"
+MAIL_ACCOUNT = "mail_account"
+
+# Delete endpoint per kind; {parent} is the parent's id
+DELETE_PATHS = {
+    ORGANISATION: "/backend/v1/organisation/{id}",
+    ASSESSMENT: "/backend/v1/assessment/{id}",
+    EMPLOYEE: "/backend/v1/employee/{id}",
+    ACTION_ITEM: "/backend/v1/assessment/{parent}/action-item/{id}",
+    PREPARE_CONTENT: "/backend/v1/assessment/{parent}/prepare-content/{id}",
+    QUESTION: "/backend/v1/assessment/{parent}/question/{id}",
+}
+
+# Lowest level each kind is deleted at, so unrelated kinds still go leaves first
+KIND_LEVELS = {
+    EMPLOYEE: 0, ACTION_ITEM: 0, PREPARE_CONTENT: 0, QUESTION: 0, MAIL_ACCOUNT: 0,
+    ASSESSMENT: 1,
+    ORGANISATION: 2,
+}
+
+# (parent kind, child kind) pairs the backend deletes together with the parent
+CASCADES = {
+    (ASSESSMENT, EMPLOYEE),
+    (ASSESSMENT, ACTION_ITEM),
+    (ASSESSMENT, PREPARE_CONTENT),
+    (ASSESSMENT, QUESTION),
+}
+
+GONE = (200, 202, 204, 404)  # Statuses that mean the resource no longer exists
+CONCURRENCY = 16  # Deletes in flight per level
+CURRENT_ORG = object()  # Default for add(org=...): the organisation ORG_HEADERS points at
+
+
+class Node:
+    """One resource; unregistered nodes only stand in for parents created elsewhere"""
+
+    __slots__ = ("kind", "id", "parent", "children", "delete", "org", "registered")
+
+    def __init__(self, kind: str, resource_id, parent=None):
+        self.kind = kind
+        self.id = resource_id
+        self.parent = parent
+        self.children = []
+        self.delete = None
+        self.org = None
+        self.registered = False
+
+    @property
+    def key(self) -> tuple:
+        return self.kind, self.id
+
+    @property
+    def cascaded(self) -> bool:
+        """True when deleting the registered parent also deletes this resource"""
+        return (self.parent is not None and self.parent.registered
+                and (self.parent.kind, self.kind) in CASCADES)
+
+    def __repr__(self):
+        return f"{self.kind} {self.id}"
+
+
+class CleanupReport:
+    """Outcome of one teardown run"""
+
+    def __init__(self):
+        self.deleted = []
+        self.skipped = []
+        self.gone = []  # Deleted nodes plus skipped nodes whose cascading parent was deleted
+        self.failures = []  # (node, status code or exception)
+        self.seconds = 0.0
+
+    def __str__(self):
+        text = (f"Cleanup: {len(self.deleted)} deleted, {len(self.skipped)} cascaded, "
+                f"{len(self.failures)} failed in {self.seconds:.2f}s")
+        for node, error in self.failures:
+            text += f"\n  {node}: {error}"
+        return text
+
+
+class CleanupGraph:
+    """
+    Registry of created resources, deleted together by run()
+    The organisation is captured when a resource is added, so later org switches
+    do not change which tenant a delete goes to. rate caps deletes per second.
+    """
+
+    def __init__(self, client=api, concurrency: int = CONCURRENCY, *, rate: float | None = None,
+                 journal=run_journal):
+        self.client = client
+        self.concurrency = concurrency
+        self.journal = journal
+        self._bucket = TokenBucket(rate) if rate else None
+        self._nodes = {}
+        self._lock = threading.Lock()
+        self.last_report = None
+
+    def add(self, kind: str, resource_id, *, parent: tuple | None = None, org=CURRENT_ORG, delete=None,
+            **details):
+        """
+        Register a created resource and return resource_id
+        parent is a (kind, id) pair; org is the organisation it was created in, None for
+        account-level HEADERS; delete is a callable taking the id, for resources outside
+        the Acceler8 API. details are journaled so the sweeper can delete it after a crash.
+        """
+        org = config.ORG_ID if org is CURRENT_ORG else org
+        if self.journal is not None:
+            self.journal.created(kind, resource_id, parent=parent, org=org, **details)
+        with self._lock:
+            node = self._node(kind, resource_id)
+            if parent and node.parent is None:
+                node.parent = self._node(*parent)
+                node.parent.children.append(node)
+            node.delete = delete
+            node.org = org
+            node.registered = True
+        return resource_id
+
+    def _node(self, kind, resource_id) -> Node:
+        key = (kind, resource_id)
+        if key not in self._nodes:
+            self._nodes[key] = Node(kind, resource_id)
+        return self._nodes[key]
+
+    def __len__(self):
+        return sum(node.registered for node in self._nodes.values())
+
+    def discard(self, kind: str, resource_id):
+        """Forget a resource a test already deleted itself"""
+        with self._lock:
+            node = self._nodes.get((kind, resource_id))
+            if node is not None:
+                node.registered = False
+
+    def levels(self) -> list[list[Node]]:
+        """Registered nodes grouped by delete order; every node sits above all of its children"""
+        heights = {}
+
+        def height(node):
+            if node.key not in heights:
+                below = [height(child) + 1 for child in node.children if child.registered]
+                heights[node.key] = max([KIND_LEVELS.get(node.kind, 0), *below])
+            return heights[node.key]
+
+        grouped = {}
+        for node in self._nodes.values():
+            if node.registered:
+                grouped.setdefault(height(node), []).append(node)
+        return [grouped[h] for h in sorted(grouped)]
+
+    def _delete(self, node: Node):
+        if self._bucket is not None:
+            self._bucket.acquire()
+        if node.delete is not None:
+            node.delete(node.id)
+            return None
+        parent = node.parent.id if node.parent is not None else None
+        path = DELETE_PATHS[node.kind].format(id=node.id, parent=parent)
+        headers = config.HEADERS if node.org is None else config.org_headers(node.org)
+        r = self.client.delete(path, headers=headers)
+        return None if r.status_code in GONE else r.status_code
+
+    def run(self) -> CleanupReport:
+        """Delete every registered resource and empty the graph"""
+        report = CleanupReport()
+        start = time.perf_counter()
+        with self._lock:
+            levels = self.levels()
+            self._nodes = {}
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            for level in levels:
+                todo = []
+                for node in level:
+                    (report.skipped if node.cascaded else todo).append(node)
+                futures = [(node, pool.submit(self._delete, node)) for node in todo]
+                for node, future in futures:
+                    try:
+                        error = future.result()
+                    except Exception as exc:
+                        error = exc
+                    if error is None:
+                        report.deleted.append(node)
+                    else:
+                        report.failures.append((node, error))
+        deleted = {node.key for node in report.deleted}
+        for node in report.skipped:
+            top = node
+            while top.cascaded:
+                top = top.parent
+            if top.key in deleted:
+                report.gone.append(node)
+        report.gone.extend(report.deleted)
+        if self.journal is not None:
+            for node in report.gone:
+                self.journal.deleted(node.kind, node.id)
+        report.seconds = time.perf_counter() - start
+        self.last_report = report
+        return report
@@ -0,0 +1,128 @@
+"""
+Shared HTTP clients for Acceler8 API tests
+Keeps pooled keep-alive connections to the API and Mail.tm for the whole run
+"""
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import API_HOST, refresh_on_401
+from rate_limit import SharedTokenBucket
+
+MAILTM_API = os.getenv("MAILTM_API", "https://api.mail.tm")
+MAILTM_RATE = float(os.getenv("MAILTM_RATE", "8"))  # Requests per second Mail.tm allows per IP
+MAILTM_BUCKET_PATH = os.getenv(
+    "MAILTM_BUCKET_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "acceler8", "mailtm_bucket.json"),
+)
+
+DEFAULT_TIMEOUT = 30  # Seconds, applied when a call does not pass its own timeout
+POOL_CONNECTIONS = 4  # Distinct hosts kept pooled per client
+POOL_MAXSIZE = 32  # Keep-alive connections kept per host
+RATE_LIMIT_RETRIES = 3  # 429 responses retried by rate limited clients
+
+
+class ConnectionStats:
+    """
+    Counts requests sent and TCP/TLS connections opened by a client
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def add_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests served on an already open connection"""
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.connections / self.requests)
+
+
+def _counting_pool(base, stats):
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.add_connection()
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that records connection reuse in a ConnectionStats
+    """
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.stats),
+            "https": _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.stats.add_request()
+        return super().send(request, *args, **kwargs)
+
+
+class ApiClient(requests.Session):
+    """
+    requests.Session with pooled keep-alive connections, a default timeout
+    and relative paths joined onto base_url (absolute URLs pass through)
+    With a limiter every request first takes a token, and 429s are retried after Retry-After
+    """
+
+    def __init__(self, base_url: str, *, timeout: float = DEFAULT_TIMEOUT,
+                 pool_maxsize: int = POOL_MAXSIZE, limiter=None):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = limiter
+        self.stats = ConnectionStats()
+        adapter = PooledAdapter(
+            self.stats,
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        """Join a relative path onto base_url"""
+        if "://" in path:
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self.limiter is None:
+            return super().request(method, self.url(url), *args, **kwargs)
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.limiter.acquire()
+            r = super().request(method, self.url(url), *args, **kwargs)
+            if r.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return r
+            time.sleep(float(r.headers.get("Retry-After") or 1))
+
+
+# Shared clients used by every test module
+api = ApiClient(API_HOST)
+api.hooks["response"].append(refresh_on_401)
+mail = ApiClient(MAILTM_API, limiter=SharedTokenBucket(MAILTM_BUCKET_PATH, MAILTM_RATE))
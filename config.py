@@ -2,10 +2,24 @@
 Configuration file for Acceler8 API tests
 Handles authentication and organization switching
 """
+import base64
+import hashlib
+import json
 import os
+import random
+import string
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import requests
 
+try:
+    import fcntl
+except ImportError:  # Windows: the token store is used without a lock
+    fcntl = None
+
 load_dotenv()
 
 # API configuration from environment variables
@@ -14,47 +28,244 @@ if not API_HOST:
     raise RuntimeError("ACCELER8_API_HOST not set in .env")
 
 AUTH_TOKEN = os.getenv("ACCELER8_TOKEN")
-if not AUTH_TOKEN:
-    raise RuntimeError("ACCELER8_TOKEN not set in .env")
+
+
+class LazyHeaders(Mapping):
+    """
+    Read-only headers mapping that is resolved on first use
+    Lets modules import headers at collection time without authenticating
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getitem__(self, key):
+        return self._loader()[key]
+
+    def __iter__(self):
+        return iter(self._loader())
+
+    def __len__(self):
+        return len(self._loader())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._loader.__name__})"
+
+
+_BASE_HEADERS = {}
+
+def base_headers() -> dict:
+    """
+    Get headers authenticated with the account token from .env
+    """
+    if not _BASE_HEADERS:
+        if not AUTH_TOKEN:
+            raise RuntimeError("ACCELER8_TOKEN not set in .env")
+        _BASE_HEADERS["Authorization"] = f"Bearer {AUTH_TOKEN}"
+    return _BASE_HEADERS
 
 # Default headers for API requests
-HEADERS = {
-    "Authorization": f"Bearer {AUTH_TOKEN}",
-}
+HEADERS = LazyHeaders(base_headers)
 
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
-if not AUTH_TOKEN:
-    raise RuntimeError("ACCELER8_TOKEN not set in .env")
 
 ORG_ID = os.getenv("ORG_ID")
 
+# pytest-xdist worker running this process ("gw0", "gw1", ...), None for serial runs
+WORKER_ID = os.getenv("PYTEST_XDIST_WORKER")
+
+
+def use_org(org_id: str):
+    """
+    Make org_id the default organization for ORG_HEADERS and org_headers()
+    Parallel runs call this once per worker so every worker has its own tenant
+    """
+    global ORG_ID
+    ORG_ID = org_id
+
+
+def unique_name(base: str) -> str:
+    """Suffix a resource name with the worker id and a random tag so parallel workers never collide"""
+    tag = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    return f"{base}-{WORKER_ID or 'main'}-{tag}"
+
 # Cache for organization-specific headers
 _ORG_HEADERS_CACHE = {}
+_ORG_TOKEN_EXPIRY = {}
+_ORG_TOKEN_OWNERS = {}  # Every Authorization value handed out, mapped to its org
+_ORG_LOCKS = {}
+_ORG_LOCKS_GUARD = threading.Lock()
+
+# File-backed token store shared by every run and worker process
+TOKEN_CACHE_PATH = os.getenv(
+    "ACCELER8_TOKEN_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "acceler8", "org_tokens.json"),
+)
+TOKEN_REFRESH_MARGIN = 60  # Seconds before expiry when a token stops being reused
+
+
+def _token_expiry(token: str) -> float | None:
+    """
+    Read the exp claim from a JWT access token
+    Returns None when the token is not a decodable JWT
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _is_fresh(exp: float | None) -> bool:
+    return exp is None or exp - TOKEN_REFRESH_MARGIN > time.time()
+
+
+def _account_fingerprint() -> str:
+    """Identify the account token so a changed ACCELER8_TOKEN never reuses old org tokens"""
+    return hashlib.sha256(base_headers()["Authorization"].encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _locked_token_store():
+    """
+    Hold an exclusive cross-process lock on the token store
+    Yields the stored entries; the holder writes changes back with _save_token_store
+    """
+    os.makedirs(os.path.dirname(TOKEN_CACHE_PATH) or ".", exist_ok=True)
+    with open(f"{TOKEN_CACHE_PATH}.lock", "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(TOKEN_CACHE_PATH) as f:
+                    store = json.load(f)
+            except (FileNotFoundError, ValueError):
+                store = {}
+            yield store
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _save_token_store(store: dict):
+    """Atomically replace the token store, dropping expired entries"""
+    live = {k: v for k, v in store.items() if _is_fresh(v["exp"])}
+    tmp = f"{TOKEN_CACHE_PATH}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(live, f)
+    os.replace(tmp, TOKEN_CACHE_PATH)
+
+
+def _switch_org(org_id: str) -> str:
+    """Switch to the organization and return its access token"""
+    url = f"{API_HOST}/backend/organisations/switch"
+    r = requests.put(url, params={"organisationId": org_id}, headers=HEADERS, timeout=30)
+    r.raise_for_status()
+    return r.json()["data"][0]["access_token"]
+
+
+def _org_lock(org_id: str) -> threading.Lock:
+    """Get the lock that serializes token refreshes for one organization"""
+    with _ORG_LOCKS_GUARD:
+        return _ORG_LOCKS.setdefault(org_id, threading.Lock())
+
+
+def _load_org_headers(target: str, *, force: bool, rejected: str | None) -> dict:
+    """
+    Single-flight token load for one organization
+    Concurrent callers queue on the org lock and reuse whatever the first one fetched;
+    a forced load only accepts a token that differs from the rejected Authorization value
+    """
+    def reusable(auth: str, exp: float | None) -> bool:
+        return _is_fresh(exp) and (not force or (rejected is not None and auth != rejected))
+
+    with _org_lock(target):
+        current = _ORG_HEADERS_CACHE.get(target)
+        if current and reusable(current["Authorization"], _ORG_TOKEN_EXPIRY.get(target)):
+            return current
+
+        key = f"{API_HOST} {target}"
+        account = _account_fingerprint()
+        with _locked_token_store() as store:
+            entry = store.get(key)
+            if (
+                entry is not None
+                and entry["account"] == account
+                and reusable(f"Bearer {entry['access_token']}", entry["exp"])
+            ):
+                token, exp = entry["access_token"], entry["exp"]
+            else:
+                # Switch to organization and get new token
+                token = _switch_org(target)
+                exp = _token_expiry(token)
+                if exp is not None:
+                    store[key] = {"access_token": token, "exp": exp, "account": account}
+                    _save_token_store(store)
+
+        hdrs = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        _ORG_TOKEN_EXPIRY[target] = exp
+        _ORG_TOKEN_OWNERS[hdrs["Authorization"]] = target
+        _ORG_HEADERS_CACHE[target] = hdrs
+        return hdrs
+
 
 def org_headers(org_id: str | None = None, *, force_refresh: bool = False) -> dict:
     """
     Get headers for a specific organization
     Switches to the organization and returns auth headers
+    Tokens are reused from memory or the on-disk store until shortly before they expire
     """
     target = org_id or ORG_ID
     if not target:
         raise RuntimeError("No org_id provided and ORG_ID not set in .env")
 
     # Return cached headers if available
-    if not force_refresh and target in _ORG_HEADERS_CACHE:
-        return _ORG_HEADERS_CACHE[target]
+    cached = _ORG_HEADERS_CACHE.get(target)
+    if not force_refresh and cached and _is_fresh(_ORG_TOKEN_EXPIRY.get(target)):
+        return cached
 
-    # Switch to organization and get new token
-    url = f"{API_HOST}/backend/organisations/switch"
-    r = requests.put(url, params={"organisationId": target}, headers=HEADERS, timeout=30)
-    r.raise_for_status()
+    rejected = cached["Authorization"] if force_refresh and cached else None
+    return _load_org_headers(target, force=force_refresh, rejected=rejected)
+
+
+def refresh_rejected_headers(rejected: str) -> dict | None:
+    """
+    Get replacement headers after a request was rejected with 401
+    Returns None when the rejected Authorization value was not an org token
+    """
+    target = _ORG_TOKEN_OWNERS.get(rejected)
+    if target is None:
+        return None
+    return _load_org_headers(target, force=True, rejected=rejected)
+
+
+def refresh_on_401(r, *args, **kwargs):
+    """
+    Response hook that refreshes a rejected org token once and resends the request
+    Install with session.hooks["response"].append(refresh_on_401)
+    or per call with hooks={"response": refresh_on_401}
+    """
+    if r.status_code != 401:
+        return None
+    body = r.request.body
+    if hasattr(body, "read") or hasattr(body, "__next__"):
+        return None  # Streamed bodies cannot be replayed
+    fresh = refresh_rejected_headers(r.request.headers.get("Authorization"))
+    if fresh is None:
+        return None
 
-    token = r.json()["data"][0]["access_token"]
-    print(token)  # Debug: print token for verification
-    hdrs = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    _ORG_HEADERS_CACHE[target] = hdrs
-    return hdrs
+    # Release the rejected connection back to the pool before resending
+    r.content
+    r.close()
+    prep = r.request.copy()
+    prep.headers["Authorization"] = fresh["Authorization"]
+    retry = r.connection.send(prep, **kwargs)
+    retry.history.append(r)
+    retry.request = prep
+    return retry
 
 # Default organization headers for tests
-ORG_HEADERS = org_headers()
-    
\ No newline at end of file
+# Resolved lazily so test collection never calls /organisations/switch
+ORG_HEADERS = LazyHeaders(org_headers)
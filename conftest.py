@@ -0,0 +1,228 @@
+"""
+Shared fixtures and hooks for Acceler8 API tests
+Set ACCELER8_FAKE=1 to run the whole suite offline against the in-process backend stand-in
+(this also starts the Mail.tm stand-in, which receives the backend's emails)
+MAILTM_FAKE=1 starts only the Mail.tm stand-in: enough for the inbox tests, but the live
+backend cannot deliver to its local SMTP sink, so the email tests need ACCELER8_FAKE too
+"""
+import asyncio
+import os
+
+import pytest
+
+# Started before config and client are imported, so every URL points at the fakes
+if os.getenv("MAILTM_FAKE") or os.getenv("ACCELER8_FAKE"):
+    import fake_mailtm
+    FAKE_MAILTM = fake_mailtm.serve_in_env()
+else:
+    FAKE_MAILTM = None
+
+if os.getenv("ACCELER8_FAKE"):
+    import fake_acceler8
+    FAKE_BACKEND = fake_acceler8.serve_in_env()
+else:
+    FAKE_BACKEND = None
+
+import config as settings  # pytest hooks receive their own `config` argument
+from async_client import AsyncApiClient
+from cleanup import ORGANISATION, CleanupGraph
+from client import api, mail
+from consistency import lags
+from inbox import InboxDispatcher
+from journal import journal
+from mail_pool import mail_accounts
+from multipart import uploads
+from resource_pool import ResourcePool
+from sdk import Acceler8
+from warmup import NO_WARMUP, prefetcher, warm_fixture
+
+# Fixtures served from the session-wide pool, mapped to their pool entry
+POOLED_FIXTURES = {
+    "created_organisation": "organisation",
+}
+
+
+def _build_pool() -> ResourcePool:
+    sdk = Acceler8()
+    pool = ResourcePool()
+    # Registered in the cleanup graph, which deletes it after the assessments created under it
+    # and before the worker tenant it was created in
+    pool.register("organisation", lambda: _GRAPH.add(
+        ORGANISATION,
+        sdk.organisations.create("Shared Test Org", settings.unique_name("SharedTestOrg")).id,
+        parent=(ORGANISATION, settings.ORG_ID),
+    ))
+    return pool
+
+
+_GRAPH = CleanupGraph()
+_POOL = _build_pool()
+
+# Shared fixtures that warm module fixtures may depend on
+prefetcher.provide("cleanup", lambda: _GRAPH)
+for _fixture, _name in POOLED_FIXTURES.items():
+    prefetcher.provide(_fixture, _POOL[_name].get)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def api_client():
+    """Shared pooled client for the Acceler8 API, closed at the end of the run"""
+    yield api
+    api.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mail_client():
+    """Shared pooled client for Mail.tm, closed at the end of the run"""
+    yield mail
+    mail.close()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """
+    Keep every module on one xdist worker and register the warm-up opt-out marker
+    Module-scoped fixtures and ordered tests (create, update, then export) break
+    when plain load distribution spreads a module across workers
+    """
+    config.addinivalue_line("markers", f"{NO_WARMUP}: create the module's warm fixtures when first requested")
+    explicit = any(arg.startswith("--dist") for arg in config.invocation_params.args)
+    if getattr(config.option, "dist", "no") == "load" and not explicit:
+        config.option.dist = "loadfile"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_tenant():
+    """
+    Give each xdist worker its own organisation and switch ORG_HEADERS to it
+    The base ORG_ID org, the on-disk token store and Mail.tm are the only state
+    shared across workers. Serial runs keep using ORG_ID.
+    """
+    if not settings.WORKER_ID:
+        yield settings.ORG_ID
+        return
+    base_org = settings.ORG_ID
+    sdk = Acceler8(headers=settings.org_headers(base_org))
+    org_id = sdk.organisations.create(f"Worker {settings.WORKER_ID}", settings.unique_name("WorkerOrg")).id
+    # Deleted by the cleanup graph after everything created inside it
+    _GRAPH.add(ORGANISATION, org_id, org=base_org)
+    settings.use_org(org_id)
+    yield org_id
+    settings.use_org(base_org)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cleanup(worker_tenant):
+    """
+    Session-wide cleanup graph; fixtures register what they create instead of deleting inline
+    Runs once at the end of the session, before the worker tenant is released
+    """
+    yield _GRAPH
+    prefetcher.close()  # Warmed resources register themselves before the graph runs
+    report = _GRAPH.run()
+    journal.close()
+    if report.failures:
+        raise RuntimeError(str(report))
+
+
+@pytest.fixture(scope="session")
+def async_api():
+    """
+    Shared async client for concurrent fan-out
+    Usable from async fixtures or from sync code via asyncio.run; closed at the end of the run
+    """
+    pytest.importorskip("httpx")
+    client = AsyncApiClient()
+    yield client
+    asyncio.run(client.aclose())
+
+
+@warm_fixture
+def mailtm_account():
+    """
+    Mail.tm inbox for a module's notification tests, leased from the persistent pool
+    Comes back empty and goes back to the pool afterwards instead of being deleted
+    """
+    account = mail_accounts.acquire()
+    yield account
+    mail_accounts.release(account)
+
+
+@pytest.fixture(scope="session")
+def fake_mailtm():
+    """The Mail.tm stand-in serving this run; skips unless MAILTM_FAKE is set"""
+    if FAKE_MAILTM is None:
+        pytest.skip("MAILTM_FAKE not set")
+    return FAKE_MAILTM
+
+
+@pytest.fixture(scope="session")
+def fake_backend():
+    """The Acceler8 backend stand-in serving this run; skips unless ACCELER8_FAKE is set"""
+    if FAKE_BACKEND is None:
+        pytest.skip("ACCELER8_FAKE not set")
+    return FAKE_BACKEND
+
+
+@pytest.fixture(scope="session")
+def inbox_dispatcher():
+    """
+    One Mail.tm poller for the whole run
+    Register inboxes, then expect(recipient, subject) returns a future per awaited email
+    """
+    dispatcher = InboxDispatcher()
+    yield dispatcher
+    dispatcher.close()
+
+
+@pytest.fixture(scope="session")
+def resource_pool():
+    """Session-wide pool of shared resources; the cleanup graph deletes them"""
+    return _POOL
+
+
+@pytest.fixture(scope="module")
+def created_organisation(resource_pool):
+    """
+    Organisation shared by every module that only creates children under it
+    Registered in the cleanup graph, so children given it as parent are deleted first
+    """
+    return resource_pool["organisation"].get()
+
+
+def pytest_collection_finish(session):
+    """
+    Plan fixture warm-up
+    xdist workers are handed files one at a time, so they cannot know the next module
+    """
+    prefetcher.enabled = not settings.WORKER_ID
+    prefetcher.plan(session.items)
+
+
+def pytest_runtest_setup(item):
+    """Warm the next module's fixtures while this one runs"""
+    prefetcher.module_started(item.module.__name__)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report connection reuse, cleanup time, propagation lag and upload throughput"""
+    if _GRAPH.last_report is not None:
+        terminalreporter.write_line(str(_GRAPH.last_report).splitlines()[0])
+    for line in lags.summary():
+        terminalreporter.write_line(f"Propagation lag, {line}")
+    if (line := uploads.summary()) is not None:
+        terminalreporter.write_line(f"Uploads: {line}")
+    for name, client in (("Acceler8 API", api), ("Mail.tm", mail)):
+        stats = client.stats
+        if stats.requests:
+            terminalreporter.write_line(
+                f"{name}: {stats.requests} requests over {stats.connections} connections "
+                f"(connection reuse {stats.reuse_ratio:.0%})"
+            )
+
+
+def pytest_unconfigure(config):
+    """Stop the stand-ins and remove their throwaway state once everything has torn down"""
+    for fake in (FAKE_BACKEND, FAKE_MAILTM):
+        if fake is not None:
+            fake.stop()
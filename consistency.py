@@ -0,0 +1,70 @@
+"""
+Waiting for eventually-consistent reads
+wait_until polls a read with exponential backoff until a condition holds or a deadline
+passes, and records how long the backend took to reflect the write (its propagation lag)
+so the run can report it.
+"""
+import statistics
+import threading
+import time
+
+TIMEOUT = 30  # Seconds to wait for a condition
+FIRST_POLL = 0.05  # Seconds before the second read, doubled after each one
+MAX_POLL = 2.0
+
+
+class LagRecorder:
+    """Propagation lag samples per label, shared by every thread in the run"""
+
+    def __init__(self):
+        self.samples = {}  # label -> [seconds]
+        self.timeouts = {}  # label -> count
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(label, []).append(seconds)
+
+    def timed_out(self, label: str):
+        with self._lock:
+            self.timeouts[label] = self.timeouts.get(label, 0) + 1
+
+    def summary(self) -> list[str]:
+        """One line per label: sample count, median and worst lag, and timeouts"""
+        lines = []
+        with self._lock:
+            for label in sorted(set(self.samples) | set(self.timeouts)):
+                samples = self.samples.get(label, [])
+                line = f"{label}: {len(samples)} waits"
+                if samples:
+                    line += (f", median {statistics.median(samples) * 1000:.0f}ms"
+                             f", max {max(samples) * 1000:.0f}ms")
+                if self.timeouts.get(label):
+                    line += f", {self.timeouts[label]} timed out"
+                lines.append(line)
+        return lines
+
+
+lags = LagRecorder()
+
+
+def wait_until(read, condition, *, label: str, timeout: float = TIMEOUT,
+               since: float | None = None, recorder: LagRecorder = lags):
+    """
+    Call read() until condition(value) is true; returns that value, or None on timeout
+    The lag is measured from since (a time.monotonic() taken after the write), or from the call
+    """
+    start = time.monotonic() if since is None else since
+    deadline = time.monotonic() + timeout
+    delay = FIRST_POLL
+    while True:
+        value = read()
+        if condition(value):
+            recorder.record(label, time.monotonic() - start)
+            return value
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            recorder.timed_out(label)
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, MAX_POLL)
@@ -0,0 +1,76 @@
+"""
+Employee upload workbook template
+The two-row merged header layout accepted by POST /assessment/{id}/employee/upload
+"""
+import io
+import itertools
+
+from openpyxl import Workbook
+
+from xlsx_stream import CHUNK_SIZE, stream_xlsx
+
+MERGED_HEADER_CELLS = ("H1:I1", "M1:R1", "S1:T1", "V1:W1")
+
+HEADER_ROW_1 = [
+    "SN", "Name", "Email", "Country Code", "Phone Number", "Position", "Title",
+    "Span of Control", None, "Join Date", "Tenure", "Years to Retirement",
+    "Direct Reporting Manager", None, None, None, None, None,
+    "Performance", None, "Voice of", "Team Attrition", None, "Voice of"
+]
+
+HEADER_ROW_2 = [
+    None, None, None, None, None, None, None,
+    "Number of Direct Reports", "Number of Indirect Reports", None, None, None,
+    "Name", "Position", "Title", "Email", "Country Code", "Phone Number",
+    "2022", "2023", None, "2023", "2024", None
+]
+
+
+def upload_row(sn: int, employee: dict) -> list:
+    """
+    Map an employee payload (as sent to POST .../employee) onto one template row
+    """
+    manager = employee.get("manager") or {}
+    return [
+        sn, employee.get("name"), employee.get("email"), None, None,
+        employee.get("position"), employee.get("title"),
+        employee.get("number_of_direct_reports"), employee.get("number_of_indirect_reports"),
+        employee.get("join_date"), employee.get("tenure"), employee.get("years_to_retirement"),
+        manager.get("name"), manager.get("position"), manager.get("title"), manager.get("email"),
+        None, None,
+        None, employee.get("performance_rating"),
+        employee.get("voice_of_customer_results"),
+        employee.get("team_attrition_rate_previous_year"), employee.get("team_attrition_rate_current_year"),
+        employee.get("voice_of_employee_results"),
+    ]
+
+
+def build_workbook(employees) -> bytes:
+    """
+    Render employee payloads into an upload workbook and return the xlsx bytes
+    Merging before appending leaves row 1 holding only the merged ranges, so the
+    headers land on rows 2-3; this matches the layout the upload endpoint accepts
+    """
+    wb = Workbook()
+    ws = wb.active
+    for cells in MERGED_HEADER_CELLS:
+        ws.merge_cells(cells)
+    ws.append(HEADER_ROW_1)
+    ws.append(HEADER_ROW_2)
+    for sn, employee in enumerate(employees, start=1):
+        ws.append(upload_row(sn, employee))
+    stream = io.BytesIO()
+    wb.save(stream)
+    return stream.getvalue()
+
+
+def stream_workbook(employees, *, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the same upload workbook as build_workbook in byte chunks, drawing employees lazily
+    Row 1 is left blank under the merged ranges, as build_workbook does
+    """
+    rows = itertools.chain(
+        [[], HEADER_ROW_1, HEADER_ROW_2],
+        (upload_row(sn, employee) for sn, employee in enumerate(employees, start=1)),
+    )
+    return stream_xlsx(rows, merged_cells=MERGED_HEADER_CELLS, chunk_size=chunk_size)
@@ -0,0 +1,129 @@
+"""
+Diffing exported spreadsheets against the data a test seeded
+The export is loaded once into one array per column plus a hash index from row key to
+row position, so checking n expected rows is a single O(n) pass per compared column
+rather than a scan of the sheet per row.
+"""
+MAX_REPORTED = 20  # Differences of each kind listed in the summary
+
+
+def normalize(value):
+    """
+    Comparable form of a cell: strings ignore surrounding whitespace, 1.0 matches 1
+    An empty string matches an empty cell, which xlsx writers may store either way
+    """
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class ExportTable:
+    """Column arrays of an export sheet and an index of row positions by key"""
+
+    def __init__(self, headers: list, columns: list[list], key: str):
+        if key not in headers:
+            raise KeyError(f"Key column {key!r} not in export headers {headers}")
+        self.headers = headers
+        self.columns = dict(zip(headers, columns))
+        self.key = key
+        self.index = {}  # normalized key -> row position
+        self.duplicates = []
+        for position, value in enumerate(self.columns[key]):
+            k = normalize(value)
+            if k in self.index:
+                self.duplicates.append(value)
+            else:
+                self.index[k] = position
+
+    @classmethod
+    def from_rows(cls, rows, *, key: str):
+        """
+        Build from an iterator of row tuples whose first row is the header
+        Fully blank rows are skipped
+        """
+        rows = iter(rows)
+        headers = list(next(rows))
+        columns = [[] for _ in headers]
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            for column, value in zip(columns, row):
+                column.append(value)
+            for column in columns[len(row):]:
+                column.append(None)
+        return cls(headers, columns, key)
+
+    def __len__(self) -> int:
+        return len(self.columns[self.key])
+
+
+class ExportDiff:
+    """Missing rows, extra rows and mismatched cells between an export and expected data"""
+
+    def __init__(self):
+        self.missing = []  # Expected keys with no export row
+        self.extra = []  # Export keys nobody expected
+        self.mismatched = []  # (key, column, expected, actual)
+        self.duplicates = []  # Keys that appear on more than one export row
+        self.unknown_columns = []  # Expected columns the export does not have
+
+    def __bool__(self) -> bool:
+        """True when there is any difference"""
+        return bool(self.missing or self.extra or self.mismatched or self.duplicates or self.unknown_columns)
+
+    def __str__(self):
+        if not self:
+            return "Export matches"
+        lines = []
+        for label, items in (
+            ("unknown columns", self.unknown_columns),
+            ("missing rows", self.missing),
+            ("extra rows", self.extra),
+            ("duplicate keys", self.duplicates),
+        ):
+            if items:
+                shown = ", ".join(repr(i) for i in items[:MAX_REPORTED])
+                more = f" (+{len(items) - MAX_REPORTED} more)" if len(items) > MAX_REPORTED else ""
+                lines.append(f"{len(items)} {label}: {shown}{more}")
+        if self.mismatched:
+            lines.append(f"{len(self.mismatched)} mismatched cells:")
+            for key, column, expected, actual in self.mismatched[:MAX_REPORTED]:
+                lines.append(f"  {key!r} {column}: expected {expected!r}, got {actual!r}")
+            if len(self.mismatched) > MAX_REPORTED:
+                lines.append(f"  (+{len(self.mismatched) - MAX_REPORTED} more)")
+        return "\n".join(lines)
+
+
+def diff_export(rows, expected: list[dict], *, key: str, allow_extra: bool = False) -> ExportDiff:
+    """
+    Compare export rows (header row first, e.g. XlsxExport.rows()) with expected row dicts
+    Each expected dict maps header names to values and must include the key column; only the
+    columns it names are compared. With allow_extra, export rows nobody expected are not reported
+    """
+    table = ExportTable.from_rows(rows, key=key)
+    diff = ExportDiff()
+    diff.duplicates = table.duplicates
+
+    # Position of each expected row in the export, or None when it is missing
+    keys = [row[key] for row in expected]
+    positions = [table.index.get(normalize(k)) for k in keys]
+    diff.missing = [k for k, position in zip(keys, positions) if position is None]
+    if not allow_extra:
+        wanted = {normalize(k) for k in keys}
+        diff.extra = [v for v in table.columns[key] if normalize(v) not in wanted]
+
+    names = dict.fromkeys(name for row in expected for name in row if name != key)
+    for name in names:
+        if name not in table.columns:
+            diff.unknown_columns.append(name)
+            continue
+        column = table.columns[name]
+        for k, position, row in zip(keys, positions, expected):
+            if position is None or name not in row:
+                continue
+            actual = column[position]
+            if normalize(actual) != normalize(row[name]):
+                diff.mismatched.append((k, name, row[name], actual))
+    return diff
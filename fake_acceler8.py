@@ -0,0 +1,1036 @@
+"""
+In-process stand-in for the Acceler8 backend
+Serves the routes the suite uses (organisations and /organisations/switch, assessments,
+employees, questions, action items, prepare content, letters and onboarding) from
+in-memory state, with the status codes and response shapes of the real API, so the
+whole suite runs offline and load tools have a local baseline to compare against.
+Emails the backend would send are kept in outbox and, when an SMTP address is given
+(the fake Mail.tm's sink), delivered there. Needs only the standard library and the
+xlsx helpers, so it can start before config is imported.
+
+Start it for a test run with ACCELER8_FAKE=1 (which also starts the fake Mail.tm), or serve it
+for seeding and load tools with:
+    python fake_acceler8.py [--port 8800]
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import re
+import secrets
+import shutil
+import smtplib
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+from zipfile import BadZipFile
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from employee_upload import HEADER_ROW_1, HEADER_ROW_2, MERGED_HEADER_CELLS, upload_row
+from xlsx_stream import XlsxReader, stream_xlsx
+
+V1 = "/backend/v1"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+TOKEN_TTL = 3600  # Seconds an organisation token stays valid
+DEFAULT_PAGE_SIZE = 10
+SENDER = "noreply@acceler8.test"
+SEGMENTS = "action-item|prepare-content"
+OBJECTIVE_TYPES = ("OBJECTIVE_SINGLE", "OBJECTIVE_MULTIPLE")
+
+LETTER_SUBJECT = "Complete Your Letter to Yourself – Your Journey Starts Here"
+LETTER_EXPORT_HEADERS = [
+    "Employee Name", "Employee Email", "Submission Date",
+    "In the next [input number] days, the one thing that I hope to achieve",
+    "start", "stop", "continue",
+    "I want to show up as [input reason to join the program] who",
+    "The moments in my work or life that I want to [input what user wish to be] are",
+    "sign",
+]
+
+# Who may call a route: anyone, any valid token, or only an organisation token
+PUBLIC, SIGNED_IN, ORG = "public", "signed in", "org"
+
+_ROUTES = []  # (method, pattern, handler, access) in match order
+
+
+def route(method: str, path: str, *, access: str = ORG):
+    """Register a FakeAcceler8 method for METHOD path; {name} segments become keyword arguments"""
+    pattern = re.compile(re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path))
+
+    def register(fn):
+        _ROUTES.append((method, pattern, fn, access))
+        return fn
+
+    return register
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _File:
+    """A download response"""
+
+    def __init__(self, data: bytes, filename: str, content_type: str = XLSX_MIME):
+        self.data = data
+        self.filename = filename
+        self.content_type = content_type
+
+
+class _Request:
+    def __init__(self, query: dict, body: bytes, content_type: str, org: str | None):
+        self.query = query
+        self.body = body
+        self.content_type = content_type
+        self.org = org  # Organisation of the caller's token, None for the account token or no token
+        self.mail = []  # Emails to send once the state lock is released
+
+    @property
+    def json(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            raise _HttpError(400, "Malformed JSON body")
+
+    def page(self, number: str, size: str) -> tuple[int, int]:
+        try:
+            page = int(self.query.get(number, 1))
+            page_size = int(self.query.get(size, DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise _HttpError(400, f"{number} and {size} must be integers")
+        if page < 1 or page_size < 1:
+            raise _HttpError(400, f"{number} and {size} must be positive")
+        return page, page_size
+
+
+def _ok(data=None, status: int = 200):
+    return status, {"status": status, "message": "success", "data": data}
+
+
+def _paged(items: list, page: int, size: int):
+    total = len(items)
+    return 200, {
+        "status": 200, "message": "success",
+        "current_page": page, "total_pages": max(1, math.ceil(total / size)), "total": total,
+        "data": items[(page - 1) * size:page * size],
+    }
+
+
+def _public(record: dict) -> dict:
+    """A stored record without its underscore bookkeeping fields"""
+    return {k: v for k, v in record.items() if not k.startswith("_")}
+
+
+def _new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _jwt(claims: dict) -> str:
+    def part(value: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+    return f"{part({'alg': 'none', 'typ': 'JWT'})}.{part(claims)}.{secrets.token_hex(16)}"
+
+
+def _released(item: dict) -> bool:
+    """True once an item's send date and time have passed in its timezone"""
+    try:
+        zone = ZoneInfo(item.get("timezone") or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = timezone.utc
+    try:
+        at = datetime.fromisoformat(f"{item['send_date']}T{item.get('send_time') or '00:00:00'}")
+    except (KeyError, TypeError, ValueError):
+        return True
+    return at.replace(tzinfo=zone) <= datetime.now(timezone.utc)
+
+
+def _sheet_title(title: str) -> str:
+    """Excel sheet names are at most 31 characters and cannot contain []:*?/\\"""
+    return re.sub(r"[\[\]:*?/\\]", " ", title or "Sheet")[:31] or "Sheet"
+
+
+def _multipart_files(content_type: str, body: bytes) -> dict:
+    """Parts of a multipart/form-data body by field name"""
+    match = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    if match is None:
+        raise _HttpError(400, "Expected a multipart/form-data body")
+    files = {}
+    for part in body.split(b"--" + match.group(1).encode())[1:-1]:
+        head, _, data = part.partition(b"\r\n\r\n")
+        name = re.search(rb'name="([^"]*)"', head)
+        if name:
+            files[name.group(1).decode()] = data[:-2]  # Drop the CRLF before the next boundary
+    return files
+
+
+def _upload_fields(row) -> tuple[dict, dict]:
+    """Employee and manager fields of one upload template row, the inverse of upload_row"""
+    row = list(row) + [None] * (24 - len(row))
+
+    def cell(value):
+        return value.date().isoformat() if isinstance(value, datetime) else value
+
+    employee = {
+        "name": row[1], "email": row[2], "position": row[5], "title": row[6],
+        "number_of_direct_reports": row[7], "number_of_indirect_reports": row[8],
+        "join_date": cell(row[9]), "tenure": row[10], "years_to_retirement": row[11],
+        "performance_rating": row[19], "voice_of_customer_results": row[20],
+        "team_attrition_rate_previous_year": row[21], "team_attrition_rate_current_year": row[22],
+        "voice_of_employee_results": row[23],
+    }
+    manager = {"name": row[12], "position": row[13], "title": row[14], "email": row[15]}
+    return ({k: v for k, v in employee.items() if v is not None},
+            {k: v for k, v in manager.items() if v is not None})
+
+
+class FakeAcceler8:
+    """Acceler8 organisations, assessments and everything under them, held in memory and served over HTTP"""
+
+    def __init__(self, host: str = "127.0.0.1", *, port: int = 0, smtp: str | None = None):
+        self.host = host
+        self.port = port
+        self.smtp = smtp  # "host:port" emails are delivered to, or None to only record them
+        self.account_token = secrets.token_hex(24)
+        self.organisations = {}
+        self.assessments = {}
+        self.employees = {}
+        self.managers = {}
+        self.questions = {}  # Assessment questions and the master bank (_assessment None)
+        self.contents = {}  # Action items and prepare content
+        self.responses = {}  # (employee id, assessment id) -> submitted assessment response
+        self.letter_templates = {}  # assessment id -> template
+        self.letters = {}  # (assessment id, employee id) -> letter
+        self.onboarding = {}  # assessment id -> onboarding home
+        self.sequences = {}  # assessment id -> capability order
+        self.outbox = []  # (to, subject, text) of every email sent
+        self._tokens = {}  # organisation token -> (organisation id, expiry)
+        self._lock = threading.RLock()
+        self._http = None
+        self.state_dir = None  # Throwaway settings directory from serve_in_env, removed by stop()
+        self.org_id = self._add_organisation({
+            "name": "Fake Org", "internal_name": "fake-org", "colour_theme": "DRIVEN_RED", "logo": None,
+        })["id"]
+
+    # Auth
+
+    def issue_token(self, org_id: str, ttl: float = TOKEN_TTL) -> str:
+        """An organisation access token, as /organisations/switch returns"""
+        exp = int(time.time() + ttl)
+        token = _jwt({"sub": "fake-account", "organisation_id": org_id, "exp": exp})
+        with self._lock:
+            self._tokens[token] = (org_id, exp)
+        return token
+
+    def _caller(self, authorization: str) -> tuple[bool, str | None]:
+        """(token is valid, organisation of an org token)"""
+        token = authorization[7:] if authorization.startswith("Bearer ") else None
+        if token is not None and token == self.account_token:
+            return True, None
+        org_id, exp = self._tokens.get(token, (None, 0))
+        if org_id is None or exp <= time.time() or org_id not in self.organisations:
+            return False, None
+        return True, org_id
+
+    # Lookups
+
+    def _assessment(self, req: _Request, aid: str) -> dict:
+        assessment = self.assessments.get(aid)
+        if assessment is None:
+            raise _HttpError(404, "Assessment not found")
+        if req.org is not None and assessment["organisation_id"] != req.org:
+            raise _HttpError(403, "Assessment belongs to another organisation")
+        return assessment
+
+    def _employee(self, req: _Request, eid: str, aid: str | None = None) -> dict:
+        employee = self.employees.get(eid)
+        if employee is None or (aid is not None and employee["_assessment"] != aid):
+            raise _HttpError(404, "Employee not found")
+        self._assessment(req, employee["_assessment"])
+        return employee
+
+    def _question(self, qid, aid: str | None) -> dict:
+        question = self.questions.get(qid)
+        if question is None or question["_assessment"] != aid:
+            raise _HttpError(404, "Question not found")
+        return question
+
+    def _content(self, aid: str, segment: str, cid: str) -> dict:
+        item = self.contents.get(cid)
+        if item is None or item["_assessment"] != aid or item["_segment"] != segment:
+            raise _HttpError(404, f"{segment.replace('-', ' ').capitalize()} not found")
+        return item
+
+    def _staff(self, aid: str) -> list[dict]:
+        """Employees of an assessment in creation order"""
+        return [e for e in self.employees.values() if e["_assessment"] == aid]
+
+    def _employee_json(self, employee: dict) -> dict:
+        manager = self.managers.get(employee["_manager"])
+        return {**_public(employee), "assessment_id": employee["_assessment"],
+                "manager": _public(manager) if manager else None}
+
+    # Mutations
+
+    def _add_organisation(self, body: dict) -> dict:
+        org = {"id": _new_id(), "name": body.get("name"), "internal_name": body.get("internal_name"),
+               "colour_theme": body.get("colour_theme"), "logo": body.get("logo")}
+        self.organisations[org["id"]] = org
+        return org
+
+    def _delete_assessment(self, aid: str):
+        """Delete an assessment and everything under it, as the backend cascades"""
+        self.assessments.pop(aid, None)
+        for store in (self.employees, self.managers, self.questions, self.contents):
+            for key in [k for k, v in store.items() if v["_assessment"] == aid]:
+                del store[key]
+        for store in (self.responses, self.letters):
+            for key in [k for k in store if aid in k]:
+                del store[key]
+        for store in (self.letter_templates, self.onboarding, self.sequences):
+            store.pop(aid, None)
+
+    def _upsert_manager(self, aid: str, body: dict | None) -> str | None:
+        """Managers are shared by email within an assessment; returns the manager id"""
+        if not body or not body.get("email"):
+            return None
+        email = body["email"].lower()
+        manager = next((m for m in self.managers.values()
+                        if m["_assessment"] == aid and m["email"].lower() == email), None)
+        if manager is None:
+            manager = {"id": _new_id(), "_assessment": aid}
+            self.managers[manager["id"]] = manager
+        manager.update({k: v for k, v in body.items() if k != "id" and (v is not None or k not in manager)})
+        return manager["id"]
+
+    def _add_employee(self, aid: str, body: dict) -> dict:
+        if not body.get("email") or not body.get("name"):
+            raise _HttpError(400, "name and email are required")
+        employee = {
+            "id": _new_id(),
+            **{k: v for k, v in body.items() if k not in ("id", "manager", "status", "employee_code")},
+            "employee_code": secrets.token_hex(4).upper(),
+            "status": "CREATED",
+            "_assessment": aid,
+            "_manager": self._upsert_manager(aid, body.get("manager")),
+        }
+        self.employees[employee["id"]] = employee
+        return employee
+
+    def _update_employee(self, employee: dict, body: dict):
+        employee.update({k: v for k, v in body.items() if k not in ("id", "manager", "status", "employee_code")})
+        if body.get("manager"):
+            employee["_manager"] = self._upsert_manager(employee["_assessment"], body["manager"])
+
+    def _add_question(self, body: dict, aid: str | None) -> dict:
+        if not body.get("capabilities") or not body.get("sub_capability"):
+            raise _HttpError(400, "capabilities and sub_capability are required")
+        if not body.get("type"):
+            raise _HttpError(400, "type is required")
+        if not body.get("question"):
+            raise _HttpError(400, "question is required")
+        if body["type"] in OBJECTIVE_TYPES and body.get("options") == []:
+            # The backend indexes the first option without checking; keep its 500
+            raise _HttpError(500, "Internal Server Error")
+        question = {"id": _new_id(), **{k: v for k, v in body.items() if k != "id"},
+                    "status": body.get("status") or "DRAFT", "_assessment": aid}
+        self.questions[question["id"]] = question
+        return question
+
+    def _recipients(self, item: dict) -> list[dict]:
+        staff = self._staff(item["_assessment"])
+        if item.get("send_to_all", True):
+            return staff
+        emails = {e.lower() for e in item.get("recipient_emails") or ()}
+        return [e for e in staff if e["email"].lower() in emails]
+
+    def _content_json(self, item: dict) -> dict:
+        recipients = [
+            {"id": e["id"], "name": e["name"], "email": e["email"],
+             "is_completed": bool(item["_responses"].get(e["id"], {}).get("completed"))}
+            for e in self._recipients(item)
+        ]
+        return {**_public(item), "recipients": recipients,
+                "completed_count": sum(r["is_completed"] for r in recipients),
+                "uncompleted_recipients": [r for r in recipients if not r["is_completed"]]}
+
+    def _letter_json(self, letter: dict) -> dict:
+        employee = self.employees.get(letter["_employee"], {})
+        return {**_public(letter), "employee_id": letter["_employee"],
+                "employee_name": employee.get("name"), "employee_email": employee.get("email")}
+
+    def _link(self, aid: str, employee: dict, page: str) -> str:
+        return f"{self.url}/assessment/{aid}/{page}?code={employee['employee_code']}"
+
+    def _email(self, req: _Request, employee: dict, subject: str, text: str):
+        req.mail.append((employee["email"], subject, text))
+
+    def _deliver(self, mail: list):
+        self.outbox.extend(mail)
+        if not mail or not self.smtp:
+            return
+        host, _, port = self.smtp.rpartition(":")
+        try:
+            with smtplib.SMTP(host, int(port), timeout=10) as smtp:
+                for to, subject, text in mail:
+                    msg = EmailMessage()
+                    msg["From"], msg["To"], msg["Subject"] = SENDER, to, subject
+                    msg.set_content(text)
+                    smtp.send_message(msg)
+        except (OSError, smtplib.SMTPException):
+            pass  # Like the backend, a failed send does not fail the request
+
+    # Organisations
+
+    @route("PUT", "/backend/organisations/switch", access=SIGNED_IN)
+    def switch_organisation(self, req):
+        org_id = req.query.get("organisationId")
+        if org_id not in self.organisations:
+            raise _HttpError(404, "Organisation not found")
+        return _ok([{"organisation_id": org_id, "access_token": self.issue_token(org_id)}])
+
+    @route("POST", f"{V1}/organisation", access=SIGNED_IN)
+    def create_organisation(self, req):
+        body = req.json
+        if not body.get("name") or not body.get("internal_name"):
+            raise _HttpError(400, "name and internal_name are required")
+        if any(o["internal_name"] == body["internal_name"] for o in self.organisations.values()):
+            raise _HttpError(409, "internal_name is already in use")
+        return _ok(self._add_organisation(body))
+
+    @route("GET", f"{V1}/organisation/{{oid}}", access=SIGNED_IN)
+    def get_organisation(self, req, oid):
+        if oid not in self.organisations:
+            raise _HttpError(404, "Organisation not found")
+        return _ok(self.organisations[oid])
+
+    @route("PUT", f"{V1}/organisation/{{oid}}", access=SIGNED_IN)
+    def update_organisation(self, req, oid):
+        if oid not in self.organisations:
+            raise _HttpError(404, "Organisation not found")
+        body = req.json
+        if "name" in body and not body["name"]:
+            raise _HttpError(400, "name cannot be empty")
+        org = self.organisations[oid]
+        org.update({k: v for k, v in body.items() if k in ("name", "internal_name", "colour_theme", "logo")})
+        return _ok(org)
+
+    @route("DELETE", f"{V1}/organisation/{{oid}}", access=SIGNED_IN)
+    def delete_organisation(self, req, oid):
+        if self.organisations.pop(oid, None) is None:
+            raise _HttpError(404, "Organisation not found")
+        for aid in [a for a, v in self.assessments.items() if v["organisation_id"] == oid]:
+            self._delete_assessment(aid)
+        return 204, None
+
+    # Assessments
+
+    @route("POST", f"{V1}/assessment")
+    def create_assessment(self, req):
+        body = req.json
+        if not body.get("name"):
+            raise _HttpError(400, "name is required")
+        if not body.get("capabilities"):
+            raise _HttpError(404, "Capabilities not found")
+        assessment = {
+            "id": _new_id(), "name": body["name"], "assessment_type": body.get("assessment_type", "EMPLOYEE"),
+            "show_onboarding": bool(body.get("show_onboarding")), "capabilities": list(body["capabilities"]),
+            "result_visibility": None, "organisation_id": req.org,
+        }
+        self.assessments[assessment["id"]] = assessment
+        return _ok(assessment)
+
+    @route("GET", f"{V1}/assessments")
+    def list_assessments(self, req):
+        return _ok([a for a in self.assessments.values() if a["organisation_id"] == req.org])
+
+    @route("GET", f"{V1}/assessment/{{aid}}")
+    def get_assessment(self, req, aid):
+        return _ok(self._assessment(req, aid))
+
+    @route("PUT", f"{V1}/assessment/{{aid}}")
+    def update_assessment(self, req, aid):
+        assessment = self._assessment(req, aid)
+        body = req.json
+        if "name" in body and not body["name"]:
+            raise _HttpError(400, "name cannot be empty")
+        assessment.update({k: v for k, v in body.items()
+                           if k in ("name", "assessment_type", "show_onboarding", "capabilities")})
+        return _ok(assessment)
+
+    @route("DELETE", f"{V1}/assessment/{{aid}}")
+    def delete_assessment(self, req, aid):
+        self._assessment(req, aid)
+        self._delete_assessment(aid)
+        return 204, None
+
+    @route("GET", f"{V1}/assessment/{{aid}}/summary")
+    def assessment_summary(self, req, aid):
+        self._assessment(req, aid)
+        staff = self._staff(aid)
+        submitted = sum(self.responses.get((e["id"], aid), {}).get("status") == "SUBMITTED" for e in staff)
+        return _ok({"total_employee_count": len(staff), "self_assessment_completed_count": submitted})
+
+    @route("PUT", f"{V1}/assessment/{{aid}}/result/visibility")
+    def set_result_visibility(self, req, aid):
+        assessment = self._assessment(req, aid)
+        visibility = req.json.get("result_visibility")
+        if not visibility:
+            raise _HttpError(400, "result_visibility is required")
+        assessment["result_visibility"] = visibility
+        return _ok(assessment)
+
+    @route("POST", f"{V1}/assessment/{{aid}}/success-capabilities/update-sequence")
+    def update_capability_sequence(self, req, aid):
+        self._assessment(req, aid)
+        sequence = req.json
+        if not isinstance(sequence, list):
+            raise _HttpError(400, "Expected a list of capabilities")
+        self.sequences[aid] = sequence
+        return _ok(sequence)
+
+    # Employees
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee")
+    def create_employee(self, req, aid):
+        self._assessment(req, aid)
+        return _ok(self._employee_json(self._add_employee(aid, req.json)), 201)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employees")
+    def list_employees(self, req, aid):
+        self._assessment(req, aid)
+        page, size = req.page("page", "size")
+        # Newest first rather than creation order, so tests cannot lean on insertion order
+        return _paged([self._employee_json(e) for e in reversed(self._staff(aid))], page, size)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employee/by_code")
+    def employee_by_code(self, req, aid):
+        self._assessment(req, aid)
+        code = req.query.get("code")
+        employee = next((e for e in self._staff(aid) if e["employee_code"] == code), None)
+        if employee is None:
+            raise _HttpError(404, "Employee not found")
+        return _ok(self._employee_json(employee))
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/upload")
+    def upload_employees(self, req, aid):
+        self._assessment(req, aid)
+        file = _multipart_files(req.content_type, req.body).get("file")
+        if not file:
+            raise _HttpError(400, "file is required")
+        try:
+            with XlsxReader(BytesIO(file)) as sheet:
+                rows = list(sheet.rows())
+        except (BadZipFile, KeyError, ValueError):
+            raise _HttpError(400, "file is not a valid xlsx workbook")
+        # Headers sit on the "SN" row and the subheader row under it; data follows
+        header = next((i for i, row in enumerate(rows) if row and row[0] == "SN"), None)
+        if header is None:
+            raise _HttpError(400, "Header row not found")
+        by_email = {e["email"].lower(): e for e in self._staff(aid)}
+        created = updated = 0
+        for row in rows[header + 2:]:
+            fields, manager = _upload_fields(row)
+            if not fields.get("email"):
+                continue
+            fields["manager"] = manager
+            existing = by_email.get(str(fields["email"]).lower())
+            if existing is None:
+                by_email[str(fields["email"]).lower()] = self._add_employee(aid, fields)
+                created += 1
+            else:
+                self._update_employee(existing, fields)
+                updated += 1
+        return _ok({"created": created, "updated": updated})
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/export")
+    def export_employees(self, req, aid):
+        self._assessment(req, aid)
+        body = req.json
+        staff = self._staff(aid)
+        if not body.get("select_all"):
+            wanted = set(body.get("employee_ids") or ())
+            staff = [e for e in staff if e["id"] in wanted]
+        rows = [HEADER_ROW_1, HEADER_ROW_2,
+                *(upload_row(sn, self._employee_json(e)) for sn, e in enumerate(staff, start=1))]
+        data = b"".join(stream_xlsx(rows, title="Employees", merged_cells=MERGED_HEADER_CELLS))
+        return 200, _File(data, "employees.xlsx")
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/share-link")
+    def share_link(self, req, aid):
+        self._assessment(req, aid)
+        for eid in req.json.get("employee_ids") or ():
+            employee = self._employee(req, eid, aid)
+            self._email(req, employee, "Your Acceler8 assessment is ready",
+                        f"Hi {employee['name']},\n\nYour assessment is ready. Start it here:\n"
+                        f"{self._link(aid, employee, 'start')}\n\nThe Acceler8 team\n")
+        return _ok()
+
+    @route("PUT", f"{V1}/assessment/{{aid}}/employee/{{eid}}")
+    def update_employee(self, req, aid, eid):
+        employee = self._employee(req, eid, aid)
+        self._update_employee(employee, req.json)
+        return _ok(self._employee_json(employee))
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/{{eid}}/verify", access=PUBLIC)
+    def verify_employee(self, req, aid, eid):
+        employee = self._employee(req, eid, aid)
+        employee["status"] = "PROFILE_VERIFIED"
+        return _ok()
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employee/{{eid}}/result/link")
+    def result_link(self, req, aid, eid):
+        employee = self._employee(req, eid, aid)
+        return _ok({"link": self._link(aid, employee, "result")})
+
+    @route("GET", f"{V1}/assessment/{{aid}}/manager/{{mid}}/subordinates", access=PUBLIC)
+    def subordinates(self, req, aid, mid):
+        self._assessment(req, aid)
+        manager = self.managers.get(mid)
+        if manager is None or manager["_assessment"] != aid:
+            raise _HttpError(404, "Manager not found")
+        staff = [self._employee_json(e) for e in self._staff(aid) if e["_manager"] == mid]
+        return _ok({**_public(manager), "subordinates": staff})
+
+    @route("GET", f"{V1}/employee/{{eid}}")
+    def get_employee(self, req, eid):
+        return _ok(self._employee_json(self._employee(req, eid)))
+
+    @route("DELETE", f"{V1}/employee/{{eid}}")
+    def delete_employee(self, req, eid):
+        employee = self._employee(req, eid)
+        del self.employees[eid]
+        for store in (self.responses, self.letters):
+            for key in [k for k in store if eid in k]:
+                del store[key]
+        for item in self.contents.values():
+            item["_responses"].pop(eid, None)
+        if not any(e["_manager"] == employee["_manager"] for e in self.employees.values()):
+            self.managers.pop(employee["_manager"], None)
+        return 204, None
+
+    @route("GET", f"{V1}/employee/{{eid}}/assessments", access=PUBLIC)
+    def employee_assessments(self, req, eid):
+        employee = self._employee(req, eid)
+        return _ok([self.assessments[employee["_assessment"]]])
+
+    @route("POST", f"{V1}/employee/{{eid}}/assessment/{{aid}}/response", access=PUBLIC)
+    def submit_assessment_response(self, req, eid, aid):
+        self._employee(req, eid, aid)
+        body = req.json
+        if not isinstance(body.get("responses"), list):
+            raise _HttpError(400, "responses must be a list")
+        for response in body["responses"]:
+            self._question(response.get("question_id"), aid)
+        self.responses[(eid, aid)] = body
+        return _ok()
+
+    # Questions; these endpoints answer with bare question JSON, without the data envelope
+
+    @route("GET", f"{V1}/assessment/{{aid}}/questions")
+    def list_questions(self, req, aid):
+        self._assessment(req, aid)
+        questions = [_public(q) for q in self.questions.values() if q["_assessment"] == aid]
+        sequence = self.sequences.get(aid, [])
+        questions.sort(key=lambda q: sequence.index(q.get("capabilities"))
+                       if q.get("capabilities") in sequence else len(sequence))
+        return 200, questions
+
+    @route("POST", f"{V1}/assessment/{{aid}}/question/bulk")
+    def bulk_assessment_questions(self, req, aid):
+        self._assessment(req, aid)
+        return self._bulk(req, aid)
+
+    @route("POST", f"{V1}/assessment/{{aid}}/question")
+    def create_assessment_question(self, req, aid):
+        self._assessment(req, aid)
+        return 200, _public(self._add_question(req.json, aid))
+
+    @route("GET", f"{V1}/assessment/{{aid}}/question/{{qid}}")
+    def get_assessment_question(self, req, aid, qid):
+        self._assessment(req, aid)
+        return 200, _public(self._question(qid, aid))
+
+    @route("DELETE", f"{V1}/assessment/{{aid}}/question/{{qid}}")
+    def delete_assessment_question(self, req, aid, qid):
+        self._assessment(req, aid)
+        del self.questions[self._question(qid, aid)["id"]]
+        return 204, None
+
+    @route("POST", f"{V1}/question/bulk")
+    def bulk_master_questions(self, req):
+        return self._bulk(req, None)
+
+    @route("POST", f"{V1}/question")
+    def create_master_question(self, req):
+        return 200, _public(self._add_question(req.json, None))
+
+    @route("GET", f"{V1}/question/{{qid}}")
+    def get_master_question(self, req, qid):
+        return 200, _public(self._question(qid, None))
+
+    @route("DELETE", f"{V1}/question/{{qid}}")
+    def delete_master_question(self, req, qid):
+        del self.questions[self._question(qid, None)["id"]]
+        return 204, None
+
+    def _bulk(self, req, aid):
+        """Apply creates, updates and deletes together; returns the updated questions, then the created ones"""
+        body = req.json
+        updates = [(self._question(change.get("id"), aid), change) for change in body.get("questions_to_update") or ()]
+        deletes = [self._question(qid, aid)["id"] for qid in body.get("question_ids_to_delete") or ()]
+        created = [self._add_question(change, aid) for change in body.get("questions_to_create") or ()]
+        for question, change in updates:
+            question.update({k: v for k, v in change.items() if k != "id" and not k.startswith("_")})
+        for qid in deletes:
+            self.questions.pop(qid, None)
+        return 200, [_public(q) for q, _ in updates] + [_public(q) for q in created]
+
+    # Action items and prepare content
+
+    @route("POST", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})")
+    def create_content(self, req, aid, segment):
+        self._assessment(req, aid)
+        body = req.json
+        if not body.get("title"):
+            raise _HttpError(400, "title is required")
+        item = {"id": _new_id(), **{k: v for k, v in body.items() if k != "id"},
+                "_assessment": aid, "_segment": segment, "_responses": {}}
+        self.contents[item["id"]] = item
+        return _ok(self._content_json(item))
+
+    @route("GET", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})s")
+    def list_content(self, req, aid, segment):
+        self._assessment(req, aid)
+        page, size = req.page("page_number", "page_size")
+        items = [self._content_json(i) for i in self.contents.values()
+                 if i["_assessment"] == aid and i["_segment"] == segment]
+        return _paged(items, page, size)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})/{{cid}}")
+    def get_content(self, req, aid, segment, cid):
+        self._assessment(req, aid)
+        return _ok(self._content_json(self._content(aid, segment, cid)))
+
+    @route("PUT", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})/{{cid}}")
+    def update_content(self, req, aid, segment, cid):
+        self._assessment(req, aid)
+        item = self._content(aid, segment, cid)
+        body = req.json
+        if "title" in body and not body["title"]:
+            raise _HttpError(400, "title cannot be empty")
+        item.update({k: v for k, v in body.items() if k != "id" and not k.startswith("_")})
+        return _ok(self._content_json(item))
+
+    @route("DELETE", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})/{{cid}}")
+    def delete_content(self, req, aid, segment, cid):
+        self._assessment(req, aid)
+        del self.contents[self._content(aid, segment, cid)["id"]]
+        return 204, None
+
+    @route("POST", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})/{{cid}}/send-reminder")
+    def send_content_reminder(self, req, aid, segment, cid):
+        self._assessment(req, aid)
+        item = self._content(aid, segment, cid)
+        for eid in req.json.get("employee_ids") or ():
+            employee = self._employee(req, eid, aid)
+            self._email(req, employee, f"Reminder: {item['title']}",
+                        f"Hi {employee['name']},\n\nA reminder to complete \"{item['title']}\":\n"
+                        f"{self._link(aid, employee, segment)}\n\nThe Acceler8 team\n")
+        return _ok()
+
+    @route("GET", f"{V1}/assessment/{{aid}}/(?P<segment>{SEGMENTS})/{{cid}}/responses/export")
+    def export_content_responses(self, req, aid, segment, cid):
+        self._assessment(req, aid)
+        item = self._content(aid, segment, cid)
+        quizzes = item.get("quizzes") or []
+        rows = [["SN", "Employee Name", "Completed", *(f"Q{i}: {q.get('question')}" for i, q in enumerate(quizzes, 1))]]
+        for sn, employee in enumerate(self._recipients(item), start=1):
+            submitted = item["_responses"].get(employee["id"], {})
+            answers = {str(a.get("quiz_id")): a.get("answer") for a in submitted.get("response") or ()}
+            rows.append([sn, employee["name"], "Yes" if submitted.get("completed") else "No",
+                         *(answers.get(str(q.get("id"))) or "" for q in quizzes)])
+        data = b"".join(stream_xlsx(rows, title=_sheet_title(item["title"])))
+        return 200, _File(data, f"{segment}-responses.xlsx")
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employee/{{eid}}/(?P<segment>{SEGMENTS})s")
+    def employee_content(self, req, aid, eid, segment):
+        self._employee(req, eid, aid)
+        items = [self._content_json(i) for i in self.contents.values()
+                 if i["_assessment"] == aid and i["_segment"] == segment and _released(i)
+                 and any(e["id"] == eid for e in self._recipients(i))]
+        return _ok(items)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employee/{{eid}}/(?P<segment>{SEGMENTS})/{{cid}}")
+    def employee_content_item(self, req, aid, eid, segment, cid):
+        self._employee(req, eid, aid)
+        item = self._content(aid, segment, cid)
+        if not _released(item) or not any(e["id"] == eid for e in self._recipients(item)):
+            raise _HttpError(404, "Not assigned to this employee")
+        return _ok({**_public(item), "response": item["_responses"].get(eid)})
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/{{eid}}/(?P<segment>{SEGMENTS})/{{cid}}/submit")
+    def submit_content(self, req, aid, eid, segment, cid):
+        self._employee(req, eid, aid)
+        item = self._content(aid, segment, cid)
+        body = req.json
+        item["_responses"][eid] = {"response": body.get("response") or [],
+                                   "completed": body.get("completed") in (True, "true")}
+        return _ok()
+
+    # Letters
+
+    @route("POST", f"{V1}/assessment/{{aid}}/letter/template")
+    def save_letter_template(self, req, aid):
+        self._assessment(req, aid)
+        body = req.json
+        if not isinstance(body.get("number_of_days"), int):
+            raise _HttpError(400, "number_of_days must be an integer")
+        template = self.letter_templates[aid] = {
+            "number_of_day": body["number_of_days"],
+            "reason_for_joining": body.get("reason_for_joining"),
+            "users_wish": body.get("users_wish"),
+        }
+        return _ok(template)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/letter/template")
+    def get_letter_template(self, req, aid):
+        self._assessment(req, aid)
+        if aid not in self.letter_templates:
+            raise _HttpError(404, "Letter template not found")
+        return _ok(self.letter_templates[aid])
+
+    @route("GET", f"{V1}/assessment/{{aid}}/letters")
+    def list_letters(self, req, aid):
+        self._assessment(req, aid)
+        page, size = req.page("page_number", "page_size")
+        letters = [self._letter_json(v) for (a, _), v in self.letters.items() if a == aid]
+        return _paged(letters, page, size)
+
+    @route("POST", f"{V1}/assessment/{{aid}}/letter/notify")
+    def notify_letter(self, req, aid):
+        self._assessment(req, aid)
+        days = self.letter_templates.get(aid, {}).get("number_of_day")
+        horizon = f" over the next {days} days" if days else ""
+        for eid in req.json.get("employee_ids") or ():
+            employee = self._employee(req, eid, aid)
+            self._email(req, employee, LETTER_SUBJECT, (
+                f"Hi {employee['name']},\n\n"
+                "Your capability journey is about to begin, but there's one important step\n"
+                "left—your letter to yourself. This letter is your personal commitment, a message\n"
+                f"from your present self to the person you want to become{horizon}.\n\n"
+                f"Write your letter here:\n{self._link(aid, employee, 'letter')}\n\n"
+                "The Acceler8 team\n"
+            ))
+        return _ok()
+
+    @route("GET", f"{V1}/assessment/{{aid}}/letter/export")
+    def export_letters(self, req, aid):
+        self._assessment(req, aid)
+        rows = [LETTER_EXPORT_HEADERS]
+        for (a, eid), letter in self.letters.items():
+            if a == aid:
+                employee = self.employees[eid]
+                content = letter["content"]
+                rows.append([employee["name"], employee["email"], letter["_submitted_at"],
+                             *(content.get(str(i)) for i in range(7))])
+        data = b"".join(stream_xlsx(rows, title="Letters"))
+        return 200, _File(data, "letters.xlsx")
+
+    @route("POST", f"{V1}/assessment/{{aid}}/employee/{{eid}}/letter")
+    def submit_letter(self, req, aid, eid):
+        self._employee(req, eid, aid)
+        content = req.json.get("content")
+        if not isinstance(content, dict):
+            raise _HttpError(400, "content is required")
+        letter = self.letters.setdefault((aid, eid), {"id": _new_id(), "_employee": eid})
+        letter.update({"content": content, "letter_submitted": True,
+                       "_submitted_at": datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)})
+        return _ok(self._letter_json(letter))
+
+    @route("GET", f"{V1}/assessment/{{aid}}/employee/{{eid}}/letter")
+    def get_letter(self, req, aid, eid):
+        self._employee(req, eid, aid)
+        if (aid, eid) not in self.letters:
+            raise _HttpError(404, "Letter not found")
+        return _ok(self._letter_json(self.letters[(aid, eid)]))
+
+    # Onboarding
+
+    @route("POST", f"{V1}/assessment/{{aid}}/onboarding/home")
+    def save_onboarding(self, req, aid):
+        self._assessment(req, aid)
+        body = req.json
+        if not body.get("program_name"):
+            raise _HttpError(400, "program_name is required")
+        home = self.onboarding[aid] = {
+            "program_name": body["program_name"],
+            "number_of_days": body.get("number_of_days"),
+            "service_personalization": sorted(body.get("service_personalization") or [],
+                                              key=lambda s: s.get("position", 0)),
+        }
+        return _ok(home)
+
+    @route("GET", f"{V1}/assessment/{{aid}}/onboarding/home")
+    def get_onboarding(self, req, aid):
+        self._assessment(req, aid)
+        if req.query.get("employee_id"):
+            self._employee(req, req.query["employee_id"], aid)
+        if aid not in self.onboarding:
+            raise _HttpError(404, "Onboarding not set up")
+        return _ok(self.onboarding[aid])
+
+    @route("POST", f"{V1}/assessment/{{aid}}/onboarding/email")
+    def send_onboarding_email(self, req, aid):
+        self._assessment(req, aid)
+        home = self.onboarding.get(aid)
+        if home is None:
+            raise _HttpError(404, "Onboarding not set up")
+        for employee in self._staff(aid):
+            self._email(req, employee, f"Welcome to {home['program_name']}",
+                        f"Hi {employee['name']},\n\nWelcome to {home['program_name']}. Get started here:\n"
+                        f"{self._link(aid, employee, 'onboarding')}\n\nThe Acceler8 team\n")
+        return _ok()
+
+    # Server
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self._http.server_port}"
+
+    def start(self) -> "FakeAcceler8":
+        fake = self
+
+        class Handler(_ApiHandler):
+            backend = fake
+
+        self._http = _Server((self.host, self.port), Handler)
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        if self.state_dir is not None:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+            self.state_dir = None
+
+    def handle(self, method: str, path: str, query: dict, body: bytes, content_type: str, authorization: str):
+        """Route one request; returns (status, JSON body, a _File or None)"""
+        matches = [(verb, fn, access, m) for verb, pattern, fn, access in _ROUTES if (m := pattern.fullmatch(path))]
+        if not matches:
+            return 404, {"status": 404, "message": f"No route for {path}"}
+        found = next((r for r in matches if r[0] == method), None)
+        if found is None:
+            return 405, {"status": 405, "message": f"{method} not allowed on {path}"}
+        _, fn, access, match = found
+        valid, org = self._caller(authorization)
+        if access != PUBLIC and not valid:
+            return 401, {"status": 401, "message": "Unauthorized"}
+        if access == ORG and org is None:
+            return 403, {"status": 403, "message": "Switch to an organisation first"}
+        req = _Request(query, body, content_type, org)
+        try:
+            with self._lock:
+                status, payload = fn(self, req, **match.groupdict())
+        except _HttpError as exc:
+            status, payload = exc.status, {"status": exc.status, "message": exc.message}
+        except Exception as exc:
+            status, payload = 500, {"status": 500, "message": f"Internal Server Error: {exc!r}"}
+        self._deliver(req.mail)
+        return status, payload
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Load tools open many connections at once; the default backlog is 5
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # Headers and body leave in one write, so keep-alive clients never wait on a delayed ACK
+    backend: FakeAcceler8 = None
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        """The request body, also when it was sent with chunked transfer encoding"""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while size := int(self.rfile.readline().split(b";")[0], 16):
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                pass  # Trailers
+            return b"".join(chunks)
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _dispatch(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, payload = self.backend.handle(
+            self.command, url.path.rstrip("/") or "/", query, self._body(),
+            self.headers.get("Content-Type", ""), self.headers.get("Authorization", ""),
+        )
+        self.send_response(status)
+        if isinstance(payload, _File):
+            data = payload.data
+            self.send_header("Content-Type", payload.content_type)
+            self.send_header("Content-Disposition", f'attachment; filename="{payload.filename}"')
+        else:
+            data = json.dumps(payload).encode() if payload is not None else b""
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+
+def serve_in_env() -> FakeAcceler8:
+    """
+    Start a fake backend and point this process's Acceler8 settings at it
+    Must run before config is imported. Emails go to MAILTM_SMTP when the fake Mail.tm is serving;
+    the token store, run journal and page-size cache get throwaway paths
+    """
+    fake = FakeAcceler8(smtp=os.getenv("MAILTM_SMTP")).start()
+    state = fake.state_dir = tempfile.mkdtemp(prefix="fake-acceler8-")
+    os.environ["ACCELER8_API_HOST"] = fake.url
+    os.environ["ACCELER8_TOKEN"] = fake.account_token
+    os.environ["ORG_ID"] = fake.org_id
+    os.environ["ACCELER8_TOKEN_CACHE"] = os.path.join(state, "org_tokens.json")
+    os.environ["ACCELER8_JOURNAL_DIR"] = os.path.join(state, "journal")
+    os.environ["ACCELER8_PAGE_SIZE_CACHE"] = os.path.join(state, "page_sizes.json")
+    return fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the in-process Acceler8 stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+
+    fake = FakeAcceler8(args.host, port=args.port, smtp=os.getenv("MAILTM_SMTP")).start()
+    print(f"ACCELER8_API_HOST={fake.url}")
+    print(f"ACCELER8_TOKEN={fake.account_token}")
+    print(f"ORG_ID={fake.org_id}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+In-process stand-in for the Mail.tm API and an SMTP sink that delivers into it
+Serves the endpoints the suite uses (/domains, /accounts, /token, /messages,
+/messages/{id}) and the account Mercure topics, so email tests run offline.
+Only uses the standard library, so it can start before config/client are imported.
+
+Start it for a test run with MAILTM_FAKE=1, or directly:
+    fake = FakeMailTm().start()
+    fake.deliver("someone@mailtm.test", "Subject", "Body")
+"""
+import email
+import email.policy
+import json
+import os
+import re
+import secrets
+import shutil
+import socketserver
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+from email.utils import getaddresses, parseaddr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DOMAIN = "mailtm.test"
+PAGE_SIZE = 30  # Messages per /messages page, as on Mail.tm
+HEARTBEAT = 15  # Seconds between keep-alive comments on event streams
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class _Mailbox:
+    def __init__(self, address: str, password: str):
+        self.id = uuid.uuid4().hex[:24]
+        self.address = address
+        self.password = password
+        self.messages = []  # Newest first
+        self.created_at = _now()
+
+
+class FakeMailTm:
+    """Mail.tm accounts and inboxes held in memory, served over HTTP and SMTP"""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self.host = host
+        self._mailboxes = {}  # address -> _Mailbox
+        self._tokens = {}  # token -> _Mailbox
+        self._subscribers = {}  # account id -> [queue of events]
+        self._lock = threading.Condition()
+        self.undelivered = []  # (recipient, subject) for addresses with no account
+        self._http = None
+        self.state_dir = None  # Throwaway settings directory from serve_in_env, removed by stop()
+        self._smtp = None
+
+    # Mailbox state
+
+    def create_account(self, address: str, password: str) -> _Mailbox:
+        with self._lock:
+            if address.lower() in self._mailboxes:
+                raise ValueError(f"{address} already exists")
+            mailbox = self._mailboxes[address.lower()] = _Mailbox(address, password)
+            return mailbox
+
+    def deliver(self, to: str, subject: str, text: str = "", *, sender: str = "noreply@acceler8.test",
+                html: str | None = None) -> dict | None:
+        """Put a message in an inbox; returns the message, or None when no account has that address"""
+        with self._lock:
+            mailbox = self._mailboxes.get(to.lower())
+            if mailbox is None:
+                self.undelivered.append((to, subject))
+                return None
+            message = {
+                "@id": "", "@type": "Message",
+                "id": uuid.uuid4().hex[:24],
+                "accountId": f"/accounts/{mailbox.id}",
+                "msgid": f"<{uuid.uuid4().hex}@{DOMAIN}>",
+                "from": {"address": sender, "name": ""},
+                "to": [{"address": mailbox.address, "name": ""}],
+                "cc": [], "bcc": [],
+                "subject": subject,
+                "intro": text[:120],
+                "text": text,
+                "html": [html] if html else [],
+                "seen": False, "isDeleted": False, "hasAttachments": False,
+                "size": len(text.encode()),
+                "createdAt": _now(), "updatedAt": _now(),
+            }
+            message["@id"] = f"/messages/{message['id']}"
+            message["downloadUrl"] = f"/messages/{message['id']}/download"
+            mailbox.messages.insert(0, message)
+            for queue in self._subscribers.get(mailbox.id, []):
+                queue.append(_summary(message))
+            self._lock.notify_all()
+            return message
+
+    def deliver_mime(self, raw: bytes, recipients):
+        """Deliver a raw RFC 5322 message, as received over SMTP"""
+        msg = email.message_from_bytes(raw, policy=email.policy.default)
+        text = msg.get_body(("plain",))
+        html = msg.get_body(("html",))
+        for to in recipients:
+            self.deliver(
+                to, str(msg.get("Subject", "")),
+                # Mail.tm hands back text with the SMTP line endings turned into \n
+                text.get_content().replace("\r\n", "\n") if text is not None else "",
+                sender=parseaddr(str(msg.get("From", "")))[1] or "unknown@sender",
+                html=html.get_content() if html is not None else None,
+            )
+
+    def inbox(self, address: str) -> list[dict]:
+        with self._lock:
+            mailbox = self._mailboxes.get(address.lower())
+            return list(mailbox.messages) if mailbox else []
+
+    # Servers
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self._http.server_port}"
+
+    @property
+    def mercure_url(self) -> str:
+        return f"{self.url}/.well-known/mercure"
+
+    @property
+    def smtp_address(self) -> tuple[str, int]:
+        return self.host, self._smtp.server_address[1]
+
+    def start(self) -> "FakeMailTm":
+        fake = self
+
+        class Handler(_ApiHandler):
+            mailtm = fake
+
+        class SmtpHandler(_SmtpHandler):
+            mailtm = fake
+
+        self._http = ThreadingHTTPServer((self.host, 0), Handler)
+        self._http.daemon_threads = True
+        self._smtp = socketserver.ThreadingTCPServer((self.host, 0), SmtpHandler)
+        self._smtp.daemon_threads = True
+        for server in (self._http, self._smtp):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._subscribers.clear()
+            self._lock.notify_all()
+        for server in (self._http, self._smtp):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        self._http = self._smtp = None
+        if self.state_dir is not None:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+            self.state_dir = None
+
+
+def _summary(message: dict) -> dict:
+    return {k: v for k, v in message.items() if k not in ("text", "html", "cc", "bcc")}
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mailtm: FakeMailTm = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body=None, content_type: str = "application/ld+json"):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _mailbox(self) -> _Mailbox | None:
+        auth = self.headers.get("Authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else None
+        mailbox = self.mailtm._tokens.get(token)
+        if mailbox is None:
+            self._send(401, {"code": 401, "message": "JWT Token not found"})
+        return mailbox
+
+    def _account(self, mailbox: _Mailbox) -> dict:
+        return {"@id": f"/accounts/{mailbox.id}", "@type": "Account", "id": mailbox.id,
+                "address": mailbox.address, "quota": 40000000, "used": 0,
+                "isDisabled": False, "isDeleted": False,
+                "createdAt": mailbox.created_at, "updatedAt": mailbox.created_at}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/domains":
+            return self._send(200, {"hydra:member": [{
+                "@id": "/domains/1", "@type": "Domain", "id": "1", "domain": DOMAIN,
+                "isActive": True, "isPrivate": False,
+            }], "hydra:totalItems": 1})
+        if url.path == "/.well-known/mercure":
+            return self._stream(query.get("topic", []))
+        mailbox = self._mailbox()
+        if mailbox is None:
+            return
+        if url.path == "/me":
+            return self._send(200, self._account(mailbox))
+        if url.path == "/messages":
+            page = int(query.get("page", ["1"])[0])
+            with self.mailtm._lock:
+                messages = mailbox.messages[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+                total = len(mailbox.messages)
+            return self._send(200, {"hydra:member": [_summary(m) for m in messages], "hydra:totalItems": total})
+        match = re.fullmatch(r"/messages/(\w+)", url.path)
+        if match:
+            for message in mailbox.messages:
+                if message["id"] == match.group(1):
+                    return self._send(200, message)
+        self._send(404, {"code": 404, "message": "Not Found"})
+
+    def do_POST(self):
+        body = self._json()
+        address, password = body.get("address", ""), body.get("password", "")
+        if self.path == "/accounts":
+            if not address.endswith(f"@{DOMAIN}") or not password:
+                return self._send(422, {"violations": [{"propertyPath": "address", "message": "Invalid address"}]})
+            try:
+                mailbox = self.mailtm.create_account(address, password)
+            except ValueError:
+                return self._send(422, {"violations": [{"propertyPath": "address", "message": "Already used"}]})
+            return self._send(201, self._account(mailbox))
+        if self.path == "/token":
+            mailbox = self.mailtm._mailboxes.get(address.lower())
+            if mailbox is None or mailbox.password != password:
+                return self._send(401, {"code": 401, "message": "Invalid credentials."})
+            token = secrets.token_hex(16)
+            self.mailtm._tokens[token] = mailbox
+            return self._send(200, {"id": mailbox.id, "token": token})
+        self._send(404, {"code": 404, "message": "Not Found"})
+
+    def do_DELETE(self):
+        mailbox = self._mailbox()
+        if mailbox is None:
+            return
+        path = urlparse(self.path).path
+        fake = self.mailtm
+        with fake._lock:
+            if path == f"/accounts/{mailbox.id}":
+                fake._mailboxes.pop(mailbox.address.lower(), None)
+                for token in [t for t, m in fake._tokens.items() if m is mailbox]:
+                    del fake._tokens[token]
+                return self._send(204)
+            match = re.fullmatch(r"/messages/(\w+)", path)
+            if match:
+                before = len(mailbox.messages)
+                mailbox.messages = [m for m in mailbox.messages if m["id"] != match.group(1)]
+                if len(mailbox.messages) < before:
+                    return self._send(204)
+        self._send(404, {"code": 404, "message": "Not Found"})
+
+    def _stream(self, topics):
+        """Mercure subscription: pushes each message delivered to the subscribed accounts"""
+        fake = self.mailtm
+        account_ids = [t.rsplit("/", 1)[1] for t in topics if t.startswith("/accounts/")]
+        queue = []
+        with fake._lock:
+            for account_id in account_ids:
+                fake._subscribers.setdefault(account_id, []).append(queue)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.close_connection = True
+
+        def write(chunk: bytes):
+            # Chunked like the real hub, so clients see each event as soon as it is sent
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+
+        try:
+            write(b":\n\n")
+            while True:
+                with fake._lock:
+                    if not queue:
+                        fake._lock.wait(HEARTBEAT)
+                    if not any(queue is q for qs in fake._subscribers.values() for q in qs):
+                        return  # Server stopping
+                    events, queue[:] = list(queue), []
+                write(b"".join(f"event: update\ndata: {json.dumps(e)}\n\n".encode() for e in events) or b":\n\n")
+        except OSError:
+            pass
+        finally:
+            with fake._lock:
+                for account_id in account_ids:
+                    queues = fake._subscribers.get(account_id, [])
+                    if any(q is queue for q in queues):
+                        queues[:] = [q for q in queues if q is not queue]
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP receiver; accepted mail is delivered into the fake inboxes"""
+
+    mailtm: FakeMailTm = None
+
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply(f"220 {DOMAIN} fake Mail.tm ESMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                self._reply(f"250 {DOMAIN}")
+            elif command.upper().startswith("MAIL FROM:"):
+                recipients = []
+                self._reply("250 OK")
+            elif command.upper().startswith("RCPT TO:"):
+                recipients.extend(a for _, a in getaddresses([command[8:].strip()]) if a)
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                self.mailtm.deliver_mime(b"".join(lines), recipients)
+                recipients = []
+                self._reply("250 OK queued")
+            elif verb == "RSET":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+def serve_in_env() -> FakeMailTm:
+    """
+    Start a fake and point this process's Mail.tm settings at it
+    Must run before client is imported; the account pool and rate limiter get
+    throwaway state so the real pool is never touched
+    """
+    fake = FakeMailTm().start()
+    state = fake.state_dir = tempfile.mkdtemp(prefix="fake-mailtm-")
+    os.environ["MAILTM_API"] = fake.url
+    os.environ["MAILTM_MERCURE_URL"] = fake.mercure_url
+    os.environ["MAILTM_SMTP"] = "%s:%d" % fake.smtp_address
+    os.environ["MAILTM_POOL_DIR"] = os.path.join(state, "pool")
+    os.environ["MAILTM_BUCKET_PATH"] = os.path.join(state, "bucket.json")
+    os.environ["MAILTM_RATE"] = "1000"
+    return fake
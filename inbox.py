@@ -0,0 +1,288 @@
+"""
+Mail.tm inbox waiting
+InboxWaiter subscribes to one account's Mercure event stream and reads /messages as soon as
+anything happens on the account, with exponential-backoff polling as the fallback.
+InboxDispatcher serves many concurrent expectations across a pool of inboxes from one
+batch-fetching thread.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from client import MAILTM_API, mail
+
+MERCURE_URL = os.getenv("MAILTM_MERCURE_URL", "https://mercure.mail.tm/.well-known/mercure")
+
+TIMEOUT = 60  # Seconds to wait for a message
+FIRST_POLL = 0.5  # Seconds before the first fallback poll, doubled after each one
+MAX_POLL = 1.0  # Fallback poll cap, so a missed event costs at most a second
+RECONNECT = 1.0  # Seconds between event stream reconnects
+DISPATCH_INTERVAL = 1.0  # Seconds between batch fetches while expectations are pending
+FETCH_CONCURRENCY = 8  # Inboxes fetched at once by the dispatcher
+
+
+def iter_events(lines):
+    """Parse server-sent event lines into (event, data) pairs"""
+    event, data = "message", []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode()
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue  # Heartbeat comment
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+
+
+class InboxWaiter:
+    """Waits for one message in a Mail.tm inbox"""
+
+    def __init__(self, account_id: str, token: str, *, client=mail, mercure_url: str = MERCURE_URL):
+        self.account_id = account_id
+        self.client = client
+        self.mercure_url = mercure_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self._found = None
+        self._lock = threading.Lock()
+        self._arrived = threading.Event()
+        self._activity = threading.Event()  # Set by the listener on any event for the account
+        self._stop = threading.Event()
+        self._stream = None
+        self.pushed = False  # True when the message came from the event stream
+
+    def _offer(self, message: dict, match, pushed: bool):
+        # The listener and the poller both offer; the first match wins
+        with self._lock:
+            if self._found is None and (match is None or match(message)):
+                self._found = message
+                self.pushed = pushed
+                self._arrived.set()
+
+    def _listen(self, match):
+        while not self._stop.is_set():
+            try:
+                with self.client.get(
+                    self.mercure_url,
+                    params={"topic": f"/accounts/{self.account_id}"},
+                    headers={**self.headers, "Accept": "text/event-stream"},
+                    stream=True,
+                    timeout=(5, 30),
+                ) as r:
+                    if r.status_code != 200:
+                        return  # No event stream for this account; polling carries on alone
+                    self._stream = r
+                    for _, data in iter_events(r.iter_lines(decode_unicode=True)):
+                        try:
+                            payload = json.loads(data)
+                        except ValueError:
+                            continue
+                        if payload.get("@type") == "Message" or "subject" in payload:
+                            self._offer(payload, match, True)
+                        # Account updates (used quota, seen flags) may be all that is pushed,
+                        # so any event means /messages is read again now
+                        self._activity.set()
+                        if self._stop.is_set():
+                            return
+            except Exception:
+                if self._stop.is_set():
+                    return
+            self._stop.wait(RECONNECT)
+
+    def _poll(self, match):
+        r = self.client.get(f"{MAILTM_API}/messages", headers=self.headers)
+        r.raise_for_status()
+        for message in r.json()["hydra:member"]:
+            self._offer(message, match, False)
+
+    def wait(self, *, match=None, timeout: float = TIMEOUT) -> dict | None:
+        """
+        Return the first message accepted by match (any message when None), or None on timeout
+        The inbox is read once up front, so messages that arrived earlier are found too
+        """
+        deadline = time.monotonic() + timeout
+        listener = threading.Thread(target=self._listen, args=(match,), daemon=True)
+        listener.start()
+        try:
+            delay = FIRST_POLL
+            while True:
+                self._poll(match)
+                remaining = deadline - time.monotonic()
+                if self._arrived.is_set() or remaining <= 0:
+                    break
+                if self._activity.wait(min(delay, remaining)):
+                    self._activity.clear()
+                    continue
+                delay = min(delay * 2, MAX_POLL)
+            return self._found
+        finally:
+            self._stop.set()
+            self._hang_up()
+
+    def _hang_up(self):
+        """Shut the event stream's socket so the listener's blocked read returns now"""
+        conn = getattr(getattr(self._stream, "raw", None), "connection", None)
+        sock = getattr(conn, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def wait_for_message(account: dict, *, match=None, timeout: float = TIMEOUT) -> dict | None:
+    """Wait for a message in the inbox of a mailtm_account fixture value"""
+    return InboxWaiter(account["account_id"], account["token"]).wait(match=match, timeout=timeout)
+
+
+def subject_matcher(subject=None):
+    """Build a message matcher from a subject substring, a callable, or None for any message"""
+    if subject is None or callable(subject):
+        return subject
+    return lambda message: subject in (message.get("subject") or "")
+
+
+class InboxDispatcher:
+    """
+    One poller for every inbox in a run
+    Tests register the inboxes they own and expect() messages by recipient and subject;
+    each fetch round reads every inbox that has pending expectations, in parallel, and
+    routes new messages to the oldest matching expectation. Messages nobody expects yet
+    are kept, so expecting after the send still finds them.
+    """
+
+    def __init__(self, client=mail, *, interval: float = DISPATCH_INTERVAL,
+                 concurrency: int = FETCH_CONCURRENCY):
+        self.client = client
+        self.interval = interval
+        self._accounts = {}  # address -> mailtm account dict
+        self._seen = {}  # address -> message ids already routed or kept
+        self._unclaimed = {}  # address -> messages no expectation has taken
+        self._waiting = {}  # address -> [(matcher, future)]
+        self._wake = threading.Condition()
+        self._closed = False
+        self._fetcher = ThreadPoolExecutor(concurrency, thread_name_prefix="inbox")
+        self._thread = threading.Thread(target=self._run, name="inbox-dispatcher", daemon=True)
+        self._thread.start()
+        self.fetches = 0
+
+    def register(self, account: dict):
+        """Add an inbox (a mailtm_account fixture value) to the pool"""
+        address = account["address"].lower()
+        with self._wake:
+            self._accounts[address] = account
+            self._seen.setdefault(address, set())
+            self._unclaimed.setdefault(address, [])
+
+    def expect(self, recipient: str, subject=None) -> Future:
+        """
+        Return a future resolved with the next message to recipient matching subject
+        subject is a substring of the subject line, a callable taking the message, or None
+        """
+        address = recipient.lower()
+        match = subject_matcher(subject)
+        future = Future()
+        with self._wake:
+            if address not in self._accounts:
+                raise KeyError(f"{recipient} is not a registered inbox")
+            unclaimed = self._unclaimed[address]
+            for i, message in enumerate(unclaimed):
+                if match is None or match(message):
+                    future.set_result(unclaimed.pop(i))
+                    return future
+            self._waiting.setdefault(address, []).append((match, future))
+            self._wake.notify()
+        return future
+
+    def _fetch(self, address: str):
+        """
+        Read an inbox newest first, page by page, until a page reaches messages already seen
+        Returns (address, last response, messages); messages is None when a page could not be read
+        """
+        headers = {"Authorization": f"Bearer {self._accounts[address]['token']}"}
+        messages, page = [], 1
+        while True:
+            try:
+                r = self.client.get(f"{MAILTM_API}/messages", params={"page": page}, headers=headers)
+            except Exception:
+                return address, None, None  # Network hiccup; try again next round
+            if r.status_code >= 400:
+                return address, r, None
+            body = r.json()
+            members = body["hydra:member"]
+            messages.extend(members)
+            with self._wake:
+                caught_up = any(message["id"] in self._seen[address] for message in members)
+            if caught_up or not members or len(messages) >= body.get("hydra:totalItems", 0):
+                return address, r, messages
+            page += 1
+
+    def _route(self, address: str, messages):
+        with self._wake:
+            seen = self._seen[address]
+            waiting = self._waiting.get(address, [])
+            for message in reversed(messages):  # Mail.tm lists newest first
+                if message["id"] in seen:
+                    continue
+                seen.add(message["id"])
+                for i, (match, future) in enumerate(waiting):
+                    if match is None or match(message):
+                        waiting.pop(i)
+                        future.set_result(message)
+                        break
+                else:
+                    self._unclaimed[address].append(message)
+
+    def _fail(self, address: str, error: Exception):
+        with self._wake:
+            for _, future in self._waiting.pop(address, []):
+                future.set_exception(error)
+
+    def _pending(self) -> list[str]:
+        """Addresses with live expectations; cancelled futures are dropped"""
+        pending = []
+        for address, waiting in self._waiting.items():
+            waiting[:] = [(m, f) for m, f in waiting if not f.cancelled()]
+            if waiting:
+                pending.append(address)
+        return pending
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._closed and not self._pending():
+                    self._wake.wait()
+                if self._closed:
+                    return
+                addresses = self._pending()
+            for address, r, messages in self._fetcher.map(self._fetch, addresses):
+                self.fetches += 1
+                if r is None or r.status_code == 429:
+                    continue  # Rate limited or unreachable; try again next round
+                if r.status_code >= 400:
+                    self._fail(address, RuntimeError(f"Mail.tm inbox {address}: {r.status_code} {r.text}"))
+                    continue
+                self._route(address, messages)
+            with self._wake:
+                if not self._closed:
+                    self._wake.wait(self.interval)
+
+    def close(self):
+        with self._wake:
+            self._closed = True
+            for waiting in self._waiting.values():
+                for _, future in waiting:
+                    future.cancel()
+            self._wake.notify()
+        self._thread.join()
+        self._fetcher.shutdown()
@@ -0,0 +1,145 @@
+"""
+Crash-safe journal of resources created during a test run
+Every create is appended (and fsynced) before the test uses the resource, and every
+delete is appended once it succeeds, so a killed run leaves a file listing what leaked.
+Each process holds an exclusive lock on its own journal for as long as it runs;
+sweeper.py treats journals it can lock as belonging to dead runs.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+from config import API_HOST
+
+try:
+    import fcntl
+except ImportError:  # Windows: liveness falls back to the pid recorded in the journal
+    fcntl = None
+
+JOURNAL_DIR = os.getenv(
+    "ACCELER8_JOURNAL_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "acceler8", "journal"),
+)
+
+CREATED = "created"
+DELETED = "deleted"
+
+
+class Journal:
+    """Append-only record of one process's creates and deletes, opened on first write"""
+
+    def __init__(self, directory: str = JOURNAL_DIR):
+        self.directory = directory
+        self.path = None
+        self._fd = None
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def _append(self, entry: dict):
+        if self._fd is None:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+            self.path = os.path.join(self.directory, name)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            write_entry(self._fd, {"host": API_HOST, "pid": os.getpid(), "node": socket.gethostname(),
+                                   "at": time.time()})
+        write_entry(self._fd, entry)
+
+    def created(self, kind: str, resource_id, *, parent: tuple | None = None, org=None, **details):
+        """Record a resource before anything else can fail; details are kept for the sweeper"""
+        entry = {"event": CREATED, "kind": kind, "id": resource_id, "org": org,
+                 "parent": list(parent) if parent else None, **details}
+        with self._lock:
+            self._append(entry)
+            self._open.add((kind, resource_id))
+
+    def deleted(self, kind: str, resource_id):
+        with self._lock:
+            if (kind, resource_id) in self._open:
+                self._append({"event": DELETED, "kind": kind, "id": resource_id})
+                self._open.discard((kind, resource_id))
+
+    def close(self):
+        """Release the journal; it is removed when nothing it recorded is left"""
+        with self._lock:
+            if self._fd is None:
+                return
+            os.close(self._fd)
+            self._fd = None
+            if not self._open:
+                os.remove(self.path)
+
+
+def write_entry(fd: int, entry: dict):
+    """Append one entry; a single write on an O_APPEND descriptor never leaves half a line"""
+    os.write(fd, (json.dumps(entry) + "\n").encode())
+    os.fsync(fd)
+
+
+def read(path: str) -> tuple[dict, list[dict]]:
+    """Return a journal's header and the created entries that have no matching delete"""
+    header, entries = {}, {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn final line from a crash mid-write
+            event = entry.get("event")
+            if event is None:
+                header = entry
+            elif event == CREATED:
+                entries[(entry["kind"], entry["id"])] = entry
+            elif event == DELETED:
+                entries.pop((entry["kind"], entry["id"]), None)
+    return header, list(entries.values())
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim_dead(directory: str = JOURNAL_DIR):
+    """
+    Yield (path, fd) for each journal whose run is no longer alive
+    The caller owns the lock on fd and closes it when done with the journal
+    """
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            continue  # Swept or closed cleanly in the meantime
+        if fcntl:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+        else:
+            header, _ = read(path)
+            if header.get("node") == socket.gethostname() and _pid_alive(header.get("pid")):
+                os.close(fd)
+                continue
+        yield path, fd
+
+
+# Journal of this process
+journal = Journal()
@@ -0,0 +1,168 @@
+"""
+Persistent pool of Mail.tm accounts reused across test runs
+Accounts are created once and kept in a small store; a run leases one by holding an
+flock on its lock file (released automatically if the run dies) and the inbox is purged
+on lease instead of the account being recreated.
+"""
+import json
+import os
+import random
+import string
+from concurrent.futures import ThreadPoolExecutor
+
+from cleanup import GONE, MAIL_ACCOUNT
+from client import MAILTM_API, mail
+from journal import journal as run_journal
+
+try:
+    import fcntl
+except ImportError:  # Windows: accounts are created per lease, journaled and not shared
+    fcntl = None
+
+MAILTM_POOL_DIR = os.getenv(
+    "MAILTM_POOL_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "acceler8", "mailtm"),
+)
+PURGE_CONCURRENCY = 4  # Message deletes in flight while purging an inbox
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client=mail) -> dict:
+    """Create a Mail.tm account on the first available domain"""
+    r = client.get(f"{MAILTM_API}/domains")
+    assert r.status_code == 200, r.text
+    domains = r.json()["hydra:member"]
+    assert domains, "No Mail.tm domains available"
+    domain = domains[0]["domain"]
+
+    local = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    address = f"{local}@{domain}"
+    password = "".join(random.choices(string.ascii_letters + string.digits, k=12))
+
+    r = client.post(f"{MAILTM_API}/accounts", json={"address": address, "password": password})
+    assert r.status_code == 201, r.text
+    return {"address": address, "password": password, "account_id": r.json()["id"]}
+
+
+def login(account: dict, client=mail) -> str | None:
+    """Get a token for an account, or None when the account no longer exists"""
+    r = client.post(f"{MAILTM_API}/token", json={"address": account["address"], "password": account["password"]})
+    if r.status_code == 401:
+        return None
+    assert r.status_code == 200, r.text
+    return r.json()["token"]
+
+
+def purge(token: str, client=mail) -> int:
+    """Delete every message in an inbox; returns how many were removed"""
+    removed = 0
+    with ThreadPoolExecutor(PURGE_CONCURRENCY) as pool:
+        while True:
+            r = client.get(f"{MAILTM_API}/messages", headers=_auth(token))
+            assert r.status_code == 200, r.text
+            ids = [m["id"] for m in r.json()["hydra:member"]]
+            if not ids:
+                return removed
+            list(pool.map(lambda mid: client.delete(f"{MAILTM_API}/messages/{mid}", headers=_auth(token)), ids))
+            removed += len(ids)
+
+
+def _discard(accounts: list, account: dict):
+    if account in accounts:
+        accounts.remove(account)
+
+
+class MailAccountPool:
+    """
+    Leases reusable Mail.tm accounts to test modules
+    Without flock each lease is a new account, journaled so the sweeper deletes it after a crash
+    """
+
+    def __init__(self, directory: str = MAILTM_POOL_DIR, client=mail, *, journal=run_journal):
+        self.directory = directory
+        self.client = client
+        self.journal = journal
+        self.store_path = os.path.join(directory, "accounts.json")
+        self._leases = {}  # address -> lock file object
+
+    def _load(self) -> list:
+        try:
+            with open(self.store_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _save(self, accounts: list):
+        tmp = f"{self.store_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(accounts, f, indent=2)
+        os.replace(tmp, self.store_path)
+
+    def _edit_store(self, change):
+        """Apply change(accounts) to the store under the store lock"""
+        with open(f"{self.store_path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            accounts = self._load()
+            change(accounts)
+            self._save(accounts)
+
+    def _try_lease(self, account: dict) -> bool:
+        lock = open(os.path.join(self.directory, f"{account['account_id']}.lock"), "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return False
+        self._leases[account["address"]] = lock
+        return True
+
+    def _unlease(self, account: dict):
+        lock = self._leases.pop(account["address"], None)
+        if lock is not None:
+            lock.close()
+
+    def acquire(self) -> dict:
+        """
+        Lease a free account with an empty inbox, creating one when all are taken
+        Returns the mailtm_account dict: address, password, token and account_id
+        """
+        if fcntl is None:
+            account = create_account(self.client)
+            if self.journal is not None:
+                self.journal.created(MAIL_ACCOUNT, account["account_id"], address=account["address"],
+                                     password=account["password"])
+            return {**account, "token": login(account, self.client)}
+        os.makedirs(self.directory, exist_ok=True)
+        for account in self._load():
+            if not self._try_lease(account):
+                continue
+            token = login(account, self.client)
+            if token is None:
+                # Deleted on the Mail.tm side; forget it
+                self._unlease(account)
+                self._edit_store(lambda accounts: _discard(accounts, account))
+                continue
+            purge(token, self.client)
+            return {**account, "token": token}
+
+        account = create_account(self.client)
+        self._try_lease(account)
+        self._edit_store(lambda accounts: accounts.append(account))
+        return {**account, "token": login(account, self.client)}
+
+    def release(self, account: dict):
+        """Return an account to the pool; a later lease purges its inbox"""
+        if fcntl is None:
+            r = self.client.delete(f"{MAILTM_API}/accounts/{account['account_id']}", headers=_auth(account["token"]))
+            if r.status_code in GONE and self.journal is not None:
+                self.journal.deleted(MAIL_ACCOUNT, account["account_id"])
+            return
+        self._unlease(account)
+
+
+# Pool shared by every test module in this process
+mail_accounts = MailAccountPool()
@@ -0,0 +1,134 @@
+"""
+Streamed multipart/form-data bodies
+requests builds files= uploads in memory; multipart_body yields the same encoding part by
+part, reading file objects and chunk iterators as the body is sent, so requests transmits it
+with chunked transfer encoding and nothing larger than one chunk is held at a time.
+post_multipart also times the upload itself apart from the server's processing.
+"""
+import statistics
+import threading
+import time
+import uuid
+
+CHUNK_SIZE = 64 * 1024  # Bytes read from a file object at a time
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _chunks(source, chunk_size: int):
+    if isinstance(source, (bytes, bytearray)):
+        yield bytes(source)
+    elif isinstance(source, str):
+        yield source.encode()
+    elif hasattr(source, "read"):
+        while chunk := source.read(chunk_size):
+            yield chunk
+    else:
+        yield from (chunk for chunk in source if chunk)
+
+
+def multipart_body(fields: dict, *, chunk_size: int = CHUNK_SIZE, boundary: str | None = None):
+    """
+    Return (content type header, body generator) for a multipart form
+    Values are plain strings, or (filename, source, content type) tuples as in requests' files=,
+    where source is bytes, a file object or an iterator of byte chunks
+    """
+    boundary = boundary or uuid.uuid4().hex
+
+    def body():
+        for name, value in fields.items():
+            if isinstance(value, tuple):
+                filename, source, content_type = value
+                yield (
+                    f'--{boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+                    f'Content-Type: {content_type}\r\n\r\n'
+                ).encode()
+            else:
+                source = value
+                yield f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'.encode()
+            yield from _chunks(source, chunk_size)
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode()
+
+    return f"multipart/form-data; boundary={boundary}", body()
+
+
+class UploadTiming:
+    """
+    Size and timings of one streamed upload
+    upload_seconds runs from the first body chunk to the last one handed to the socket;
+    server_seconds from then until the response headers arrived
+    """
+
+    def __init__(self):
+        self.bytes = 0
+        self.upload_seconds = 0.0
+        self.server_seconds = 0.0
+
+    def wrap(self, body):
+        """Pass body chunks through, counting bytes and timing the send"""
+        start = None
+        for chunk in body:
+            if start is None:
+                start = time.perf_counter()
+            self.bytes += len(chunk)
+            yield chunk
+        self.upload_seconds = time.perf_counter() - start if start is not None else 0.0
+
+    def finish(self, response):
+        # elapsed covers sending the request through to parsing the response headers
+        self.server_seconds = max(0.0, response.elapsed.total_seconds() - self.upload_seconds)
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / 1e6 / self.upload_seconds if self.upload_seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.bytes / 1e6:.2f} MB in {self.upload_seconds:.2f}s ({self.mb_per_sec:.1f} MB/s), "
+                f"server {self.server_seconds * 1000:.0f}ms")
+
+
+class UploadStats:
+    """Upload timings collected over a run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = []
+
+    def add(self, timing: UploadTiming):
+        with self._lock:
+            self.timings.append(timing)
+
+    def summary(self) -> str | None:
+        with self._lock:
+            timings = list(self.timings)
+        if not timings:
+            return None
+        size = sum(t.bytes for t in timings)
+        seconds = sum(t.upload_seconds for t in timings)
+        rate = size / 1e6 / seconds if seconds else 0.0
+        server = statistics.median(t.server_seconds for t in timings)
+        return (f"{len(timings)} uploads, {size / 1e6:.2f} MB at {rate:.1f} MB/s, "
+                f"server processing median {server * 1000:.0f}ms")
+
+
+uploads = UploadStats()
+
+
+def post_multipart(client, url: str, fields: dict, *, headers: dict | None = None,
+                   chunk_size: int = CHUNK_SIZE, stats: UploadStats = uploads, **kwargs):
+    """
+    POST a multipart form as a streamed body and record its timings
+    The response gets an `upload` attribute holding its UploadTiming
+    """
+    content_type, body = multipart_body(fields, chunk_size=chunk_size)
+    timing = UploadTiming()
+    r = client.post(url, headers={**(headers or {}), "Content-Type": content_type},
+                    data=timing.wrap(body), **kwargs)
+    timing.finish(r)
+    r.upload = timing
+    stats.add(timing)
+    return r
@@ -0,0 +1,123 @@
+"""
+Adaptive page-size tuner for Acceler8 list endpoints
+Measures items/sec per page size and caches the best size per endpoint and host
+
+Usage: python page_tuner.py <assessment_id> [--retune]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from config import API_HOST
+from pagination import DEFAULT_PAGE_SIZE
+
+PAGE_SIZE_CACHE_PATH = os.getenv(
+    "ACCELER8_PAGE_SIZE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "acceler8", "page_sizes.json"),
+)
+CANDIDATE_SIZES = (10, 25, 50, 100, 200, 500, 1000)
+SAMPLES = 3  # Timed fetches per size; the median is used
+
+
+def _load_cache() -> dict:
+    try:
+        with open(PAGE_SIZE_CACHE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict):
+    os.makedirs(os.path.dirname(PAGE_SIZE_CACHE_PATH) or ".", exist_ok=True)
+    tmp = f"{PAGE_SIZE_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, PAGE_SIZE_CACHE_PATH)
+
+
+def measure(fetch_page, sizes=CANDIDATE_SIZES, samples: int = SAMPLES) -> list[dict]:
+    """
+    Time page 1 of an endpoint at each page size
+    Stops growing once a page comes back short, since larger sizes return the same items
+    """
+    results = []
+    for size in sizes:
+        latencies = []
+        items = 0
+        for _ in range(samples):
+            start = time.perf_counter()
+            page = fetch_page(1, size)
+            latencies.append(time.perf_counter() - start)
+            items = len(page.items)
+        latency = statistics.median(latencies)
+        results.append({
+            "size": size,
+            "items": items,
+            "latency": latency,
+            "items_per_sec": items / latency if latency else 0.0,
+        })
+        if items < size:
+            break
+    return results
+
+
+def tune(endpoint: str, fetch_page, *, sizes=CANDIDATE_SIZES, samples: int = SAMPLES,
+         default: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Measure an endpoint, cache the page size with the best items/sec and return it
+    Only an endpoint that fills a page at every size is tuned; with fewer items a short page
+    looks fast, so default is returned and nothing is cached, leaving tuning for a larger set
+    """
+    results = measure(fetch_page, sizes, samples)
+    if len(results) < len(sizes) or results[-1]["items"] < results[-1]["size"]:
+        return default
+    best = max(results, key=lambda r: r["items_per_sec"])
+    cache = _load_cache()
+    cache[f"{API_HOST} {endpoint}"] = {"size": best["size"], "measured": results, "at": time.time()}
+    _save_cache(cache)
+    return best["size"]
+
+
+def page_size(endpoint: str, fetch_page=None, *, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Get the cached page size for an endpoint on this host
+    Tunes it first when fetch_page is given and nothing is cached yet
+    """
+    entry = _load_cache().get(f"{API_HOST} {endpoint}")
+    if entry:
+        return entry["size"]
+    if fetch_page is not None:
+        return tune(endpoint, fetch_page, default=default)
+    return default
+
+
+def list_endpoints(sdk, assessment_id) -> dict:
+    """Page fetchers for every list endpoint of an assessment, keyed by endpoint name"""
+    return {
+        "employees": lambda n, s: sdk.employees.page(assessment_id, n, s),
+        "action-items": lambda n, s: sdk.action_items.page(assessment_id, n, s),
+        "prepare-contents": lambda n, s: sdk.prepare_contents.page(assessment_id, n, s),
+        "letters": lambda n, s: sdk.letters.page(assessment_id, n, s),
+    }
+
+
+def main(argv=None):
+    from sdk import Acceler8
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("assessment_id", help="Assessment whose list endpoints are measured")
+    parser.add_argument("--retune", action="store_true", help="Ignore cached sizes and measure again")
+    args = parser.parse_args(argv)
+
+    sdk = Acceler8()
+    for endpoint, fetch_page in list_endpoints(sdk, args.assessment_id).items():
+        size = tune(endpoint, fetch_page) if args.retune else page_size(endpoint, fetch_page)
+        tuned = f"{API_HOST} {endpoint}" in _load_cache()
+        print(f"{endpoint}: page size {size}" + ("" if tuned else
+              f" (default; needs {max(CANDIDATE_SIZES)} items to tune)"))
+
+
+if __name__ == "__main__":
+    main()
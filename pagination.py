@@ -0,0 +1,61 @@
+"""
+Prefetching pagination over Acceler8 list endpoints
+Streams every item across pages while the next page is already in flight
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def _is_last(page, number: int, size: int) -> bool:
+    """
+    Decide whether page number `number` is the final one
+    Uses the page count the API reported, falling back to total or a short page
+    """
+    if page.total_pages is not None:
+        return number >= page.total_pages
+    if page.total is not None:
+        return number * size >= page.total
+    return len(page.items) < size
+
+
+def iter_items(fetch_page, size: int = DEFAULT_PAGE_SIZE, *, start: int = 1):
+    """
+    Yield every item of a paged endpoint, fetching page N+1 while page N is consumed
+    fetch_page(number, size) must return an sdk.Page
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as pool:
+        number = start
+        pending = pool.submit(fetch_page, number, size)
+        try:
+            while pending is not None:
+                page = pending.result()
+                pending = None
+                if page.items and not _is_last(page, number, size):
+                    pending = pool.submit(fetch_page, number + 1, size)
+                yield from page.items
+                number += 1
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+
+async def aiter_items(fetch_page, size: int = DEFAULT_PAGE_SIZE, *, start: int = 1):
+    """
+    Async counterpart of iter_items; fetch_page(number, size) is a coroutine function
+    """
+    number = start
+    pending = asyncio.ensure_future(fetch_page(number, size))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if page.items and not _is_last(page, number, size):
+                pending = asyncio.ensure_future(fetch_page(number + 1, size))
+            for item in page.items:
+                yield item
+            number += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,37 @@
+"""
+Session-wide test resources created once, on first use
+Lets modules that only create children under an organisation share one instead of each
+creating its own; deleting them is left to the cleanup graph they register with
+"""
+import threading
+
+
+class PooledResource:
+    """A shared resource created by the first caller; concurrent callers wait for that one"""
+
+    def __init__(self, create):
+        self._create = create
+        self._lock = threading.Lock()
+        self.value = None
+        self.created = 0
+
+    def get(self):
+        with self._lock:
+            if self.value is None:
+                self.value = self._create()
+                self.created += 1
+            return self.value
+
+
+class ResourcePool:
+    """Named PooledResources"""
+
+    def __init__(self):
+        self._resources = {}
+
+    def register(self, name: str, create) -> PooledResource:
+        self._resources[name] = PooledResource(create)
+        return self._resources[name]
+
+    def __getitem__(self, name: str) -> PooledResource:
+        return self._resources[name]
@@ -0,0 +1,506 @@
+"""
+Typed Acceler8 SDK
+Resource classes own URL and payload construction; responses decode into compact models
+"""
+import json
+
+from config import ORG_HEADERS
+from client import api
+from page_tuner import page_size
+from pagination import aiter_items, iter_items
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, the stdlib parser gives identical results
+    _loads = json.loads
+
+V1 = "/backend/v1"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ApiError(Exception):
+    """Raised when an endpoint answers with an unexpected status code"""
+
+    def __init__(self, method: str, url: str, status_code: int, text: str):
+        super().__init__(f"{method} {url} -> {status_code}: {text[:500]}")
+        self.status_code = status_code
+        self.text = text
+
+
+# ---------------------------------------------------------------------------
+# Response models
+# ---------------------------------------------------------------------------
+
+class Model:
+    """
+    Base for compact __slots__ response models
+    Only the declared fields are kept; anything else in the payload is dropped
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, data: dict):
+        obj = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(obj, field, data.get(field))
+        return obj
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Organisation(Model):
+    __slots__ = ("id", "name", "internal_name", "colour_theme", "logo")
+
+
+class Assessment(Model):
+    __slots__ = ("id", "name", "assessment_type", "show_onboarding", "capabilities")
+
+
+class AssessmentSummary(Model):
+    __slots__ = ("total_employee_count", "self_assessment_completed_count")
+
+
+class Employee(Model):
+    __slots__ = ("id", "name", "email", "position", "title", "employee_code", "status", "manager")
+
+    @property
+    def manager_id(self):
+        return self.manager["id"] if self.manager else None
+
+
+class Question(Model):
+    __slots__ = (
+        "id", "question", "type", "status", "visibility", "capabilities",
+        "capabilities_label", "sub_capability", "options", "ranking", "sl_no",
+    )
+
+
+class ActionItem(Model):
+    __slots__ = ("id", "title", "send_date", "send_time", "recipients")
+
+
+class PrepareContent(Model):
+    __slots__ = ("id", "title", "send_date", "send_time", "completed_count", "uncompleted_recipients")
+
+
+class LetterTemplate(Model):
+    __slots__ = ("number_of_day", "reason_for_joining", "users_wish")
+
+
+class Letter(Model):
+    __slots__ = ("id", "content", "letter_submitted")
+
+
+class Onboarding(Model):
+    __slots__ = ("program_name", "number_of_days", "service_personalization")
+
+
+class Page:
+    """One page of a list endpoint: decoded items plus the paging fields the API reported"""
+    __slots__ = ("items", "current_page", "total_pages", "total")
+
+    def __init__(self, items, current_page=None, total_pages=None, total=None):
+        self.items = items
+        self.current_page = current_page
+        self.total_pages = total_pages
+        self.total = total
+
+
+# ---------------------------------------------------------------------------
+# Payload builders shared by tests, fixtures and load tools
+# ---------------------------------------------------------------------------
+
+def employee_payload(email: str, name: str, *, manager_email: str, manager_name: str,
+                     manager: dict | None = None, **fields) -> dict:
+    """
+    Body for POST /assessment/{id}/employee
+    Extra keyword arguments become employee profile fields; manager adds manager profile fields
+    """
+    return {
+        "email": email,
+        "name": name,
+        **fields,
+        "manager": {"email": manager_email, "name": manager_name, **(manager or {})},
+    }
+
+
+def content_payload(title: str, *, organisation_id, content: str = "", quizzes=(),
+                    send_date: str = "2025-06-10", send_time: str = "12:34:46",
+                    timezone: str = "Asia/Calcutta", send_to_all: bool = True,
+                    recipient_emails=()) -> dict:
+    """
+    Body for creating or updating an action item or prepare content item
+    quizzes is a sequence of question texts for subjective quizzes
+    """
+    return {
+        "title": title,
+        "embed_items": [{"id": 1, "type": "TEXT", "content": content}],
+        "attachments_title": "",
+        "quiz_title": "",
+        "send_date": send_date,
+        "send_time": send_time,
+        "timezone": timezone,
+        "attachments": [],
+        "quizzes": [
+            {
+                "id": i,
+                "type": "SUBJECTIVE",
+                "question": question,
+                "options": [],
+                "submitted": False,
+                "correct_options": [],
+                "correct_options_count": 0,
+            }
+            for i, question in enumerate(quizzes)
+        ],
+        "recipient_emails": list(recipient_emails),
+        "send_to_all": send_to_all,
+        "organisation_id": organisation_id,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Resources
+# ---------------------------------------------------------------------------
+
+class Resource:
+    def __init__(self, sdk):
+        self._call = sdk._call
+        self._paginate = sdk._paginate
+
+
+class Organisations(Resource):
+    def create(self, name: str, internal_name: str, *, colour_theme: str = "DRIVEN_RED",
+               logo: str | None = "comet.jpg"):
+        body = {"internal_name": internal_name, "name": name, "colour_theme": colour_theme}
+        if logo is not None:
+            body["logo"] = logo
+        return self._call("POST", f"{V1}/organisation", json=body, model=Organisation)
+
+    def get(self, org_id):
+        return self._call("GET", f"{V1}/organisation/{org_id}", model=Organisation)
+
+    def update(self, org_id, **body):
+        return self._call("PUT", f"{V1}/organisation/{org_id}", json=body, model=Organisation)
+
+    def delete(self, org_id):
+        return self._call("DELETE", f"{V1}/organisation/{org_id}", expect=(200, 204))
+
+
+class Assessments(Resource):
+    def create(self, name: str, *, capabilities=("TECHNICAL SKILLS 1",), assessment_type: str = "EMPLOYEE",
+               show_onboarding: bool = False, organisation_id=None):
+        body = {
+            "capabilities": list(capabilities),
+            "name": name,
+            "show_onboarding": show_onboarding,
+            "assessment_type": assessment_type,
+        }
+        if organisation_id is not None:
+            body["organisation_id"] = organisation_id
+        return self._call("POST", f"{V1}/assessment", json=body, model=Assessment)
+
+    def get(self, assessment_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}", model=Assessment)
+
+    def update(self, assessment_id, **body):
+        return self._call("PUT", f"{V1}/assessment/{assessment_id}", json=body, expect=200)
+
+    def delete(self, assessment_id):
+        return self._call("DELETE", f"{V1}/assessment/{assessment_id}", expect=(200, 204))
+
+    def list(self):
+        return self._call("GET", f"{V1}/assessments", model=Assessment, many=True)
+
+    def summary(self, assessment_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/summary", model=AssessmentSummary)
+
+    def set_result_visibility(self, assessment_id, visibility: str = "MANAGER_AND_EMPLOYEE"):
+        return self._call("PUT", f"{V1}/assessment/{assessment_id}/result/visibility",
+                          json={"result_visibility": visibility})
+
+
+class Employees(Resource):
+    def create(self, assessment_id, body: dict):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee", json=body,
+                          expect=201, model=Employee)
+
+    def get(self, employee_id):
+        return self._call("GET", f"{V1}/employee/{employee_id}", model=Employee)
+
+    def update(self, assessment_id, employee_id, **body):
+        return self._call("PUT", f"{V1}/assessment/{assessment_id}/employee/{employee_id}", json=body)
+
+    def delete(self, employee_id):
+        return self._call("DELETE", f"{V1}/employee/{employee_id}", expect=(200, 204))
+
+    def page(self, assessment_id, page: int = 1, size: int = 10):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/employees",
+                          params={"page": page, "size": size}, model=Employee, paged=True)
+
+    def iter_all(self, assessment_id, size: int | None = None):
+        """Stream every employee of the assessment across pages, using the tuned page size by default"""
+        return self._paginate(lambda n, s: self.page(assessment_id, n, s), size or page_size("employees"))
+
+    def by_code(self, assessment_id, code: str):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/employee/by_code",
+                          params={"code": code}, model=Employee)
+
+    def verify(self, assessment_id, employee_id):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee/{employee_id}/verify")
+
+    def share_link(self, assessment_id, employee_ids):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee/share-link",
+                          json={"employee_ids": list(employee_ids)})
+
+    def result_link(self, assessment_id, employee_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/employee/{employee_id}/result/link")
+
+    def subordinates(self, assessment_id, manager_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/manager/{manager_id}/subordinates",
+                          model=Employee)
+
+    def assessments(self, employee_id):
+        return self._call("GET", f"{V1}/employee/{employee_id}/assessments", model=Assessment, many=True)
+
+    def export(self, assessment_id, *, select_all: bool = True):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee/export",
+                          json={"select_all": select_all}, raw=True)
+
+    def upload(self, assessment_id, file, filename: str = "employees.xlsx"):
+        files = {"file": (filename, file, XLSX_MIME)}
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee/upload",
+                          files=files, json_body=False)
+
+    def submit_response(self, employee_id, assessment_id, responses, *, status: str = "SUBMITTED",
+                        assessment_type: str = "EMPLOYEE"):
+        body = {"responses": responses, "status": status, "assessment_type": assessment_type}
+        return self._call("POST", f"{V1}/employee/{employee_id}/assessment/{assessment_id}/response", json=body)
+
+
+class Questions(Resource):
+    """Assessment questions when assessment_id is given, master question bank otherwise"""
+
+    @staticmethod
+    def _base(assessment_id):
+        return f"{V1}/assessment/{assessment_id}/question" if assessment_id else f"{V1}/question"
+
+    def create(self, body: dict, assessment_id=None):
+        return self._call("POST", self._base(assessment_id), json=body, model=Question)
+
+    def get(self, question_id, assessment_id=None):
+        return self._call("GET", f"{self._base(assessment_id)}/{question_id}", model=Question)
+
+    def delete(self, question_id, assessment_id=None):
+        return self._call("DELETE", f"{self._base(assessment_id)}/{question_id}", expect=(200, 204))
+
+    def list(self, assessment_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/questions", model=Question, many=True)
+
+    def bulk(self, assessment_id=None, *, create=(), update=(), delete=()):
+        body = {
+            "questions_to_create": list(create),
+            "questions_to_update": list(update),
+            "question_ids_to_delete": list(delete),
+        }
+        return self._call("POST", f"{self._base(assessment_id)}/bulk", json=body, model=Question, many=True)
+
+
+class _ScheduledContent(Resource):
+    """Shared endpoints of action items and prepare content"""
+    segment = ""
+    model = None
+
+    def _base(self, assessment_id):
+        return f"{V1}/assessment/{assessment_id}/{self.segment}"
+
+    def create(self, assessment_id, body: dict):
+        return self._call("POST", self._base(assessment_id), json=body, model=self.model)
+
+    def get(self, assessment_id, item_id):
+        return self._call("GET", f"{self._base(assessment_id)}/{item_id}", model=self.model)
+
+    def update(self, assessment_id, item_id, body: dict):
+        return self._call("PUT", f"{self._base(assessment_id)}/{item_id}", json=body)
+
+    def delete(self, assessment_id, item_id):
+        return self._call("DELETE", f"{self._base(assessment_id)}/{item_id}", expect=(200, 204))
+
+    def page(self, assessment_id, page: int = 1, size: int = 10):
+        return self._call("GET", f"{self._base(assessment_id)}s",
+                          params={"page_number": page, "page_size": size}, model=self.model, paged=True)
+
+    def iter_all(self, assessment_id, size: int | None = None):
+        """Stream every item of the assessment across pages, using the tuned page size by default"""
+        size = size or page_size(f"{self.segment}s")
+        return self._paginate(lambda n, s: self.page(assessment_id, n, s), size)
+
+    def send_reminder(self, assessment_id, item_id, employee_ids):
+        return self._call("POST", f"{self._base(assessment_id)}/{item_id}/send-reminder",
+                          json={"employee_ids": list(employee_ids)})
+
+    def export_responses(self, assessment_id, item_id):
+        return self._call("GET", f"{self._base(assessment_id)}/{item_id}/responses/export", raw=True)
+
+    def for_employee(self, assessment_id, employee_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/employee/{employee_id}/{self.segment}s",
+                          model=self.model, many=True)
+
+    def submit(self, assessment_id, employee_id, item_id, response, *, completed=True):
+        url = f"{V1}/assessment/{assessment_id}/employee/{employee_id}/{self.segment}/{item_id}/submit"
+        return self._call("POST", url, json={"response": response, "completed": completed})
+
+
+class ActionItems(_ScheduledContent):
+    segment = "action-item"
+    model = ActionItem
+
+
+class PrepareContents(_ScheduledContent):
+    segment = "prepare-content"
+    model = PrepareContent
+
+
+class Letters(Resource):
+    def save_template(self, assessment_id, number_of_days: int, reason_for_joining: str, users_wish: str):
+        body = {
+            "number_of_days": number_of_days,
+            "reason_for_joining": reason_for_joining,
+            "users_wish": users_wish,
+        }
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/letter/template", json=body,
+                          model=LetterTemplate)
+
+    def template(self, assessment_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/letter/template", model=LetterTemplate)
+
+    def page(self, assessment_id, page: int = 1, size: int = 10):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/letters",
+                          params={"page_number": page, "page_size": size}, model=Letter, paged=True)
+
+    def iter_all(self, assessment_id, size: int | None = None):
+        """Stream every letter of the assessment across pages, using the tuned page size by default"""
+        return self._paginate(lambda n, s: self.page(assessment_id, n, s), size or page_size("letters"))
+
+    def notify(self, assessment_id, employee_ids):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/letter/notify",
+                          json={"employee_ids": list(employee_ids)})
+
+    def export(self, assessment_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/letter/export", raw=True)
+
+    def submit(self, assessment_id, employee_id, content: dict):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/employee/{employee_id}/letter",
+                          json={"content": content})
+
+    def get(self, assessment_id, employee_id):
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/employee/{employee_id}/letter",
+                          model=Letter)
+
+
+class OnboardingResource(Resource):
+    def save(self, assessment_id, program_name: str, services, number_of_days: int):
+        body = {
+            "program_name": program_name,
+            "service_personalization": [
+                {"service": service, "position": i} for i, service in enumerate(services)
+            ],
+            "number_of_days": number_of_days,
+        }
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/onboarding/home", json=body)
+
+    def get(self, assessment_id, employee_id=None):
+        params = {"employee_id": employee_id} if employee_id else None
+        return self._call("GET", f"{V1}/assessment/{assessment_id}/onboarding/home",
+                          params=params, model=Onboarding)
+
+    def send_email(self, assessment_id):
+        return self._call("POST", f"{V1}/assessment/{assessment_id}/onboarding/email")
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+def _decode(payload, model, many, paged):
+    """Unwrap the {"data": ...} envelope and build models; the hot path of every call"""
+    data = payload["data"] if isinstance(payload, dict) and "data" in payload else payload
+    if model is None:
+        return data
+    if paged:
+        items = [model.from_json(d) for d in data]
+        return Page(items, payload.get("current_page"), payload.get("total_pages"), payload.get("total"))
+    if many:
+        return [model.from_json(d) for d in data]
+    return model.from_json(data)
+
+
+class Acceler8:
+    """
+    Synchronous SDK over the shared pooled ApiClient
+    Every resource call goes through _call, so decoding and error handling live in one place
+    """
+
+    def __init__(self, client=api, headers=ORG_HEADERS):
+        self.client = client
+        self.headers = headers
+        self.organisations = Organisations(self)
+        self.assessments = Assessments(self)
+        self.employees = Employees(self)
+        self.questions = Questions(self)
+        self.action_items = ActionItems(self)
+        self.prepare_contents = PrepareContents(self)
+        self.letters = Letters(self)
+        self.onboarding = OnboardingResource(self)
+
+    _paginate = staticmethod(iter_items)
+
+    def _headers(self, json_body: bool) -> dict | None:
+        if json_body or self.headers is None:
+            return self.headers
+        # Let requests/httpx set the multipart Content-Type
+        return {"Authorization": self.headers["Authorization"]}
+
+    def _call(self, method, path, *, expect=200, model=None, many=False, paged=False,
+              raw=False, json_body=True, **kwargs):
+        r = self.client.request(method, path, headers=self._headers(json_body), **kwargs)
+        return self._result(method, path, r, expect, model, many, paged, raw)
+
+    @staticmethod
+    def _result(method, path, r, expect, model, many, paged, raw):
+        if r.status_code not in (expect if isinstance(expect, tuple) else (expect,)):
+            raise ApiError(method, path, r.status_code, r.text)
+        if raw:
+            return r.content
+        if not r.content:
+            return None
+        return _decode(_loads(r.content), model, many, paged)
+
+
+class AsyncAcceler8(Acceler8):
+    """
+    Async SDK over AsyncApiClient; resource methods return coroutines
+    With headers=None the client resolves org auth off the event loop
+    """
+
+    def __init__(self, client=None, headers=None):
+        if client is None:
+            from async_client import AsyncApiClient
+            client = AsyncApiClient()
+        super().__init__(client, headers)
+
+    _paginate = staticmethod(aiter_items)
+
+    async def _call(self, method, path, *, expect=200, model=None, many=False, paged=False,
+                    raw=False, json_body=True, **kwargs):
+        r = await self.client.request(method, path, headers=self._headers(json_body), **kwargs)
+        return self._result(method, path, r, expect, model, many, paged, raw)
@@ -0,0 +1,147 @@
+"""
+Employee seeding engine
+Creates N synthetic employees through whichever path is faster for the set size:
+concurrent per-row POSTs for small sets, one streamed xlsx upload for large ones
+
+Usage: python seeding.py <assessment_id> <count> [--strategy post|upload|compare]
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import time
+
+from client import api
+from config import org_headers
+from employee_upload import stream_workbook
+from multipart import post_multipart
+from sdk import V1, XLSX_MIME, ApiError, AsyncAcceler8, employee_payload
+
+POST = "post"
+UPLOAD = "upload"
+# Sets at least this large go through the xlsx upload. Set it from the break-even that
+# `seeding.py <assessment_id> <count> --strategy compare` prints for the target backend.
+# Offline against fake_acceler8 that was ~50 rows (400 rows: POST 134 rows/sec, upload 0.37s),
+# but the fake does no upload processing, so the live default stays higher.
+UPLOAD_THRESHOLD = int(os.getenv("ACCELER8_UPLOAD_THRESHOLD", "200"))
+
+
+class SeedResult:
+    """IDs created by one seeding run and its throughput"""
+
+    def __init__(self, strategy: str, ids: list, seconds: float):
+        self.strategy = strategy
+        self.ids = ids
+        self.seconds = seconds
+
+    @property
+    def rows_per_sec(self) -> float:
+        return len(self.ids) / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.strategy}: {len(self.ids)} employees in {self.seconds:.2f}s ({self.rows_per_sec:.1f} rows/sec)"
+
+
+def synthetic_employees(count: int, *, tag: str | None = None):
+    """Generate employee payloads with unique emails; managers are shared per ten employees"""
+    tag = tag or "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    for i in range(count):
+        yield employee_payload(
+            f"seed_{tag}_{i}@example.com", f"Seed Employee {i}",
+            manager_email=f"seed_mgr_{tag}_{i // 10}@example.com",
+            manager_name=f"Seed Manager {i // 10}",
+            position="Analyst",
+            title="Analyst",
+        )
+
+
+def choose_strategy(count: int) -> str:
+    return UPLOAD if count >= UPLOAD_THRESHOLD else POST
+
+
+async def _seed_by_post(sdk, assessment_id, employees) -> list:
+    created = await asyncio.gather(*(sdk.employees.create(assessment_id, e) for e in employees))
+    return [e.id for e in created]
+
+
+def _upload_workbook(sdk, assessment_id, employees):
+    """
+    Stream the employees' upload workbook as a multipart body through the pooled sync client
+    Neither the workbook nor the request body is ever held whole, however many rows there are
+    """
+    headers = sdk.headers if sdk.headers is not None else org_headers(sdk.client.org_id)
+    url = f"{V1}/assessment/{assessment_id}/employee/upload"
+    fields = {"file": ("seed.xlsx", stream_workbook(employees), XLSX_MIME)}
+    r = post_multipart(api, url, fields, headers={"Authorization": headers["Authorization"]})
+    if r.status_code != 200:
+        raise ApiError("POST", url, r.status_code, r.text)
+
+
+async def _seed_by_upload(sdk, assessment_id, employees) -> list:
+    await asyncio.to_thread(_upload_workbook, sdk, assessment_id, employees)
+    # The upload answers with a bare success, so IDs are read back by email
+    wanted = {e["email"]: i for i, e in enumerate(employees)}
+    ids = [None] * len(employees)
+    async for employee in sdk.employees.iter_all(assessment_id):
+        index = wanted.get(employee.email)
+        if index is not None:
+            ids[index] = employee.id
+    missing = [employees[i]["email"] for i, eid in enumerate(ids) if eid is None]
+    if missing:
+        raise RuntimeError(f"{len(missing)} uploaded employees not found, e.g. {missing[0]}")
+    return ids
+
+
+async def seed(assessment_id, employees, *, strategy: str | None = None, sdk=None) -> SeedResult:
+    """
+    Create employees in an assessment and return their IDs in input order
+    employees is a count or an iterable of employee payloads
+    """
+    if isinstance(employees, int):
+        employees = synthetic_employees(employees)
+    employees = list(employees)
+    strategy = strategy or choose_strategy(len(employees))
+    own_sdk = sdk is None
+    sdk = sdk or AsyncAcceler8()
+    start = time.perf_counter()
+    try:
+        if strategy == UPLOAD:
+            ids = await _seed_by_upload(sdk, assessment_id, employees)
+        else:
+            ids = await _seed_by_post(sdk, assessment_id, employees)
+    finally:
+        if own_sdk:
+            await sdk.client.aclose()
+    return SeedResult(strategy, ids, time.perf_counter() - start)
+
+
+def break_even(post: SeedResult, upload: SeedResult) -> int:
+    """Rows the POST path creates in the time one upload takes; smaller sets are faster by POST"""
+    return round(upload.seconds * post.rows_per_sec)
+
+
+def seed_employees(assessment_id, employees, **kwargs) -> SeedResult:
+    """Synchronous entry point for seed"""
+    return asyncio.run(seed(assessment_id, employees, **kwargs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("assessment_id")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--strategy", choices=(POST, UPLOAD, "compare"))
+    args = parser.parse_args(argv)
+
+    strategies = (POST, UPLOAD) if args.strategy == "compare" else (args.strategy,)
+    results = {}
+    for strategy in strategies:
+        results[strategy] = seed_employees(args.assessment_id, args.count, strategy=strategy)
+        print(results[strategy])
+    if args.strategy == "compare":
+        print(f"Break-even: ~{break_even(results[POST], results[UPLOAD])} rows "
+              f"(ACCELER8_UPLOAD_THRESHOLD, currently {UPLOAD_THRESHOLD})")
+
+
+if __name__ == "__main__":
+    main()
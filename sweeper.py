@@ -0,0 +1,92 @@
+"""
+Orphan sweeper for resources leaked by killed test runs
+Reads the journals of runs that are no longer alive and deletes whatever they created
+but never deleted: organisations, assessments, employees, content and Mail.tm accounts.
+Deletes run concurrently, children first, under a shared rate limit.
+
+Usage: python sweeper.py [--dry-run] [--rate 5] [--concurrency 8]
+"""
+import argparse
+import os
+
+import journal
+from cleanup import MAIL_ACCOUNT, CleanupGraph
+from client import MAILTM_API, mail
+
+RATE = 5.0  # Deletes per second across all workers
+CONCURRENCY = 8
+
+
+def _delete_mail_account(entry: dict):
+    """Log in with the journaled credentials and delete the account"""
+
+    def delete(account_id):
+        r = mail.post(f"{MAILTM_API}/token", json={"address": entry["address"], "password": entry["password"]})
+        if r.status_code == 401:
+            return  # Account already gone
+        r.raise_for_status()
+        r = mail.delete(f"{MAILTM_API}/accounts/{account_id}",
+                        headers={"Authorization": f"Bearer {r.json()['token']}"})
+        if r.status_code not in (204, 404):
+            r.raise_for_status()
+
+    return delete
+
+
+def sweep(directory: str = journal.JOURNAL_DIR, *, rate: float = RATE, concurrency: int = CONCURRENCY,
+          dry_run: bool = False):
+    """Delete leftovers of dead runs and return the cleanup report, or the leftovers on a dry run"""
+    graph = CleanupGraph(concurrency=concurrency, rate=rate, journal=None)
+    claimed = {}  # journal path -> (fd, keys it still lists)
+    leftovers = []
+    try:
+        for path, fd in journal.claim_dead(directory):
+            header, entries = journal.read(path)
+            if header.get("host") != journal.API_HOST:
+                os.close(fd)
+                continue
+            claimed[path] = (fd, {(e["kind"], e["id"]) for e in entries})
+            for entry in entries:
+                leftovers.append(entry)
+                if not dry_run:
+                    graph.add(
+                        entry["kind"], entry["id"],
+                        parent=tuple(entry["parent"]) if entry.get("parent") else None,
+                        org=entry.get("org"),
+                        delete=_delete_mail_account(entry) if entry["kind"] == MAIL_ACCOUNT else None,
+                    )
+        if dry_run:
+            return leftovers
+
+        report = graph.run()
+        gone = {node.key for node in report.gone}
+        for path, (fd, keys) in claimed.items():
+            for kind, resource_id in keys & gone:
+                journal.write_entry(fd, {"event": journal.DELETED, "kind": kind, "id": resource_id})
+            if keys <= gone:
+                os.remove(path)
+        return report
+    finally:
+        for fd, _ in claimed.values():
+            os.close(fd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", default=journal.JOURNAL_DIR, help="Journal directory")
+    parser.add_argument("--rate", type=float, default=RATE, help="Deletes per second")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Deletes in flight")
+    parser.add_argument("--dry-run", action="store_true", help="List leaked resources without deleting them")
+    args = parser.parse_args(argv)
+
+    result = sweep(args.dir, rate=args.rate, concurrency=args.concurrency, dry_run=args.dry_run)
+    if args.dry_run:
+        for entry in result:
+            print(f"{entry['kind']} {entry['id']} (org {entry.get('org')})")
+        print(f"{len(result)} leaked resources")
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,31 @@
 Action items tests
 Tests task assignments with quizzes and email notifications
 """
-import requests
+import itertools
 import pytest
-import time
 import random
 import string
-import io 
-from openpyxl import load_workbook
 from config import API_HOST, ORG_HEADERS as HEADERS, RAPIDAPI_KEY
+from cleanup import ACTION_ITEM, ASSESSMENT, EMPLOYEE
+from client import MAILTM_API, api, mail
+from consistency import wait_until
+from export_diff import ExportTable
+from inbox import wait_for_message
+from warmup import warm_fixture
+from sdk import content_payload
+from xlsx_stream import XlsxExport
 
 ASSESS_URL      = f"{API_HOST}/backend/v1/assessment"
 ASSESS_LIST_URL = f"{API_HOST}/backend/v1/assessments"
+# List tests assert on what exists when they run, so fixtures are not created ahead of time
+pytestmark = pytest.mark.no_warmup
 INBOXES_API = "https://inboxes-com.p.rapidapi.com"
-MAILTM_API = "https://api.mail.tm"
 
 
 INBOXES_API_TOKEN = RAPIDAPI_KEY
 
-@pytest.fixture(scope="module")
-def created_organisation():
-    """Create a test organization for action item tests"""
-    body = {
-        "internal_name": "PranavAutoOrg",
-        "name": "Pranav Org",
-        "colour_theme": "DRIVEN_RED",
-        "logo": "comet.jpg"
-    }
-    url = f"{API_HOST}/backend/v1/organisation"
-    r = requests.post(url, json=body, headers=HEADERS)
-    assert r.status_code == 200, r.text
-    oid = r.json()["data"]["id"]
-    yield oid
-    # Cleanup: delete organization after tests
-    requests.delete(f"{url}/{oid}", headers=HEADERS)
-
-@pytest.fixture(scope="module")
-def created_assessment():
+@warm_fixture
+def created_assessment(cleanup):
     """Create a test assessment for action item tests"""
     body = {
         "capabilities":    ["TECHNICAL SKILLS 1"],
@@ -46,17 +35,15 @@ def created_assessment():
         "assessment_type": "EMPLOYEE"
     }
 
-    r = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    r = api.post(ASSESS_URL, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     aid = r.json()["data"]["id"]
     print(aid)  # Debug: print assessment ID
-    yield aid
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
+    yield cleanup.add(ASSESSMENT, aid)
 
 
-@pytest.fixture(scope="module")
-def created_employee(created_assessment, mailtm_account):
+@warm_fixture
+def created_employee(created_assessment, mailtm_account, cleanup):
     """Create a test employee with email account for notifications"""
     email = mailtm_account["address"]
 
@@ -84,60 +71,26 @@ def created_employee(created_assessment, mailtm_account):
     }
 
     url = f"{API_HOST}/backend/v1/assessment/{created_assessment}/employee"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 201, r.text
     emp_id = r.json()["data"]["id"]
 
     print(emp_id)  # Debug: print employee ID
-    yield emp_id
-
-    # Cleanup: delete employee after tests
-    requests.delete(f"{API_HOST}/backend/v1/employee/{emp_id}", headers=HEADERS)
+    yield cleanup.add(EMPLOYEE, emp_id, parent=(ASSESSMENT, created_assessment))
 
 
-@pytest.fixture(scope="module")
-def created_action_item(created_assessment, created_organisation, created_employee):
+@warm_fixture
+def created_action_item(created_assessment, created_organisation, created_employee, cleanup):
     """Create a test action item with quiz"""
     base         = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     create_url   = f"{base}/action-item"
 
-    body = {
-        "title": "A",
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": ""
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-10",
-        "send_time": "12:34:46",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [
-            {
-                "id": 0,
-                "type": "SUBJECTIVE",
-                "question": "Question",
-                "options": [],
-                "submitted": False,
-                "correct_options": [],
-                "correct_options_count": 0
-            }
-        ],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": created_organisation
-    }
+    body = content_payload("A", organisation_id=created_organisation, quizzes=["Question"])
 
-    r = requests.post(create_url, json=body, headers=HEADERS)
+    r = api.post(create_url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     action_id = r.json()["data"]["id"]
-    yield action_id
-    # Cleanup: delete action item after tests
-    requests.delete(f"{create_url}/{action_id}", headers=HEADERS)
+    yield cleanup.add(ACTION_ITEM, action_id, parent=(ASSESSMENT, created_assessment))
 
 
 def test_get_action_item_details(created_assessment, created_action_item):
@@ -146,7 +99,7 @@ def test_get_action_item_details(created_assessment, created_action_item):
         f"{API_HOST}/backend/v1/assessment/"
         f"{created_assessment}/action-item/{created_action_item}"
     )
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200
     data = r.json()["data"]
     assert data["id"] == created_action_item
@@ -158,42 +111,13 @@ def test_update_action_item(created_assessment, created_action_item, created_org
     base       = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     update_url = f"{base}/action-item/{created_action_item}"
 
-    body = {
-        "title": "B",  # Updated title
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": ""
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-10",
-        "send_time": "12:34:46",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [
-            {
-                "id": 0,
-                "type": "SUBJECTIVE",
-                "question": "Question",
-                "options": [],
-                "submitted": False,
-                "correct_options": [],
-                "correct_options_count": 0
-            }
-        ],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": created_organisation
-    }
+    body = content_payload("B", organisation_id=created_organisation, quizzes=["Question"])  # Updated title
 
-    r = requests.put(update_url, json=body, headers=HEADERS)
+    r = api.put(update_url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
 
     # Verify the update worked
-    r2 = requests.get(update_url, headers=HEADERS)
+    r2 = api.get(update_url, headers=HEADERS)
     assert r2.status_code == 200
     assert r2.json()["data"]["title"] == "B"
 
@@ -205,7 +129,7 @@ def test_list_action_items(created_assessment, created_action_item):
         f"{created_assessment}/action-items"
         "?page_number=1&page_size=1"
     )
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200
     page = r.json()
     items = page["data"]
@@ -218,84 +142,20 @@ def test_delete_action_item(created_assessment, created_organisation):
     create_url = f"{base}/action-item"
 
     # Create a temporary action item to delete
-    body = {
-        "title": "To delete",
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": ""
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-10",
-        "send_time": "12:34:46",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": created_organisation
-    }
-    r0 = requests.post(create_url, json=body, headers=HEADERS)
+    body = content_payload("To delete", organisation_id=created_organisation)
+    r0 = api.post(create_url, json=body, headers=HEADERS)
     assert r0.status_code == 200, r0.text
     did = r0.json()["data"]["id"]
 
     # Delete the action item
-    r1 = requests.delete(f"{create_url}/{did}", headers=HEADERS)
+    r1 = api.delete(f"{create_url}/{did}", headers=HEADERS)
     assert r1.status_code in (200, 204)
 
     # Verify it's gone
-    r2 = requests.get(f"{create_url}/{did}", headers=HEADERS)
+    r2 = api.get(f"{create_url}/{did}", headers=HEADERS)
     assert r2.status_code in (403, 404)
 
 
-@pytest.fixture(scope="module")
-def mailtm_account():
-    """Create a temporary email account for testing notifications"""
-    r = requests.get(f"{MAILTM_API}/domains")
-    assert r.status_code == 200, r.text
-    domains = r.json()["hydra:member"]
-    assert domains, "No Mail.tm domains available"
-    domain = domains[0]["domain"]
-
-    # Generate random email and password
-    local = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    address = f"{local}@{domain}"
-    password = "".join(random.choices(string.ascii_letters + string.digits, k=12))
-
-    # Create account
-    r = requests.post(
-        f"{MAILTM_API}/accounts",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 201, r.text
-    account_id = r.json()["id"]
-
-    # Get auth token
-    r = requests.post(
-        f"{MAILTM_API}/token",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 200, r.text
-    token = r.json()["token"]
-
-    print(address)  # Debug: print email address
-
-    yield {
-        "address": address,
-        "password": password,
-        "token": token,
-        "account_id": account_id
-    }
-
-    # Cleanup: delete email account after tests
-    requests.delete(
-        f"{MAILTM_API}/accounts/{account_id}",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-
 
 def test_send_reminder_and_check_inbox(
     created_assessment,
@@ -308,27 +168,19 @@ def test_send_reminder_and_check_inbox(
         f"{API_HOST}/backend/v1/assessment/"
         f"{created_assessment}/action-item/{created_action_item}/send-reminder"
     )
-    r = requests.post(send_url,
+    r = api.post(send_url,
                       json={"employee_ids": [created_employee]},
                       headers=HEADERS)
     assert r.status_code == 200, r.text
 
     # Check email inbox for the reminder
     headers = {"Authorization": f"Bearer {mailtm_account['token']}"}
-    messages = []
-    for _ in range(60):  # Wait up to 60 seconds for email
-        r = requests.get(f"{MAILTM_API}/messages", headers=headers)
-        assert r.status_code in (200, 201), r.text
-        messages = r.json()["hydra:member"]
-        if messages:
-            break
-        time.sleep(1)
-
-    assert messages, "No messages received in Mail.tm inbox"
+    message = wait_for_message(mailtm_account)  # Up to 60 seconds
+    assert message, "No messages received in Mail.tm inbox"
 
     # Get message details
-    msg_id = messages[0]["id"]
-    r = requests.get(f"{MAILTM_API}/messages/{msg_id}", headers=headers)
+    msg_id = message["id"]
+    r = mail.get(f"{MAILTM_API}/messages/{msg_id}", headers=headers)
     assert r.status_code == 200, r.text
     msg = r.json()
 
@@ -341,28 +193,26 @@ def test_download_action_item_responses(created_assessment, created_action_item)
         f"{API_HOST}/backend/v1/assessment/"
         f"{created_assessment}/action-item/{created_action_item}/responses/export"
     )
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS, stream=True)
     assert r.status_code == 200, r.text
 
     # Parse Excel file
-    wb = load_workbook(io.BytesIO(r.content), read_only=True, data_only=True)
-    ws = wb.active
+    with XlsxExport(r) as ws:
+        assert ws.title == "B"  # Updated title from test
 
-    assert ws.title == "B"  # Updated title from test
+        rows = ws.rows()
 
-    # Check headers
-    headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-    assert headers == ["SN", "Employee Name", "Completed", "Q1: Question"]
+        # Check headers
+        headers = next(rows)
+        assert list(headers) == ["SN", "Employee Name", "Completed", "Q1: Question"]
 
-    # Find employee row
-    found = None
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[1] == "E1":
-            found = row
-            break
+        # The export has no email column, so rows are keyed by name; a repeated name fails the diff
+        table = ExportTable.from_rows(itertools.chain([headers], rows), key="Employee Name")
 
-    assert found is not None, "Row for employee 'E1' not found in export"
-    assert found[2] in ("Yes", "No")  # Completion status
+    assert not table.duplicates, f"Employee names repeated in export: {table.duplicates}"
+    position = table.index.get("E1")
+    assert position is not None, "Row for employee 'E1' not found in export"
+    assert table.columns["Completed"][position] in ("Yes", "No")  # Completion status
 
 def test_employee_can_view_and_submit_action_item(created_assessment, created_action_item, created_employee):
     """Test employee workflow: view and submit action item"""
@@ -370,14 +220,14 @@ def test_employee_can_view_and_submit_action_item(created_assessment, created_ac
 
     # List action items for employee
     list_url = f"{base_url}/action-items"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     assert r_list.status_code == 200
     action_item_ids = [item['id'] for item in r_list.json()['data']]
     assert created_action_item in action_item_ids
 
     # Get action item details
     details_url = f"{base_url}/action-item/{created_action_item}"
-    r_details = requests.get(details_url, headers=HEADERS)
+    r_details = api.get(details_url, headers=HEADERS)
     assert r_details.status_code == 200
     assert r_details.json()['data']['id'] == created_action_item
 
@@ -395,13 +245,13 @@ def test_employee_can_view_and_submit_action_item(created_assessment, created_ac
     }
     
     submit_url = f"{details_url}/submit"
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     
     assert r_submit.status_code == 200, r_submit.text
 
 
-@pytest.fixture(scope="module")
-def action_item_with_varied_statuses(created_assessment, created_organisation):
+@warm_fixture
+def action_item_with_varied_statuses(created_assessment, created_organisation, cleanup):
     """Create action item with employees in different completion statuses"""
     # Create the Action Item
     create_url = f"{ASSESS_URL}/{created_assessment}/action-item"
@@ -415,9 +265,9 @@ def action_item_with_varied_statuses(created_assessment, created_organisation):
         "organisation_id": created_organisation,
         "quizzes": [{"id": "0", "type": "SUBJECTIVE", "question": "Status Q?"}]
     }
-    r_ai = requests.post(create_url, json=action_item_body, headers=HEADERS)
+    r_ai = api.post(create_url, json=action_item_body, headers=HEADERS)
     assert r_ai.status_code == 200, f"Failed to create action item: {r_ai.text}"
-    action_item_id = r_ai.json()["data"]["id"]
+    action_item_id = cleanup.add(ACTION_ITEM, r_ai.json()["data"]["id"], parent=(ASSESSMENT, created_assessment))
 
     # Create two employees with different statuses
     employees = {}
@@ -428,9 +278,10 @@ def action_item_with_varied_statuses(created_assessment, created_organisation):
             "name": f"Employee {status}",
             "manager": {"email": f"ai_mgr_{rand_suffix}@example.com", "name": "AI Manager"}
         }
-        r_emp = requests.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
+        r_emp = api.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
         assert r_emp.status_code == 201, f"Failed to create employee: {r_emp.text}"
-        employees[status] = {"id": r_emp.json()["data"]["id"], "name": emp_body["name"]}
+        emp_id = cleanup.add(EMPLOYEE, r_emp.json()["data"]["id"], parent=(ASSESSMENT, created_assessment))
+        employees[status] = {"id": emp_id, "name": emp_body["name"]}
     
     # Submit response for one employee only
     done_employee_id = employees["DONE"]["id"]
@@ -439,10 +290,20 @@ def action_item_with_varied_statuses(created_assessment, created_organisation):
         "response": [{"quiz_id": "0", "answer": "Done"}],
         "completed": True
     }
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     assert r_submit.status_code == 200, f"Failed to submit response: {r_submit.text}"
 
-    time.sleep(1)  # Wait for status updates
+    # Wait for the submission to mark the employee completed
+    details_url = f"{ASSESS_URL}/{created_assessment}/action-item/{action_item_id}"
+    completed = wait_until(
+        lambda: api.get(details_url, headers=HEADERS),
+        lambda r: r.status_code == 200 and any(
+            recipient["id"] == done_employee_id and recipient.get("is_completed")
+            for recipient in r.json()["data"].get("recipients", [])
+        ),
+        label="action item completion",
+    )
+    assert completed, "Action item completion status did not update"
 
     yield {"assessment_id": created_assessment, "action_item_id": action_item_id, "employees": employees}
 
@@ -456,7 +317,7 @@ def test_admin_can_see_action_item_status(action_item_with_varied_statuses):
     not_done_employee_id = employees["NOT_DONE"]["id"]
     
     details_url = f"{ASSESS_URL}/{assessment_id}/action-item/{action_item_id}"
-    r_details = requests.get(details_url, headers=HEADERS)
+    r_details = api.get(details_url, headers=HEADERS)
     assert r_details.status_code == 200
     
     action_item_data = r_details.json()["data"]
@@ -2,17 +2,21 @@
 Assessment management tests
 Tests CRUD operations for assessments
 """
-import requests
 import pytest
 import json
 
 from config import API_HOST, ORG_HEADERS as HEADERS
+from cleanup import ASSESSMENT
+from client import api
+from warmup import warm_fixture
 
 ASSESS_URL = f"{API_HOST}/backend/v1/assessment"
 ASSESS_LIST_URL = f"{API_HOST}/backend/v1/assessments"
+# List tests assert on what exists when they run, so fixtures are not created ahead of time
+pytestmark = pytest.mark.no_warmup
 
-@pytest.fixture(scope="module")
-def created_assessment():
+@warm_fixture
+def created_assessment(cleanup):
     """Create a test assessment and clean up after tests"""
     body = {
         "capabilities":     ["TECHNICAL SKILLS 1"],
@@ -20,19 +24,15 @@ def created_assessment():
         "show_onboarding":  False,
         "assessment_type":  "EMPLOYEE"
     }
-    response = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    response = api.post(ASSESS_URL, json=body, headers=HEADERS)
     assert response.status_code == 200, f"POST failed: {response.text}"
     aid = response.json()["data"]["id"]
-    yield aid
-
-    # Cleanup: delete assessment after tests
-    dr = requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
-    assert dr.status_code == 204
+    yield cleanup.add(ASSESSMENT, aid)
 
 
 def test_get_assessment_details(created_assessment):
     """Test retrieving assessment details"""
-    response = requests.get(f"{ASSESS_URL}/{created_assessment}", headers=HEADERS)
+    response = api.get(f"{ASSESS_URL}/{created_assessment}", headers=HEADERS)
     assert response.status_code == 200
     data = response.json()["data"]
     assert data["id"] == created_assessment
@@ -41,17 +41,17 @@ def test_get_assessment_details(created_assessment):
 def test_update_assessment(created_assessment):
     """Test updating assessment information"""
     upd = {"name": "Pranav test updated"}
-    response1 = requests.put(f"{ASSESS_URL}/{created_assessment}", json=upd, headers=HEADERS)
+    response1 = api.put(f"{ASSESS_URL}/{created_assessment}", json=upd, headers=HEADERS)
     assert response1.status_code == 200
 
     # Verify the update worked
-    response2 = requests.get(f"{ASSESS_URL}/{created_assessment}", headers=HEADERS)
+    response2 = api.get(f"{ASSESS_URL}/{created_assessment}", headers=HEADERS)
     assert response2.json()["data"]["name"] == "Pranav test updated"
 
 
 def test_list_assessments(created_assessment):
     """Test listing all assessments"""
-    response = requests.get(ASSESS_LIST_URL, headers=HEADERS)
+    response = api.get(ASSESS_LIST_URL, headers=HEADERS)
     assert response.status_code == 200
     ids = [item["id"] for item in response.json()["data"]]
     assert created_assessment in ids
@@ -65,16 +65,16 @@ def test_delete_assessment():
         "show_onboarding":  False,
         "assessment_type":  "EMPLOYEE"
     }
-    response0 = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    response0 = api.post(ASSESS_URL, json=body, headers=HEADERS)
     assert response0.status_code == 200
     aid = response0.json()["data"]["id"]
 
     # Delete the assessment
-    response1 = requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
+    response1 = api.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
     assert response1.status_code == 204
 
     # Verify it's gone
-    response2 = requests.get(f"{ASSESS_URL}/{aid}", headers=HEADERS)
+    response2 = api.get(f"{ASSESS_URL}/{aid}", headers=HEADERS)
     assert response2.status_code in (404, 403)
 
 def test_create_assessment_with_missing_name():
@@ -85,13 +85,13 @@ def test_create_assessment_with_missing_name():
         "show_onboarding":  False,
         "assessment_type":  "EMPLOYEE"
     }
-    response = requests.post(ASSESS_URL, json=invalid_body, headers=HEADERS)
+    response = api.post(ASSESS_URL, json=invalid_body, headers=HEADERS)
     assert response.status_code == 400
 
 def test_get_assessment_summary(created_assessment):
     """Test getting assessment summary statistics"""
     summary_url = f"{ASSESS_URL}/{created_assessment}/summary"
-    response = requests.get(summary_url, headers=HEADERS)
+    response = api.get(summary_url, headers=HEADERS)
     
     assert response.status_code == 200, response.text
     
@@ -2,42 +2,29 @@
 Employee management tests
 Tests employee lifecycle, file uploads, and assessment workflows
 """
-import requests
 import pytest
 import random
 import string
-import io
 import os
-import time
 import zipfile
 from config import API_HOST, ORG_HEADERS as HEADERS
+from cleanup import ASSESSMENT, EMPLOYEE, ORGANISATION, QUESTION
+from client import api
+from consistency import wait_until
+from employee_upload import stream_workbook
+from multipart import post_multipart
+from sdk import XLSX_MIME, Acceler8
+from warmup import warm_fixture
 from openpyxl import load_workbook
-from openpyxl import Workbook
 
 
 BASE_URL = f"{API_HOST}/backend/v1"
+EMPLOYEES = Acceler8().employees
+# List tests assert on what exists when they run, so fixtures are not created ahead of time
+pytestmark = pytest.mark.no_warmup
 
-@pytest.fixture(scope="module")
-def created_organisation():
-    """Create a test organization for employee tests"""
-    body = {
-        "internal_name": f"TestAutoOrg{''.join(random.choices(string.digits, k=4))}",
-        "name": "Test Employee Org",
-        "colour_theme": "DRIVEN_RED",
-        "logo": "comet.jpg"
-    }
-    url = f"{BASE_URL}/organisation"
-    r = requests.post(url, json=body, headers=HEADERS)
-    assert r.status_code == 200, r.text
-    oid = r.json()["data"]["id"]
-    
-    yield oid
-    
-    # Cleanup: delete organization after tests
-    requests.delete(f"{url}/{oid}", headers=HEADERS)
-
-@pytest.fixture(scope="module")
-def created_assessment(created_organisation):
+@warm_fixture
+def created_assessment(created_organisation, cleanup):
     """Create a test assessment for employee tests"""
     body = {
         "organisation_id": created_organisation,
@@ -47,17 +34,14 @@ def created_assessment(created_organisation):
         "assessment_type": "EMPLOYEE"
     }
     url = f"{BASE_URL}/assessment"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     aid = r.json()["data"]["id"]
     
-    yield aid
-    
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{url}/{aid}", headers=HEADERS)
+    yield cleanup.add(ASSESSMENT, aid, parent=(ORGANISATION, created_organisation))
 
-@pytest.fixture(scope="module")
-def created_employee(created_assessment):
+@warm_fixture
+def created_employee(created_assessment, cleanup):
     """Create a test employee with manager for testing"""
     rand_suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
     employee_email = f"emp+{rand_suffix}@example.com"
@@ -74,11 +58,11 @@ def created_employee(created_assessment):
     }
     
     url = f"{BASE_URL}/assessment/{created_assessment}/employee"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 201, r.text
     
     data = r.json()["data"]
-    employee_id = data["id"]
+    employee_id = cleanup.add(EMPLOYEE, data["id"], parent=(ASSESSMENT, created_assessment))
     employee_code = data["employee_code"]
     manager_id = data["manager"]["id"]
     
@@ -87,9 +71,6 @@ def created_employee(created_assessment):
         "employee_code": employee_code,
         "manager_id": manager_id
     }
-    
-    # Cleanup: delete employee after tests
-    requests.delete(f"{BASE_URL}/employee/{employee_id}", headers=HEADERS)
 
 def test_upload_employee_assessment_file(created_assessment):
     """Test uploading employee data via Excel file"""
@@ -99,8 +80,8 @@ def test_upload_employee_assessment_file(created_assessment):
         pytest.fail(f"The required test file was not found at: {file_path}")
 
     with open(file_path, "rb") as excel_file:
-        files = {
-            'file': (os.path.basename(file_path), excel_file, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        fields = {
+            'file': (os.path.basename(file_path), excel_file, XLSX_MIME)
         }
         
         upload_headers = {
@@ -108,15 +89,40 @@ def test_upload_employee_assessment_file(created_assessment):
         }
         
         url = f"{BASE_URL}/assessment/{created_assessment}/employee/upload"
-        r = requests.post(url, headers=upload_headers, files=files)
+        r = post_multipart(api, url, fields, headers=upload_headers)
     
     assert r.status_code == 200, r.text
     assert r.json()["message"] == "success"
 
-def test_get_assessment_employees_pagination(created_assessment, created_employee):
+@warm_fixture
+def paginated_assessment(created_organisation, cleanup):
+    """Assessment with one employee, so page 1 holds it whatever order the list uses"""
+    body = {
+        "organisation_id": created_organisation,
+        "capabilities": ["TECHNICAL SKILLS 1"],
+        "name": "Employee Pagination Test Assessment",
+        "show_onboarding": False,
+        "assessment_type": "EMPLOYEE"
+    }
+    r = api.post(f"{BASE_URL}/assessment", json=body, headers=HEADERS)
+    assert r.status_code == 200, r.text
+    assessment_id = cleanup.add(ASSESSMENT, r.json()["data"]["id"], parent=(ORGANISATION, created_organisation))
+
+    rand_suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    body = {
+        "email": f"page_emp+{rand_suffix}@example.com", "name": "Pagination Employee",
+        "manager": {"email": f"page_mgr+{rand_suffix}@example.com", "name": "Pagination Manager"}
+    }
+    r = api.post(f"{BASE_URL}/assessment/{assessment_id}/employee", json=body, headers=HEADERS)
+    assert r.status_code == 201, r.text
+    employee_id = cleanup.add(EMPLOYEE, r.json()["data"]["id"], parent=(ASSESSMENT, assessment_id))
+
+    yield {"assessment_id": assessment_id, "employee_id": employee_id}
+
+def test_get_assessment_employees_pagination(paginated_assessment):
     """Test paginated employee listing for assessment"""
-    url = f"{BASE_URL}/assessment/{created_assessment}/employees?page=1&size=10"
-    r = requests.get(url, headers=HEADERS)
+    url = f"{BASE_URL}/assessment/{paginated_assessment['assessment_id']}/employees?page=1&size=10"
+    r = api.get(url, headers=HEADERS)
     
     assert r.status_code == 200, r.text
     page = r.json()
@@ -124,7 +130,7 @@ def test_get_assessment_employees_pagination(created_assessment, created_employe
     assert page["current_page"] == 1
     
     employee_ids = [emp["id"] for emp in page["data"]]
-    assert created_employee["employee_id"] in employee_ids
+    assert paginated_assessment["employee_id"] in employee_ids
 
 def test_update_assessment_employee(created_assessment, created_employee):
     """Test updating employee information"""
@@ -136,11 +142,11 @@ def test_update_assessment_employee(created_assessment, created_employee):
         "position": "Senior Analyst",
     }
     
-    r_put = requests.put(url, json=update_body, headers=HEADERS)
+    r_put = api.put(url, json=update_body, headers=HEADERS)
     assert r_put.status_code == 200, r_put.text
     
     # Verify the update worked
-    r_get = requests.get(f"{BASE_URL}/employee/{employee_id}", headers=HEADERS)
+    r_get = api.get(f"{BASE_URL}/employee/{employee_id}", headers=HEADERS)
     assert r_get.status_code == 200, r_get.text
     
     updated_data = r_get.json()["data"]
@@ -151,7 +157,7 @@ def test_get_employee_by_code(created_assessment, created_employee):
     """Test finding employee by unique code"""
     employee_code = created_employee["employee_code"]
     url = f"{BASE_URL}/assessment/{created_assessment}/employee/by_code?code={employee_code}"
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     
     assert r.status_code == 200, r.text
     data = r.json()["data"]
@@ -162,7 +168,7 @@ def test_get_employee_by_id(created_employee):
     """Test retrieving employee by ID"""
     employee_id = created_employee["employee_id"]
     url = f"{BASE_URL}/employee/{employee_id}"
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     
     assert r.status_code == 200, r.text
     assert r.json()["data"]["id"] == employee_id
@@ -172,7 +178,7 @@ def test_verify_employee_assessment(created_assessment, created_employee):
     employee_id = created_employee["employee_id"]
     url = f"{BASE_URL}/assessment/{created_assessment}/employee/{employee_id}/verify"
     
-    r = requests.post(url, headers={})
+    r = api.post(url, headers={})
     
     assert r.status_code == 200, r.text
     assert r.json()["message"] == "success"
@@ -181,7 +187,7 @@ def test_get_employee_assessments(created_employee, created_assessment):
     """Test getting all assessments for an employee"""
     employee_id = created_employee["employee_id"]
     url = f"{BASE_URL}/employee/{employee_id}/assessments"
-    r = requests.get(url, headers={})
+    r = api.get(url, headers={})
     
     assert r.status_code == 200, r.text
     page = r.json()
@@ -193,7 +199,7 @@ def test_get_manager_subordinates(created_assessment, created_employee):
     """Test getting manager's subordinate employees"""
     manager_id = created_employee["manager_id"]
     url = f"{BASE_URL}/assessment/{created_assessment}/manager/{manager_id}/subordinates"
-    r = requests.get(url, headers={})
+    r = api.get(url, headers={})
     
     assert r.status_code == 200, r.text
     data = r.json()["data"]
@@ -212,7 +218,7 @@ def test_export_employee_data(created_assessment):
         "select_all": True
     }
     
-    r = requests.post(url, json=export_body, headers=HEADERS)
+    r = api.post(url, json=export_body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     # Verify file download headers
@@ -228,17 +234,24 @@ def test_notify_employee(created_assessment, created_employee):
         "employee_ids": [created_employee["employee_id"]]
     }
     
-    r = requests.post(url, json=notify_body, headers=HEADERS)
+    r = api.post(url, json=notify_body, headers=HEADERS)
     assert r.status_code == 200, r.text
     assert r.json()["message"] == "success"
 
 
-import time
-
-@pytest.fixture(scope="module")
-def assessment_with_varied_statuses(created_assessment):
+@warm_fixture
+def assessment_with_varied_statuses(created_organisation, cleanup):
     """Create assessment with employees in different completion statuses"""
-    assessment_id = created_assessment
+    body = {
+        "organisation_id": created_organisation,
+        "capabilities": ["TECHNICAL SKILLS 1"],
+        "name": "Employee Status Test Assessment",
+        "show_onboarding": False,
+        "assessment_type": "EMPLOYEE"
+    }
+    r = api.post(f"{BASE_URL}/assessment", json=body, headers=HEADERS)
+    assert r.status_code == 200, r.text
+    assessment_id = cleanup.add(ASSESSMENT, r.json()["data"]["id"], parent=(ORGANISATION, created_organisation))
     employee_ids = {}
 
     # Create employees with different statuses
@@ -249,8 +262,8 @@ def assessment_with_varied_statuses(created_assessment):
             "manager": {"email": f"status_mgr_{rand_suffix}@example.com", "name": "Status Manager"}
         }
         url = f"{BASE_URL}/assessment/{assessment_id}/employee"
-        r = requests.post(url, json=body, headers=HEADERS)
-        employee_ids[status] = r.json()["data"]["id"]
+        r = api.post(url, json=body, headers=HEADERS)
+        employee_ids[status] = cleanup.add(EMPLOYEE, r.json()["data"]["id"], parent=(ASSESSMENT, assessment_id))
     
     # Create a test question
     q_url = f"{BASE_URL}/assessment/{assessment_id}/question"
@@ -260,9 +273,9 @@ def assessment_with_varied_statuses(created_assessment):
         "question": "What is the status?", "options": [{"value": "A", "input_required": False}],
         "ranking": [1], "sl_no": 1, "manager_question": None, "manager_question_type": None
     }
-    r_q = requests.post(q_url, json=q_body, headers=HEADERS)
+    r_q = api.post(q_url, json=q_body, headers=HEADERS)
     assert r_q.status_code == 200, f"Failed to create question: {r_q.text}"
-    question_id = r_q.json()["id"]
+    question_id = cleanup.add(QUESTION, r_q.json()["id"], parent=(ASSESSMENT, assessment_id))
 
     # Submit response for one employee
     submit_url = f"{API_HOST}/backend/v1/employee/{employee_ids['COMPLETED']}/assessment/{assessment_id}/response"
@@ -270,21 +283,27 @@ def assessment_with_varied_statuses(created_assessment):
         "responses": [{"question_id": question_id, "options": [{"option": "A"}]}],
         "status": "SUBMITTED", "assessment_type": "EMPLOYEE"
     }
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     assert r_submit.status_code == 200, f"Failed to submit response: {r_submit.text}"
     
     # Publish results
     publish_url = f"{BASE_URL}/assessment/{assessment_id}/result/visibility"
     publish_body = {"result_visibility": "MANAGER_AND_EMPLOYEE"}
-    r_publish = requests.put(publish_url, json=publish_body, headers=HEADERS)
+    r_publish = api.put(publish_url, json=publish_body, headers=HEADERS)
     assert r_publish.status_code == 200, f"Failed to publish result: {r_publish.text}"
 
     # Verify the completed employee
     verify_url = f"{BASE_URL}/assessment/{assessment_id}/employee/{employee_ids['COMPLETED']}/verify"
-    r_verify = requests.post(verify_url, headers=HEADERS) 
+    r_verify = api.post(verify_url, headers=HEADERS) 
     assert r_verify.status_code == 200, f"Failed to verify employee: {r_verify.text}"
 
-    time.sleep(2)  # Wait for status updates
+    # Wait for the verified status to show up in the employee list
+    verified = wait_until(
+        lambda: {emp.id: emp.status for emp in EMPLOYEES.iter_all(assessment_id)},
+        lambda statuses: statuses.get(employee_ids["COMPLETED"]) == "PROFILE_VERIFIED",
+        label="employee status",
+    )
+    assert verified, "Employee status did not update"
     
     yield {"assessment_id": assessment_id, "employee_ids": employee_ids}
 
@@ -292,13 +311,7 @@ def test_admin_can_see_employee_status(assessment_with_varied_statuses):
     """Test that admin can see different employee statuses"""
     assessment_id = assessment_with_varied_statuses["assessment_id"]
     
-    url = f"{BASE_URL}/assessment/{assessment_id}/employees?page=1&size=10"
-    r = requests.get(url, headers=HEADERS)
-    assert r.status_code == 200, r.text
-    
-    employees_data = r.json()["data"]
-    
-    statuses = {emp['id']: emp['status'] for emp in employees_data}
+    statuses = {emp.id: emp.status for emp in EMPLOYEES.iter_all(assessment_id)}
     
     # Check that employees have correct statuses
     assert statuses.get(assessment_with_varied_statuses["employee_ids"]["CREATED"]) == "CREATED"
@@ -313,13 +326,13 @@ def test_notify_multiple_employees(created_assessment, created_employee):
         "manager": {"email": f"multi_mgr_{rand_suffix}@example.com", "name": "Multi Manager"}
     }
     url = f"{BASE_URL}/assessment/{created_assessment}/employee"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     second_employee_id = r.json()["data"]["id"]
     
     # Send notification to both employees
     url = f"{BASE_URL}/assessment/{created_assessment}/employee/share-link"
     notify_body = {"employee_ids": [created_employee["employee_id"], second_employee_id]}
-    r_notify = requests.post(url, json=notify_body, headers=HEADERS)
+    r_notify = api.post(url, json=notify_body, headers=HEADERS)
     assert r_notify.status_code == 200, r_notify.text
     assert r_notify.json()["message"] == "success"
 
@@ -328,7 +341,7 @@ def test_admin_can_copy_assessment_link(created_assessment, created_employee):
     assessment_id = created_assessment
     employee_id = created_employee["employee_id"]
     url = f"{BASE_URL}/assessment/{assessment_id}/employee/{employee_id}/result/link"
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200, r.text
     data = r.json()["data"]
     assert "link" in data
@@ -341,65 +354,25 @@ def test_update_employee_via_excel_upload(created_assessment, created_employee):
     
     # Get current employee data
     emp_details_url = f"{BASE_URL}/employee/{employee_id}"
-    r_emp = requests.get(emp_details_url, headers=HEADERS)
+    r_emp = api.get(emp_details_url, headers=HEADERS)
     assert r_emp.status_code == 200
     employee_data = r_emp.json()["data"]
     employee_email = employee_data["email"]
     manager_email = employee_data["manager"]["email"] 
 
-    # Create Excel file with proper template structure
-    wb = Workbook()
-    ws = wb.active
-
-    # Merge cells for headers
-    ws.merge_cells('H1:I1')
-    ws.merge_cells('M1:R1')
-    ws.merge_cells('S1:T1')
-    ws.merge_cells('V1:W1')
-
-    # First header row
-    header_row_1 = [
-        "SN", "Name", "Email", "Country Code", "Phone Number", "Position", "Title",
-        "Span of Control", None, "Join Date", "Tenure", "Years to Retirement",
-        "Direct Reporting Manager", None, None, None, None, None,
-        "Performance", None, "Voice of", "Team Attrition", None, "Voice of"
-    ]
-    ws.append(header_row_1)
-
-    # Second header row
-    header_row_2 = [
-        None, None, None, None, None, None, None,
-        "Number of Direct Reports", "Number of Indirect Reports", None, None, None,
-        "Name", "Position", "Title", "Email", "Country Code", "Phone Number",
-        "2022", "2023", None, "2023", "2024", None
-    ]
-    ws.append(header_row_2)
-
-    # Data row with updated name
-    update_data_row = [
-        1, "Updated Name", employee_email, None, None, None, None, None, None,
-        None, None, None, 
-        "Test Manager M1", 
-        None, None, 
-        manager_email, 
-        None, None, None, None, None, None, None, None
-    ]
-    ws.append(update_data_row)
-    
-    # Save to memory stream
-    file_stream = io.BytesIO()
-    wb.save(file_stream)
-    file_stream.seek(0)
-    
+    # Stream the upload template with one row updating the employee's name
+    update = {"name": "Updated Name", "email": employee_email,
+              "manager": {"name": "Test Manager M1", "email": manager_email}}
+    fields = {"file": ("update.xlsx", stream_workbook([update]), XLSX_MIME)}
+
     # Upload the file
-    files = {'file': ('update.xlsx', file_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')}
     upload_headers = {"Authorization": HEADERS["Authorization"]}
     upload_url = f"{BASE_URL}/assessment/{created_assessment}/employee/upload"
-    r_upload = requests.post(upload_url, headers=upload_headers, files=files)
+    r_upload = post_multipart(api, upload_url, fields, headers=upload_headers)
     assert r_upload.status_code == 200, f"Upload failed: {r_upload.text}"
 
     # Verify the update worked
-    r_verify = requests.get(emp_details_url, headers=HEADERS)
+    r_verify = api.get(emp_details_url, headers=HEADERS)
     assert r_verify.status_code == 200
     updated_name = r_verify.json()["data"]["name"]
     assert updated_name == "Updated Name"
\ No newline at end of file
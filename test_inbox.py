@@ -0,0 +1,40 @@
+"""
+Inbox dispatcher tests
+Run against the Mail.tm stand-in (MAILTM_FAKE=1 or ACCELER8_FAKE=1); skipped otherwise
+"""
+import uuid
+
+from client import MAILTM_API, mail
+from fake_mailtm import DOMAIN, PAGE_SIZE
+from inbox import InboxDispatcher
+
+
+def _account(fake_mailtm) -> dict:
+    """A fresh inbox on the stand-in, shaped like a mailtm_account fixture value"""
+    address = f"dispatch-{uuid.uuid4().hex[:8]}@{DOMAIN}"
+    mailbox = fake_mailtm.create_account(address, "secret")
+    r = mail.post(f"{MAILTM_API}/token", json={"address": address, "password": "secret"})
+    assert r.status_code == 200, r.text
+    return {"address": address, "password": "secret", "account_id": mailbox.id, "token": r.json()["token"]}
+
+
+def test_dispatcher_awaits_several_recipients_past_the_first_page(fake_mailtm):
+    """Each inbox's awaited email is found even when newer mail pushes it off the first page"""
+    accounts = [_account(fake_mailtm) for _ in range(3)]
+    for account in accounts:
+        fake_mailtm.deliver(account["address"], "Your assessment is ready")
+        for i in range(PAGE_SIZE + 5):
+            fake_mailtm.deliver(account["address"], f"Digest {i}")
+
+    dispatcher = InboxDispatcher(interval=0.05)
+    try:
+        for account in accounts:
+            dispatcher.register(account)
+        futures = [dispatcher.expect(account["address"], "assessment is ready") for account in accounts]
+        messages = [future.result(timeout=10) for future in futures]
+    finally:
+        dispatcher.close()
+
+    for account, message in zip(accounts, messages):
+        assert message["to"][0]["address"] == account["address"]
+        assert message["subject"] == "Your assessment is ready"
@@ -2,40 +2,22 @@
 Letter tests
 Tests "letter to yourself" functionality and email notifications
 """
-import requests
 import pytest
-import time
 import random
-import string
-import io
 import json
-from openpyxl import load_workbook
 from config import API_HOST, ORG_HEADERS as HEADERS, RAPIDAPI_KEY
+from cleanup import ASSESSMENT, EMPLOYEE
+from client import MAILTM_API, api, mail
+from export_diff import diff_export
+from inbox import wait_for_message
+from warmup import warm_fixture
+from xlsx_stream import XlsxExport
 
 LETTER_TEMPLATE_URL = f"{API_HOST}/backend/v1/assessment"
-MAILTM_API = "https://api.mail.tm"
 
 
-@pytest.fixture(scope="module")
-def created_organisation():
-    """Create an organization for letter tests"""
-    body = {
-        "internal_name": "LetterTestOrg",
-        "name": "Letter Test Organization",
-        "colour_theme": "DRIVEN_RED",
-        "logo": "comet.jpg"
-    }
-    url = f"{API_HOST}/backend/v1/organisation"
-    r = requests.post(url, json=body, headers=HEADERS)
-    assert r.status_code == 200, r.text
-    oid = r.json()["data"]["id"]
-    yield oid
-    # Cleanup: delete organization after tests
-    requests.delete(f"{url}/{oid}", headers=HEADERS)
-
-
-@pytest.fixture(scope="module")
-def created_assessment():
+@warm_fixture
+def created_assessment(cleanup):
     """Create an assessment for letter tests"""
     body = {
         "capabilities": ["TECHNICAL SKILLS 1"],
@@ -44,61 +26,15 @@ def created_assessment():
         "assessment_type": "EMPLOYEE"
     }
     url = f"{API_HOST}/backend/v1/assessment"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     aid = r.json()["data"]["id"]
-    yield aid
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{url}/{aid}", headers=HEADERS)
-
+    yield cleanup.add(ASSESSMENT, aid)
 
-@pytest.fixture(scope="module")
-def mailtm_account():
-    """Create a temporary email account for testing notifications"""
-    r = requests.get(f"{MAILTM_API}/domains")
-    assert r.status_code == 200, r.text
-    domains = r.json()["hydra:member"]
-    assert domains, "No Mail.tm domains available"
-    domain = domains[0]["domain"]
-    
-    # Generate random email and password
-    local = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    address = f"{local}@{domain}"
-    password = "".join(random.choices(string.ascii_letters + string.digits, k=12))
-    
-    # Create account
-    r = requests.post(
-        f"{MAILTM_API}/accounts",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 201, r.text
-    account_id = r.json()["id"]
-    
-    # Get auth token
-    r = requests.post(
-        f"{MAILTM_API}/token",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 200, r.text
-    token = r.json()["token"]
-    
-    
-    yield {
-        "address": address,
-        "password": password,
-        "token": token,
-        "account_id": account_id
-    }
-    
-    # Cleanup: delete email account after tests
-    requests.delete(
-        f"{MAILTM_API}/accounts/{account_id}",
-        headers={"Authorization": f"Bearer {token}"}
-    )
 
 
-@pytest.fixture(scope="module")
-def created_employee(created_assessment, mailtm_account):
+@warm_fixture
+def created_employee(created_assessment, mailtm_account, cleanup):
     """Create an employee for letter tests"""
     email = mailtm_account["address"]
     body = {
@@ -125,17 +61,14 @@ def created_employee(created_assessment, mailtm_account):
     }
     
     url = f"{API_HOST}/backend/v1/assessment/{created_assessment}/employee"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 201, r.text
     emp_id = r.json()["data"]["id"]
     
-    yield emp_id
-    
-    # Cleanup: delete employee after tests
-    requests.delete(f"{API_HOST}/backend/v1/employee/{emp_id}", headers=HEADERS)
+    yield cleanup.add(EMPLOYEE, emp_id, parent=(ASSESSMENT, created_assessment))
 
 
-@pytest.fixture(scope="module")
+@warm_fixture
 def created_letter_template(created_assessment):
     """Create a letter template for testing"""
     body = {
@@ -145,7 +78,7 @@ def created_letter_template(created_assessment):
     }
     
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/template"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     yield created_assessment
@@ -160,7 +93,7 @@ def test_create_letter_template(created_assessment):
     }
     
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/template"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     data = r.json()["data"]
@@ -179,7 +112,7 @@ def test_update_letter_template(created_letter_template):
     
     url = f"{LETTER_TEMPLATE_URL}/{created_letter_template}/letter/template"
     
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     data = r.json()["data"]
@@ -193,7 +126,7 @@ def test_list_letters(created_assessment, created_letter_template):
         "?page_number=1&page_size=1"
     )
     
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     page = r.json()
@@ -215,26 +148,17 @@ def test_send_letter_notification_and_check_inbox(
     }
     
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/notify"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     # Check email inbox for the notification
     headers = {"Authorization": f"Bearer {mailtm_account['token']}"}
-    messages = []
-    
-    for _ in range(60):  # Wait up to 60 seconds for email
-        r = requests.get(f"{MAILTM_API}/messages", headers=headers)
-        assert r.status_code in (200, 201), r.text
-        messages = r.json()["hydra:member"]
-        if messages:
-            break
-        time.sleep(1)
-    
-    assert messages, "No messages received in Mail.tm inbox"
+    message = wait_for_message(mailtm_account)  # Up to 60 seconds
+    assert message, "No messages received in Mail.tm inbox"
     
     # Get message details
-    msg_id = messages[0]["id"]
-    r = requests.get(f"{MAILTM_API}/messages/{msg_id}", headers=headers)
+    msg_id = message["id"]
+    r = mail.get(f"{MAILTM_API}/messages/{msg_id}", headers=headers)
     assert r.status_code == 200, r.text
     
     msg = r.json()
@@ -253,17 +177,13 @@ def test_download_letter_excel(created_assessment, created_letter_template):
     """Test downloading letter responses as Excel file"""
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/export"
     
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS, stream=True)
     assert r.status_code == 200, r.text
     
     # Parse Excel file
-    wb = load_workbook(io.BytesIO(r.content), read_only=True, data_only=True)
-    ws = wb.active
-    
-    assert ws is not None, "No active worksheet found"
-    
-    # Check headers
-    headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
+    with XlsxExport(r) as ws:
+        # Check headers
+        headers = list(next(ws.rows()))
 
     assert len(headers) > 0, "Excel should have at least one column"
     assert headers == ['Employee Name', 'Employee Email', 'Submission Date', 'In the next [input number] days, the one thing that I hope to achieve', 'start', 'stop', 'continue', 'I want to show up as [input reason to join the program] who', 'The moments in my work or life that I want to [input what user wish to be] are', 'sign']
@@ -277,7 +197,7 @@ def test_letter_template_with_special_characters(created_assessment):
     }
     
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/template"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     
     data = r.json()["data"]
@@ -315,7 +235,7 @@ def test_letter_notification_multiple_employees(created_assessment, created_lett
         }
         
         url = f"{API_HOST}/backend/v1/assessment/{created_assessment}/employee"
-        r = requests.post(url, json=body, headers=HEADERS)
+        r = api.post(url, json=body, headers=HEADERS)
         assert r.status_code == 201, r.text
         emp_id = r.json()["data"]["id"]
         employees.append(emp_id)
@@ -326,12 +246,12 @@ def test_letter_notification_multiple_employees(created_assessment, created_lett
     }
     
     url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/notify"
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
         
     # Cleanup: delete test employees
     for emp_id in employees:
-        requests.delete(f"{API_HOST}/backend/v1/employee/{emp_id}", headers=HEADERS)
+        api.delete(f"{API_HOST}/backend/v1/employee/{emp_id}", headers=HEADERS)
 
 
 def test_letter_pagination(created_assessment, created_letter_template):
@@ -342,7 +262,7 @@ def test_letter_pagination(created_assessment, created_letter_template):
             f"?page_number=1&page_size={page_size}"
         )
         
-        r = requests.get(url, headers=HEADERS)
+        r = api.get(url, headers=HEADERS)
         assert r.status_code == 200, r.text
         
         page = r.json()
@@ -357,7 +277,7 @@ def test_employee_can_view_and_submit_letter(created_assessment, created_employe
 
     # Get letter template
     template_url = f"{base_url}/letter/template"
-    r_template = requests.get(template_url, headers=HEADERS)
+    r_template = api.get(template_url, headers=HEADERS)
     assert r_template.status_code == 200
     assert "reason_for_joining" in r_template.json()["data"]
     
@@ -374,12 +294,26 @@ def test_employee_can_view_and_submit_letter(created_assessment, created_employe
             "6": "My Signature"
         }
     }
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     assert r_submit.status_code == 200, r_submit.text
     
     # Verify submission
-    r_verify = requests.get(submit_url, headers=HEADERS)
+    r_verify = api.get(submit_url, headers=HEADERS)
     assert r_verify.status_code == 200
     
     data = r_verify.json()["data"]
-    assert data["letter_submitted"] is True
\ No newline at end of file
+    assert data["letter_submitted"] is True
+
+
+def test_letter_export_lists_submitted_letter(created_assessment, created_employee, mailtm_account):
+    """Test the letter export has the submitted letter on the employee's row, found by email"""
+    url = f"{LETTER_TEMPLATE_URL}/{created_assessment}/letter/export"
+    r = api.get(url, headers=HEADERS, stream=True)
+    assert r.status_code == 200, r.text
+
+    # Only the identity columns are compared; which answer lands in which column is not pinned down
+    expected = [{"Employee Email": mailtm_account["address"], "Employee Name": "Letter Test Employee"}]
+    with XlsxExport(r) as ws:
+        diff = diff_export(ws.rows(), expected, key="Employee Email", allow_extra=True)
+
+    assert not diff, str(diff)
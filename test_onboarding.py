@@ -2,16 +2,18 @@
 Onboarding tests
 Tests employee onboarding configuration and workflows
 """
-import requests
 import pytest
 import random
 import string
 from config import API_HOST, ORG_HEADERS as HEADERS
+from cleanup import ASSESSMENT, EMPLOYEE
+from client import api
+from warmup import warm_fixture
 
 ASSESS_URL = f"{API_HOST}/backend/v1/assessment"
 
-@pytest.fixture(scope="module")
-def created_assessment():
+@warm_fixture
+def created_assessment(cleanup):
     """Create an assessment for onboarding tests"""
     body = {
         "capabilities": ["TECHNICAL SKILLS 1"],
@@ -19,16 +21,14 @@ def created_assessment():
         "show_onboarding": False,
         "assessment_type": "EMPLOYEE"
     }
-    r = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    r = api.post(ASSESS_URL, json=body, headers=HEADERS)
     r.raise_for_status()
     aid = r.json()["data"]["id"]
-    yield aid
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
+    yield cleanup.add(ASSESSMENT, aid)
 
 
-@pytest.fixture(scope="module")
-def created_employee(created_assessment):
+@warm_fixture
+def created_employee(created_assessment, cleanup):
     """Create an employee for onboarding tests"""
     rand_id = "".join(random.choices(string.ascii_lowercase, k=5))
     create_url = f"{ASSESS_URL}/{created_assessment}/employee"
@@ -37,13 +37,10 @@ def created_employee(created_assessment):
         "name": "Onboarding Employee",
         "manager": {"email": f"onboarding_mgr_{rand_id}@example.com", "name": "Onboarding Manager"}
     }
-    r = requests.post(create_url, json=body, headers=HEADERS)
+    r = api.post(create_url, json=body, headers=HEADERS)
     assert r.status_code == 201, r.text
     eid = r.json()["data"]["id"]
-    yield eid
-    # Cleanup: delete employee after tests
-    delete_url = f"{API_HOST}/backend/v1/employee/{eid}"
-    requests.delete(delete_url, headers=HEADERS)
+    yield cleanup.add(EMPLOYEE, eid, parent=(ASSESSMENT, created_assessment))
 
 
 def test_setup_and_get_onboarding_data(created_assessment, created_employee):
@@ -60,12 +57,12 @@ def test_setup_and_get_onboarding_data(created_assessment, created_employee):
         ],
         "number_of_days": 103
     }
-    r_setup = requests.post(base_onboarding_url, json=setup_body, headers=HEADERS)
+    r_setup = api.post(base_onboarding_url, json=setup_body, headers=HEADERS)
     assert r_setup.status_code == 200, r_setup.text
 
     # Get onboarding data for specific employee
     get_url = f"{base_onboarding_url}?employee_id={created_employee}"
-    r_get = requests.get(get_url, headers=HEADERS)
+    r_get = api.get(get_url, headers=HEADERS)
     assert r_get.status_code == 200, r_get.text
     
     data = r_get.json()["data"]
@@ -88,11 +85,11 @@ def test_send_onboarding_email(created_assessment):
         ],
         "number_of_days": 10
     }
-    requests.post(setup_url, json=setup_body, headers=HEADERS).raise_for_status()
+    api.post(setup_url, json=setup_body, headers=HEADERS).raise_for_status()
 
     # Send onboarding emails
     email_url = f"{ASSESS_URL}/{created_assessment}/onboarding/email"
-    r_email = requests.post(email_url, headers=HEADERS)
+    r_email = api.post(email_url, headers=HEADERS)
     assert r_email.status_code == 200, r_email.text
 
 
@@ -106,7 +103,7 @@ def test_admin_can_edit_onboarding_content(created_assessment):
         "service_personalization": [{"service": "LETTER_TO_YOURSELF", "position": 0}],
         "number_of_days": 30
     }
-    r_setup = requests.post(onboarding_url, json=setup_body, headers=HEADERS)
+    r_setup = api.post(onboarding_url, json=setup_body, headers=HEADERS)
     assert r_setup.status_code == 200, f"Onboarding setup failed: {r_setup.text}"
 
     # Update configuration
@@ -118,11 +115,11 @@ def test_admin_can_edit_onboarding_content(created_assessment):
         ],
         "number_of_days": 45
     }
-    r_update = requests.post(onboarding_url, json=update_body, headers=HEADERS)
+    r_update = api.post(onboarding_url, json=update_body, headers=HEADERS)
     assert r_update.status_code == 200, f"Onboarding update failed: {r_update.text}"
 
     # Verify the update
-    r_get = requests.get(onboarding_url, headers=HEADERS)
+    r_get = api.get(onboarding_url, headers=HEADERS)
     assert r_get.status_code == 200
     updated_data = r_get.json()["data"]
 
@@ -2,41 +2,34 @@
 Prepare content tests
 Tests pre-assessment learning materials and scheduling
 """
-import requests
+import itertools
 import pytest
-import io
-import time
 import random
 import string
-from openpyxl import load_workbook
 from datetime import datetime, timedelta, timezone
 from config import API_HOST, ORG_HEADERS as HEADERS, RAPIDAPI_KEY
+from cleanup import ASSESSMENT, EMPLOYEE, PREPARE_CONTENT
+from client import MAILTM_API, api, mail
+from consistency import wait_until
+from export_diff import diff_export
+from inbox import wait_for_message
+from warmup import warm_fixture
+from sdk import content_payload
+from xlsx_stream import XlsxExport
 
 ASSESS_URL = f"{API_HOST}/backend/v1/assessment"
+SEND_DATE = "2025-06-11"
+SEND_TIME = "12:54:10"
+# List tests assert on what exists when they run, so fixtures are not created ahead of time
+pytestmark = pytest.mark.no_warmup
+CONTENT_ORG_ID = "4540c249-64bc-4356-b6fc-37ac600d3627"
 INBOXES_API = "https://inboxes-com.p.rapidapi.com"
-MAILTM_API = "https://api.mail.tm"
 
 
 INBOXES_API_TOKEN = RAPIDAPI_KEY
 
-@pytest.fixture(scope="module")
-def created_organisation():
-    """Create an organization for prepare content tests"""
-    body = {
-        "internal_name": f"PrepContentOrg{random.randint(1000,9999)}",
-        "name": "Prepare Content Org",
-        "colour_theme": "DRIVEN_RED"
-    }
-    url = f"{API_HOST}/backend/v1/organisation"
-    r = requests.post(url, json=body, headers=HEADERS)
-    assert r.status_code == 200, r.text
-    oid = r.json()["data"]["id"]
-    yield oid
-    # Cleanup: delete organization after tests
-    requests.delete(f"{url}/{oid}", headers=HEADERS)
-
-@pytest.fixture(scope="module")
-def created_assessment():
+@warm_fixture
+def created_assessment(cleanup):
     """Create an assessment for prepare content tests"""
     body = {
         "capabilities":    ["TECHNICAL SKILLS 1"],
@@ -44,16 +37,14 @@ def created_assessment():
         "show_onboarding": False,
         "assessment_type": "EMPLOYEE"
     }
-    r = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    r = api.post(ASSESS_URL, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     aid = r.json()["data"]["id"]
-    yield aid
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
+    yield cleanup.add(ASSESSMENT, aid)
 
 
-@pytest.fixture(scope="module")
-def created_employee(created_assessment):
+@warm_fixture
+def created_employee(created_assessment, cleanup):
     """Create an employee for prepare content tests"""
     url = f"{API_HOST}/backend/v1/assessment/{created_assessment}/employee"
 
@@ -90,64 +81,33 @@ def created_employee(created_assessment):
         "voice_of_employee_results":    "1"
     }
 
-    r = requests.post(url, json=body, headers=HEADERS)
+    r = api.post(url, json=body, headers=HEADERS)
     assert r.status_code == 201, r.text
     eid = r.json()["data"]["id"]
-    yield eid
-    # Cleanup: delete employee after tests
-    requests.delete(f"{url}/{eid}", headers=HEADERS)
+    yield cleanup.add(EMPLOYEE, eid, parent=(ASSESSMENT, created_assessment))
 
 
-@pytest.fixture(scope="module")
-def created_prepare_content(created_assessment, created_employee):
+@warm_fixture
+def created_prepare_content(created_assessment, created_employee, cleanup):
     """Create a prepare content item for testing"""
     base       = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     create_url = f"{base}/prepare-content"
 
-    body = {
-        "title": "A",
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": "A"
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-11",
-        "send_time": "12:54:10",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [
-            {
-                "id": 0,
-                "type": "SUBJECTIVE",
-                "question": "A",
-                "options": [],
-                "submitted": False,
-                "correct_options": [],
-                "correct_options_count": 0
-            }
-        ],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": "4540c249-64bc-4356-b6fc-37ac600d3627"
-    }
+    body = content_payload(
+        "A", content="A", quizzes=["A"],
+        send_date=SEND_DATE, send_time=SEND_TIME, organisation_id=CONTENT_ORG_ID,
+    )
 
-    r = requests.post(create_url, json=body, headers=HEADERS)
+    r = api.post(create_url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     pc_id = r.json()["data"]["id"]
-    yield pc_id
-
-    # Cleanup: delete prepare content after tests
-    requests.delete(f"{create_url}/{pc_id}", headers=HEADERS)
+    yield cleanup.add(PREPARE_CONTENT, pc_id, parent=(ASSESSMENT, created_assessment))
 
 
 def test_list_prepare_contents(created_assessment, created_prepare_content):
     """Test listing prepare content items"""
     url = f"{API_HOST}/backend/v1/assessment/{created_assessment}/prepare-contents"
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200
     items = r.json()
     ids = [i["id"] for i in items["data"]]
@@ -160,7 +120,7 @@ def test_get_prepare_content_details(created_assessment, created_prepare_content
         f"{API_HOST}/backend/v1/assessment/"
         f"{created_assessment}/prepare-content/{created_prepare_content}"
     )
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS)
     assert r.status_code == 200
     data = r.json()["data"]
     assert data["id"] == created_prepare_content
@@ -172,42 +132,16 @@ def test_update_prepare_content(created_assessment, created_prepare_content):
     base       = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     update_url = f"{base}/prepare-content/{created_prepare_content}"
 
-    body = {
-        "title": "B",  # Updated title
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": "A"
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-11",
-        "send_time": "12:54:10",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [
-            {
-                "id": 0,
-                "type": "SUBJECTIVE",
-                "question": "A",
-                "options": [],
-                "submitted": False,
-                "correct_options": [],
-                "correct_options_count": 0
-            }
-        ],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": "4540c249-64bc-4356-b6fc-37ac600d3627"
-    }
+    body = content_payload(
+        "B", content="A", quizzes=["A"],
+        send_date=SEND_DATE, send_time=SEND_TIME, organisation_id=CONTENT_ORG_ID,
+    )  # Updated title
 
-    r = requests.put(update_url, json=body, headers=HEADERS)
+    r = api.put(update_url, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
 
     # Verify the update worked
-    r2 = requests.get(update_url, headers=HEADERS)
+    r2 = api.get(update_url, headers=HEADERS)
     assert r2.status_code == 200
     assert r2.json()["data"]["title"] == "B"
 
@@ -218,113 +152,54 @@ def test_delete_prepare_content(created_assessment):
     create_url = f"{base}/prepare-content"
 
     # Create a temporary prepare content item
-    body = {
-        "title": "To delete",
-        "embed_items": [
-            {
-                "id": 1,
-                "type": "TEXT",
-                "content": "X"
-            }
-        ],
-        "attachments_title": "",
-        "quiz_title": "",
-        "send_date": "2025-06-11",
-        "send_time": "12:54:10",
-        "timezone": "Asia/Calcutta",
-        "attachments": [],
-        "quizzes": [],
-        "recipient_emails": [],
-        "send_to_all": True,
-        "organisation_id": "4540c249-64bc-4356-b6fc-37ac600d3627"
-    }
+    body = content_payload(
+        "To delete", content="X",
+        send_date=SEND_DATE, send_time=SEND_TIME, organisation_id=CONTENT_ORG_ID,
+    )
 
-    r0 = requests.post(create_url, json=body, headers=HEADERS)
+    r0 = api.post(create_url, json=body, headers=HEADERS)
     assert r0.status_code == 200, r0.text
     pid = r0.json()["data"]["id"]
 
     # Delete the item
-    r1 = requests.delete(f"{create_url}/{pid}", headers=HEADERS)
+    r1 = api.delete(f"{create_url}/{pid}", headers=HEADERS)
     assert r1.status_code in (200, 204)
 
     # Verify it's gone
-    r2 = requests.get(f"{create_url}/{pid}", headers=HEADERS)
+    r2 = api.get(f"{create_url}/{pid}", headers=HEADERS)
     assert r2.status_code in (403, 404)
 
-@pytest.fixture(scope="module")
-def mailtm_account():
-    r = requests.get(f"{MAILTM_API}/domains")
-    assert r.status_code == 200, r.text
-    domains = r.json()["hydra:member"]
-    assert domains, "No Mail.tm domains available"
-    domain = domains[0]["domain"]
-
-    local = "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    address = f"{local}@{domain}"
-    password = "".join(random.choices(string.ascii_letters + string.digits, k=12))
-
-    r = requests.post(
-        f"{MAILTM_API}/accounts",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 201, r.text
-    account_id = r.json()["id"]
-
-    r = requests.post(
-        f"{MAILTM_API}/token",
-        json={"address": address, "password": password}
-    )
-    assert r.status_code == 200, r.text
-    token = r.json()["token"]
-
-    print(address)
-
-    yield {
-        "address": address,
-        "password": password,
-        "token": token,
-        "account_id": account_id
-    }
-
-    requests.delete(
-        f"{MAILTM_API}/accounts/{account_id}",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-
 
 def test_download_action_item_responses(created_assessment, created_prepare_content):
     url = (
         f"{API_HOST}/backend/v1/assessment/"
         f"{created_assessment}/prepare-content/{created_prepare_content}/responses/export"
     )
-    r = requests.get(url, headers=HEADERS)
+    r = api.get(url, headers=HEADERS, stream=True)
     assert r.status_code == 200, r.text
 
-    wb = load_workbook(io.BytesIO(r.content), read_only=True, data_only=True)
-    ws = wb.active
-
-    headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-    assert headers == ['SN', 'Employee Name', 'Completed', 'Q1: A']
+    with XlsxExport(r) as ws:
+        rows = ws.rows()
+        headers = next(rows)
+        assert list(headers) == ['SN', 'Employee Name', 'Completed', 'Q1: A']
 
-    found = None
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[1] == "E1":
-            found = row
-            break
+        # The export has no email column, so rows are keyed by name; a repeated name fails the diff
+        expected = [{"SN": 1, "Employee Name": "E1", "Completed": "No", "Q1: A": ""}]
+        diff = diff_export(itertools.chain([headers], rows), expected, key="Employee Name", allow_extra=True)
 
-    assert found == (1.0, 'E1', 'No', '')
+    assert not diff, str(diff)
 
 def test_employee_can_view_and_submit_prepare_content(created_assessment, created_prepare_content, created_employee):
     base_url = f"{ASSESS_URL}/{created_assessment}/employee/{created_employee}"
 
     list_url = f"{base_url}/prepare-contents"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     assert r_list.status_code == 200
     content_ids = [item['id'] for item in r_list.json()['data']]
     assert created_prepare_content in content_ids
 
     details_url = f"{base_url}/prepare-content/{created_prepare_content}"
-    r_details = requests.get(details_url, headers=HEADERS)
+    r_details = api.get(details_url, headers=HEADERS)
     assert r_details.status_code == 200
     assert r_details.json()['data']['id'] == created_prepare_content
 
@@ -338,7 +213,7 @@ def test_employee_can_view_and_submit_prepare_content(created_assessment, create
         }],
         "completed": True
     }
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     assert r_submit.status_code == 200, r_submit.text
 
 
@@ -359,30 +234,21 @@ def test_send_reminder_and_check_inbox(created_assessment, created_prepare_conte
         }
     }
     
-    r_emp = requests.post(create_emp_url, json=emp_body, headers=HEADERS)
+    r_emp = api.post(create_emp_url, json=emp_body, headers=HEADERS)
     assert r_emp.status_code == 201, r_emp.text # This should now pass
     employee_id = r_emp.json()["data"]["id"]
 
     reminder_url = f"{ASSESS_URL}/{created_assessment}/prepare-content/{created_prepare_content}/send-reminder"
     reminder_body = { "employee_ids": [employee_id] }
-    r_remind = requests.post(reminder_url, json=reminder_body, headers=HEADERS)
+    r_remind = api.post(reminder_url, json=reminder_body, headers=HEADERS)
     assert r_remind.status_code == 200
 
-    headers = {"Authorization": f"Bearer {mailtm_account['token']}"}
-    messages = []
-    for _ in range(60): 
-        r_mail = requests.get(f"{MAILTM_API}/messages", headers=headers)
-        assert r_mail.status_code in (200, 201)
-        messages = r_mail.json()["hydra:member"]
-        if messages:
-            break
-        time.sleep(1)
-
-    assert messages, "Reminder email was not received in the inbox"
+    message = wait_for_message(mailtm_account)
+    assert message, "Reminder email was not received in the inbox"
 
 
-@pytest.fixture(scope="module")
-def prepare_content_with_varied_statuses(created_assessment):
+@warm_fixture
+def prepare_content_with_varied_statuses(created_assessment, cleanup):
     assessment_id = created_assessment
     
     create_url = f"{ASSESS_URL}/{assessment_id}/prepare-content"
@@ -391,9 +257,9 @@ def prepare_content_with_varied_statuses(created_assessment):
         "organisation_id": HEADERS.get("organisation_id"),
         "quizzes": [{"id": 0, "type": "SUBJECTIVE", "question": "Status Q?"}]
     }
-    r_pc = requests.post(create_url, json=pc_body, headers=HEADERS)
+    r_pc = api.post(create_url, json=pc_body, headers=HEADERS)
     assert r_pc.status_code == 200
-    prepare_content_id = r_pc.json()["data"]["id"]
+    prepare_content_id = cleanup.add(PREPARE_CONTENT, r_pc.json()["data"]["id"], parent=(ASSESSMENT, assessment_id))
 
     employees = {}
     for status in ["NOT_DONE", "DONE"]:
@@ -402,26 +268,41 @@ def prepare_content_with_varied_statuses(created_assessment):
             "email": f"pc_status_{status.lower()}_{rand_suffix}@example.com", "name": f"Employee {status}",
             "manager": {"email": f"pc_mgr_{rand_suffix}@example.com", "name": "PC Manager"}
         }
-        r_emp = requests.post(f"{ASSESS_URL}/{assessment_id}/employee", json=emp_body, headers=HEADERS)
+        r_emp = api.post(f"{ASSESS_URL}/{assessment_id}/employee", json=emp_body, headers=HEADERS)
         assert r_emp.status_code == 201
-        employees[status] = {"id": r_emp.json()["data"]["id"], "name": emp_body["name"]}
+        emp_id = cleanup.add(EMPLOYEE, r_emp.json()["data"]["id"], parent=(ASSESSMENT, assessment_id))
+        employees[status] = {"id": emp_id, "name": emp_body["name"]}
 
     done_employee_id = employees["DONE"]["id"]
     submit_url = f"{ASSESS_URL}/{assessment_id}/employee/{done_employee_id}/prepare-content/{prepare_content_id}/submit"
     submit_body = {"response": [{"quiz_id": "0", "answer": "Done"}], "completed": 'true'}
-    r_submit = requests.post(submit_url, json=submit_body, headers=HEADERS)
+    r_submit = api.post(submit_url, json=submit_body, headers=HEADERS)
     assert r_submit.status_code == 200
 
     publish_url = f"{ASSESS_URL}/{assessment_id}/result/visibility"
     publish_body = {"result_visibility": "MANAGER_AND_EMPLOYEE"}
-    r_publish = requests.put(publish_url, json=publish_body, headers=HEADERS)
+    r_publish = api.put(publish_url, json=publish_body, headers=HEADERS)
     assert r_publish.status_code == 200, f"Failed to publish result: {r_publish.text}"
 
     verify_url = f"{ASSESS_URL}/{assessment_id}/employee/{done_employee_id}/verify"
-    r_verify = requests.post(verify_url, headers=HEADERS)
+    r_verify = api.post(verify_url, headers=HEADERS)
     assert r_verify.status_code == 200, f"Failed to verify employee: {r_verify.text}"
 
-    time.sleep(2) 
+    # Wait until the submission is counted and only moves the submitter out of the uncompleted
+    # recipients; an empty or not yet populated list must not pass for a completed state
+    def completed(r):
+        if r.status_code != 200:
+            return False
+        for item in r.json()["data"]:
+            if item.get("title") == "Status Test Content":
+                uncompleted = [rec["id"] for rec in item.get("uncompleted_recipients") or []]
+                return (item.get("completed_count") == 1 and done_employee_id not in uncompleted
+                        and employees["NOT_DONE"]["id"] in uncompleted)
+        return False
+
+    list_url = f"{ASSESS_URL}/{assessment_id}/prepare-contents"
+    assert wait_until(lambda: api.get(list_url, headers=HEADERS), completed, label="prepare content completion"), \
+        "Prepare content completion status did not update"
 
     yield {"assessment_id": assessment_id, "employees": employees}
 
@@ -437,7 +318,7 @@ def test_admin_can_see_prepare_content_status(prepare_content_with_varied_status
     not_done_employee_id = employees["NOT_DONE"]["id"]
     
     list_url = f"{ASSESS_URL}/{assessment_id}/prepare-contents"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     assert r_list.status_code == 200, r_list.text
     
     prepare_content_data = None
@@ -468,26 +349,17 @@ def test_send_prepare_content_reminder_and_check_inbox(created_assessment, creat
         "name": "Reminder Recipient",
         "manager": {"email": "reminder.mgr@example.com", "name": "Reminder Manager"}
     }
-    r_emp = requests.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
+    r_emp = api.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
     assert r_emp.status_code == 201
     employee_id = r_emp.json()["data"]["id"]
 
     reminder_url = f"{ASSESS_URL}/{created_assessment}/prepare-content/{created_prepare_content}/send-reminder"
     reminder_body = {"employee_ids": [employee_id]}
-    r_remind = requests.post(reminder_url, json=reminder_body, headers=HEADERS)
+    r_remind = api.post(reminder_url, json=reminder_body, headers=HEADERS)
     assert r_remind.status_code == 200
 
-    headers = {"Authorization": f"Bearer {mailtm_account['token']}"}
-    messages = []
-    for _ in range(60): 
-        r_mail = requests.get(f"https://api.mail.tm/messages", headers=headers)
-        assert r_mail.status_code in (200, 201)
-        messages = r_mail.json()["hydra:member"]
-        if messages:
-            break
-        time.sleep(1)
-
-    assert messages, "Reminder email was not received in the inbox"
+    message = wait_for_message(mailtm_account)
+    assert message, "Reminder email was not received in the inbox"
 
 
 def test_new_employee_is_assigned_to_existing_content(created_assessment, created_organisation):
@@ -504,7 +376,7 @@ def test_new_employee_is_assigned_to_existing_content(created_assessment, create
         "timezone": "Asia/Calcutta",
         "organisation_id": created_organisation
     }
-    r_pc = requests.post(create_url, json=pc_body, headers=HEADERS)
+    r_pc = api.post(create_url, json=pc_body, headers=HEADERS)
     assert r_pc.status_code == 200, f"Failed to create prepare content: {r_pc.text}"
     prepare_content_id = r_pc.json()["data"]["id"]
 
@@ -513,12 +385,12 @@ def test_new_employee_is_assigned_to_existing_content(created_assessment, create
         "email": f"new_hire_{rand_suffix}@example.com", "name": "New Hire",
         "manager": {"email": f"new_hire_mgr_{rand_suffix}@example.com", "name": "Hiring Manager"}
     }
-    r_emp = requests.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
+    r_emp = api.post(f"{ASSESS_URL}/{created_assessment}/employee", json=emp_body, headers=HEADERS)
     assert r_emp.status_code == 201, f"Failed to create employee: {r_emp.text}"
     employee_id = r_emp.json()["data"]["id"]
 
     list_url = f"{ASSESS_URL}/{created_assessment}/employee/{employee_id}/prepare-contents"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     assert r_list.status_code == 200
     content_ids = [item['id'] for item in r_list.json()['data']]
     assert prepare_content_id in content_ids
@@ -536,7 +408,7 @@ def test_prepare_content_scheduling(created_assessment, created_organisation, cr
         "embed_items": [{"id": 1, "type": "TEXT", "content": ""}],
         "send_time": "12:00:00", "timezone": "Asia/Calcutta"
     }
-    r_past = requests.post(f"{ASSESS_URL}/{created_assessment}/prepare-content", json=past_content_body, headers=HEADERS)
+    r_past = api.post(f"{ASSESS_URL}/{created_assessment}/prepare-content", json=past_content_body, headers=HEADERS)
     assert r_past.status_code == 200, f"Failed to create past content: {r_past.text}"
     past_content_id = r_past.json()["data"]["id"]
 
@@ -547,12 +419,12 @@ def test_prepare_content_scheduling(created_assessment, created_organisation, cr
         "embed_items": [{"id": 1, "type": "TEXT", "content": ""}],
         "send_time": "12:00:00", "timezone": "Asia/Calcutta"
     }
-    r_future = requests.post(f"{ASSESS_URL}/{created_assessment}/prepare-content", json=future_content_body, headers=HEADERS)
+    r_future = api.post(f"{ASSESS_URL}/{created_assessment}/prepare-content", json=future_content_body, headers=HEADERS)
     assert r_future.status_code == 200, f"Failed to create future content: {r_future.text}"
     future_content_id = r_future.json()["data"]["id"]
     
     list_url = f"{ASSESS_URL}/{created_assessment}/employee/{created_employee}/prepare-contents"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     assert r_list.status_code == 200
     visible_content_ids = [item['id'] for item in r_list.json()['data']]
 
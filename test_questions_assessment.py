@@ -2,15 +2,19 @@
 Assessment questions tests
 Tests question management within assessments
 """
-import requests
 import pytest
 from config import API_HOST, ORG_HEADERS as HEADERS
+from cleanup import ASSESSMENT, QUESTION
+from client import api
+from warmup import warm_fixture
 
 ASSESS_URL = f"{API_HOST}/backend/v1/assessment"
 ASSESS_LIST_URL  = f"{API_HOST}/backend/v1/assessments"
+# List tests assert on what exists when they run, so fixtures are not created ahead of time
+pytestmark = pytest.mark.no_warmup
 
-@pytest.fixture(scope="module")
-def created_assessment(): 
+@warm_fixture
+def created_assessment(cleanup):
     """Create a test assessment for question tests"""
     body = {
         "capabilities":    ["TECHNICAL SKILLS 1"],
@@ -18,16 +22,13 @@ def created_assessment():
         "show_onboarding": False,
         "assessment_type": "EMPLOYEE"
     }
-    r = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    r = api.post(ASSESS_URL, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     aid = r.json()["data"]["id"]
-    yield aid
+    yield cleanup.add(ASSESSMENT, aid)
 
-    # Cleanup: delete assessment after tests
-    requests.delete(f"{ASSESS_URL}/{aid}", headers=HEADERS)
-
-@pytest.fixture(scope="module")
-def created_assessment_question(created_assessment):
+@warm_fixture
+def created_assessment_question(created_assessment, cleanup):
     """Create a test question for the assessment"""
     base = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     create_q_url = f"{base}/question"
@@ -55,20 +56,17 @@ def created_assessment_question(created_assessment):
         "manager_ranking":    [4, 3, 2, 1]
     }
 
-    response = requests.post(create_q_url, json=body, headers=HEADERS)
+    response = api.post(create_q_url, json=body, headers=HEADERS)
     assert response.status_code == 200, response.text
     qid = response.json()["id"]
-    yield qid
-
-    # Cleanup: delete question after tests
-    requests.delete(f"{create_q_url}/{qid}", headers=HEADERS)
+    yield cleanup.add(QUESTION, qid, parent=(ASSESSMENT, created_assessment))
 
 def test_list_assessment_questions(created_assessment, created_assessment_question):
     """Test listing all questions for an assessment"""
     base = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     list_url = f"{base}/questions"
 
-    r = requests.get(list_url, headers=HEADERS)
+    r = api.get(list_url, headers=HEADERS)
     assert r.status_code == 200
     questions = r.json()
     assert isinstance(questions, list)
@@ -80,7 +78,7 @@ def test_get_assessment_question_details(created_assessment, created_assessment_
     base = f"{API_HOST}/backend/v1/assessment/{created_assessment}"
     get_url = f"{base}/question/{created_assessment_question}"
 
-    r = requests.get(get_url, headers=HEADERS)
+    r = api.get(get_url, headers=HEADERS)
     assert r.status_code == 200
     q = r.json()
     assert q["id"] == created_assessment_question
@@ -113,16 +111,16 @@ def test_delete_assessment_question(created_assessment):
         ],
         "manager_ranking": [2, 1]
     }
-    r0 = requests.post(create_q_url, json=body, headers=HEADERS)
+    r0 = api.post(create_q_url, json=body, headers=HEADERS)
     assert r0.status_code == 200
     did = r0.json()["id"]
 
     # Delete the question
-    r1 = requests.delete(f"{create_q_url}/{did}", headers=HEADERS)
+    r1 = api.delete(f"{create_q_url}/{did}", headers=HEADERS)
     assert r1.status_code == 204
 
     # Verify it's gone
-    r2 = requests.get(f"{create_q_url}/{did}", headers=HEADERS)
+    r2 = api.get(f"{create_q_url}/{did}", headers=HEADERS)
     assert r2.status_code in (403, 404)
 
 def test_bulk_create_update_and_delete(created_assessment):
@@ -133,7 +131,7 @@ def test_bulk_create_update_and_delete(created_assessment):
     get_q      = lambda qid: f"{create_q}/{qid}"
 
     # Create a question to update
-    resp_u = requests.post(create_q, json={
+    resp_u = api.post(create_q, json={
         "capabilities": "To update",
         "sub_capability": "Subcap",
         "capabilities_label": "To update label",
@@ -150,7 +148,7 @@ def test_bulk_create_update_and_delete(created_assessment):
     q_update_id = resp_u.json()["id"]
 
     # Create a question to delete
-    resp_d = requests.post(create_q, json={
+    resp_d = api.post(create_q, json={
         "capabilities": "To delete",
         "sub_capability": "Subcap",
         "capabilities_label": "To delete label",
@@ -220,7 +218,7 @@ def test_bulk_create_update_and_delete(created_assessment):
         "question_ids_to_delete": [q_delete_id]
     }
 
-    r_bulk = requests.post(bulk_url, json=bulk_body, headers=HEADERS)
+    r_bulk = api.post(bulk_url, json=bulk_body, headers=HEADERS)
     assert r_bulk.status_code == 200, r_bulk.text
 
     # Verify results
@@ -238,7 +236,7 @@ def test_bulk_create_update_and_delete(created_assessment):
     assert created["capabilities"] == "Technical Skills"
 
     # Verify deleted question is gone
-    rd = requests.get(get_q(q_delete_id), headers=HEADERS)
+    rd = api.get(get_q(q_delete_id), headers=HEADERS)
     assert rd.status_code in (403, 404)
 
 def test_create_assessment_fails_with_empty_capabilities():
@@ -250,7 +248,7 @@ def test_create_assessment_fails_with_empty_capabilities():
         "assessment_type": "EMPLOYEE"
     }
     
-    r_create = requests.post(ASSESS_URL, json=body, headers=HEADERS)
+    r_create = api.post(ASSESS_URL, json=body, headers=HEADERS)
     
     assert r_create.status_code == 404
 
@@ -273,12 +271,12 @@ def test_arrange_subcapabilities_sequence(created_assessment):
         "ranking": [1], "sl_no": 2, "capabilities_sl_no": 2, "manager_question_type": "OBJECTIVE_SINGLE",
         "manager_question": "Manager Q2", "manager_options": [{"value": "B", "input_required": False}], "manager_ranking": [1]
     }
-    requests.post(create_q_url, json=q1_body, headers=HEADERS).raise_for_status()
-    requests.post(create_q_url, json=q2_body, headers=HEADERS).raise_for_status()
+    api.post(create_q_url, json=q1_body, headers=HEADERS).raise_for_status()
+    api.post(create_q_url, json=q2_body, headers=HEADERS).raise_for_status()
     
     # Get current order
     list_url = f"{base_url}/questions"
-    r_list = requests.get(list_url, headers=HEADERS)
+    r_list = api.get(list_url, headers=HEADERS)
     r_list.raise_for_status()
     questions = r_list.json()
 
@@ -288,11 +286,11 @@ def test_arrange_subcapabilities_sequence(created_assessment):
     new_sequence_body = list(reversed(all_capabilities))
 
     # Apply new sequence
-    r_arrange = requests.post(arrange_url, json=new_sequence_body, headers=HEADERS)
+    r_arrange = api.post(arrange_url, json=new_sequence_body, headers=HEADERS)
     assert r_arrange.status_code == 200, r_arrange.text
 
     # Verify the new order
-    r_final_list = requests.get(list_url, headers=HEADERS)
+    r_final_list = api.get(list_url, headers=HEADERS)
     final_questions = r_final_list.json()
     final_capabilities_order = list(dict.fromkeys(q['capabilities'] for q in final_questions))
 
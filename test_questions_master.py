@@ -2,11 +2,11 @@
 Master questions tests
 Tests global question bank management
 """
-import requests
 import pytest
 import random
 import string
 from config import API_HOST, ORG_HEADERS as HEADERS
+from client import api
 
 QUESTION_URL = f"{API_HOST}/backend/v1/question"
 
@@ -19,12 +19,12 @@ def created_question_id():
         "type": "OBJECTIVE_SINGLE", "question": "Original Question Text?",
         "options": [{"value": "A", "input_required": False}], "ranking": [1], "sl_no": 1
     }
-    response = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    response = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert response.status_code == 200, f"Fixture setup failed: {response.text}"
     qid = response.json()["id"]
     yield qid
     # Cleanup: delete question after test
-    requests.delete(f"{QUESTION_URL}/{qid}", headers=HEADERS)
+    api.delete(f"{QUESTION_URL}/{qid}", headers=HEADERS)
 
 def test_create_ranking_question():
     """Test creating a ranking type question"""
@@ -34,12 +34,12 @@ def test_create_ranking_question():
         "type": "OBJECTIVE_RANKING", "question": "Please rank these options.",
         "options": [{"value": "Option 1"}, {"value": "Option 2"}], "ranking": [2, 1], "sl_no": 1
     }
-    r = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    r = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert r.status_code == 200, r.text
     data = r.json()
     assert data["type"] == "OBJECTIVE_RANKING"
     # Cleanup
-    requests.delete(f"{QUESTION_URL}/{data['id']}", headers=HEADERS)
+    api.delete(f"{QUESTION_URL}/{data['id']}", headers=HEADERS)
 
 def test_create_and_publish_employee_only_question():
     """Test creating employee-only question and publishing it"""
@@ -50,7 +50,7 @@ def test_create_and_publish_employee_only_question():
         "visibility": ["EMPLOYEE"], "options": [{"value": "OK"}],
         "ranking": [1], "sl_no": 1, "manager_question": None
     }
-    r_create = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    r_create = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert r_create.status_code == 200, r_create.text
     created_question = r_create.json()
     question_id = created_question["id"]
@@ -60,15 +60,15 @@ def test_create_and_publish_employee_only_question():
     created_question["status"] = "PUBLISHED"
     update_body = {"questions_to_update": [created_question]}
     
-    r_update = requests.post(f"{QUESTION_URL}/bulk", json=update_body, headers=HEADERS)
+    r_update = api.post(f"{QUESTION_URL}/bulk", json=update_body, headers=HEADERS)
     assert r_update.status_code == 200, r_update.text
     assert r_update.json()[0]["status"] == "PUBLISHED"
     # Cleanup
-    requests.delete(f"{QUESTION_URL}/{question_id}", headers=HEADERS)
+    api.delete(f"{QUESTION_URL}/{question_id}", headers=HEADERS)
 
 def test_update_question(created_question_id):
     """Test updating an existing question"""
-    r_get = requests.get(f"{QUESTION_URL}/{created_question_id}", headers=HEADERS)
+    r_get = api.get(f"{QUESTION_URL}/{created_question_id}", headers=HEADERS)
     assert r_get.status_code == 200
     original_question = r_get.json()
 
@@ -77,11 +77,11 @@ def test_update_question(created_question_id):
     original_question["sub_capability"] = "Updated Sub-Cap"
     
     update_body = {"questions_to_update": [original_question]}
-    r_update = requests.post(f"{QUESTION_URL}/bulk", json=update_body, headers=HEADERS)
+    r_update = api.post(f"{QUESTION_URL}/bulk", json=update_body, headers=HEADERS)
     assert r_update.status_code == 200, r_update.text
 
     # Verify the update
-    r_get_updated = requests.get(f"{QUESTION_URL}/{created_question_id}", headers=HEADERS)
+    r_get_updated = api.get(f"{QUESTION_URL}/{created_question_id}", headers=HEADERS)
     assert r_get_updated.status_code == 200
     updated_data = r_get_updated.json()
     assert updated_data["question"] == "This is the updated question text."
@@ -94,38 +94,38 @@ def test_create_question_fails_with_manager_only():
         "sub_capability": f"Mgr-Only Sub-Cap {random.randint(100, 999)}", "type": "OBJECTIVE_SINGLE",
         "question": None, "manager_question": "This is a manager-only question."  # No employee question
     }
-    r = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    r = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert r.status_code == 400
 
 def test_create_question_validation_failures():
     """Test various validation failures"""
     # Empty sub-capability should fail
     body_empty_sub_cap = {"capabilities": "Val", "capabilities_label": "Val", "sub_capability": "", "type": "OBJECTIVE_SINGLE", "question": "Q?", "options": [{"value": "A"}], "ranking": [1], "sl_no": 1}
-    r1 = requests.post(QUESTION_URL, json=body_empty_sub_cap, headers=HEADERS)
+    r1 = api.post(QUESTION_URL, json=body_empty_sub_cap, headers=HEADERS)
     assert r1.status_code == 400
 
     # Missing type should fail
     body_no_type = {"capabilities": "Val", "capabilities_label": "Val", "sub_capability": "No Type", "question": "Q?", "options": [{"value": "A"}], "ranking": [1], "sl_no": 1}
-    r2 = requests.post(QUESTION_URL, json=body_no_type, headers=HEADERS)
+    r2 = api.post(QUESTION_URL, json=body_no_type, headers=HEADERS)
     assert r2.status_code == 400
 
     # No options for multiple choice should fail
     body_no_options = {"capabilities": "Val", "capabilities_label": "Val", "sub_capability": "No Options", "type": "OBJECTIVE_MULTIPLE", "question": "Q?", "options": [], "sl_no": 1}
-    r3 = requests.post(QUESTION_URL, json=body_no_options, headers=HEADERS)
+    r3 = api.post(QUESTION_URL, json=body_no_options, headers=HEADERS)
     assert r3.status_code == 500
 
 @pytest.mark.xfail(reason="API currently allows duplicate options, which is a bug.")
 def test_validation_duplicate_options():
     """Test that duplicate options should be rejected"""
     body = {"capabilities": "Val", "capabilities_label": "Val", "sub_capability": "Duplicate Options", "type": "OBJECTIVE_SINGLE", "question": "Q?", "options": [{"value": "A"}, {"value": "A"}], "ranking": [2, 1], "sl_no": 1}
-    r = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    r = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert r.status_code == 400
 
 @pytest.mark.xfail(reason="API currently allows duplicate ranking points, which is a bug.")
 def test_validation_duplicate_ranking_points():
     """Test that duplicate ranking points should be rejected"""
     body = {"capabilities": "Val", "capabilities_label": "Val", "sub_capability": "Duplicate Ranking", "type": "OBJECTIVE_SINGLE", "question": "Q?", "options": [{"value": "A"}, {"value": "B"}], "ranking": [1, 1], "sl_no": 1}
-    r = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+    r = api.post(QUESTION_URL, json=body, headers=HEADERS)
     assert r.status_code == 400
 
 @pytest.mark.xfail(reason="API currently allows duplicate sub-capabilities, which is a bug.")
@@ -136,14 +136,14 @@ def test_create_question_fails_with_duplicate_sub_capability():
     body = {"capabilities": cap, "capabilities_label": "Label", "sub_capability": sub_cap, "type": "OBJECTIVE_SINGLE", "question": "Q1", "options": [{"value": "A"}], "ranking": [1], "sl_no": 1}
     q1_id = None
     try:
-        r1 = requests.post(QUESTION_URL, json=body, headers=HEADERS)
+        r1 = api.post(QUESTION_URL, json=body, headers=HEADERS)
         assert r1.status_code == 200
         q1_id = r1.json()["id"]
         # Try to create another question with same sub-capability
         body2 = {"capabilities": cap, "capabilities_label": "Label", "sub_capability": sub_cap, "type": "OBJECTIVE_SINGLE", "question": "Q2", "options": [{"value": "B"}], "ranking": [1], "sl_no": 2}
-        r2 = requests.post(QUESTION_URL, json=body2, headers=HEADERS)
+        r2 = api.post(QUESTION_URL, json=body2, headers=HEADERS)
         assert r2.status_code == 409
     finally:
         # Cleanup
         if q1_id:
-            requests.delete(f"{QUESTION_URL}/{q1_id}", headers=HEADERS)
\ No newline at end of file
+            api.delete(f"{QUESTION_URL}/{q1_id}", headers=HEADERS)
\ No newline at end of file
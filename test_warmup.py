@@ -0,0 +1,63 @@
+"""
+Fixture warm-up tests
+Exercise the Prefetcher on its own, without any API calls
+"""
+from warmup import Prefetcher
+
+MODULE = "test_warmed_module"
+
+
+def _prefetcher(calls: list) -> Prefetcher:
+    """Prefetcher with an assessment and two fixtures that share the cleanup provider"""
+    prefetcher = Prefetcher()
+    prefetcher.provide("cleanup", lambda: calls.append("cleanup") or "graph")
+
+    def created_assessment(cleanup):
+        calls.append("created_assessment")
+        return "assessment"
+
+    def created_employee(created_assessment, cleanup):
+        calls.append("created_employee")
+        return f"employee of {created_assessment}"
+
+    def created_question(created_assessment, cleanup):
+        calls.append("created_question")
+        yield f"question of {created_assessment}"
+        calls.append("teardown created_question")
+
+    for fn in (created_assessment, created_employee, created_question):
+        prefetcher.register(MODULE, fn.__name__, fn)
+    return prefetcher
+
+
+def test_fixtures_sharing_a_dependency_are_all_warmed():
+    """Every fixture that needs cleanup is warmed, each after the fixtures it depends on"""
+    prefetcher = _prefetcher([])
+    order = prefetcher._order(MODULE, {"created_employee", "created_question"})
+    assert order == ["created_assessment", "created_employee", "created_question"]
+
+
+def test_shared_dependency_is_created_once():
+    """Warming both fixtures creates their common assessment once and hands it to each"""
+    calls = []
+    prefetcher = _prefetcher(calls)
+    prefetcher._start(MODULE, {"created_employee", "created_question"})
+    try:
+        employee, _ = prefetcher.take(MODULE, "created_employee")
+        question, gen = prefetcher.take(MODULE, "created_question")
+    finally:
+        prefetcher.close()
+    assert employee == "employee of assessment"
+    assert question == "question of assessment"
+    assert gen is not None
+    assert calls.count("created_assessment") == 1
+
+
+def test_close_tears_down_fixtures_nobody_took():
+    """A warmed fixture whose module never ran (-x, skips, deselection) is torn down by close()"""
+    calls = []
+    prefetcher = _prefetcher(calls)
+    prefetcher._start(MODULE, {"created_question"})
+    prefetcher.close()
+    assert calls[-1] == "teardown created_question"
+    assert prefetcher.take(MODULE, "created_question") is None
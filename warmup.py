@@ -0,0 +1,180 @@
+"""
+Background warm-up of module fixtures
+Fixtures declared with @warm_fixture are created for upcoming modules while the
+current module's tests run, using the collected test order to know which modules come
+next and which fixtures they request. A fixture that was not warmed, or whose warm-up
+failed, is created (or its error raised) when pytest asks for it, as before.
+Warm fixtures in conftest.py are warmed separately for each module that requests them.
+Modules marked no_warmup (e.g. ones asserting on list contents or order, which depend on
+when their fixtures are created) are skipped. Warmed fixtures nobody took are torn down by close().
+"""
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+LOOKAHEAD = 1  # Modules warmed ahead of the one running
+SHARED = "conftest"  # Registry key for warm fixtures any module can request
+NO_WARMUP = "no_warmup"  # Marker for modules whose fixtures must be created in pytest's order
+
+
+class Prefetcher:
+    """Runs the warm fixtures of upcoming modules on background threads"""
+
+    def __init__(self, lookahead: int = LOOKAHEAD):
+        self.lookahead = lookahead
+        self.enabled = True
+        self._fixtures = {}  # (module, name) -> fixture function
+        self._providers = {}  # name -> callable returning a shared fixture value
+        self._plan = []  # [(module, fixture names)] in run order
+        self._started = {}  # module -> {name: future}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def register(self, module: str, name: str, fn):
+        if module.rpartition(".")[2] == "conftest":
+            module = SHARED
+        self._fixtures[(module, name)] = fn
+
+    def _find(self, module: str, name: str):
+        """The warm fixture a module gets for name; its own definition wins over conftest"""
+        return self._fixtures.get((module, name)) or self._fixtures.get((SHARED, name))
+
+    def provide(self, name: str, value):
+        """Let warm fixtures depend on a shared fixture; value is a zero-argument callable"""
+        self._providers[name] = value
+
+    def plan(self, items):
+        """Record module order and the warm fixtures each module requests"""
+        plan = {}
+        for item in items:
+            module = item.module.__name__
+            names = plan.setdefault(module, set())
+            if item.get_closest_marker(NO_WARMUP) is None:
+                names.update(n for n in getattr(item, "fixturenames", ()) if self._find(module, n))
+        self._plan = list(plan.items())
+
+    def module_started(self, module: str):
+        """Start warming the modules after this one"""
+        if not self.enabled:
+            return
+        positions = [i for i, (m, _) in enumerate(self._plan) if m == module]
+        if not positions:
+            return
+        for upcoming, names in self._plan[positions[0] + 1:positions[0] + 1 + self.lookahead]:
+            self._start(upcoming, names)
+
+    def _start(self, module: str, names):
+        with self._lock:
+            if module in self._started or not names:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.lookahead, thread_name_prefix="warmup")
+            futures = self._started[module] = {}
+            order = self._order(module, names)
+            done = {}
+            # One task per module; fixtures within it run in dependency order
+            task = self._executor.submit(self._warm, module, order, done)
+            for name in order:
+                futures[name] = task
+
+    def _order(self, module: str, names) -> list[str]:
+        """Warmable fixtures of a module in dependency order"""
+        order, warmable = [], {}
+
+        def visit(name):
+            # Remember the answer, not just the visit: a provider such as cleanup is never in
+            # order, so a second fixture depending on it must not read "seen" as "not warmable"
+            if name not in warmable:
+                warmable[name] = False  # Also stops dependency cycles
+                fn = self._find(module, name)
+                if fn is None:
+                    warmable[name] = name in self._providers
+                elif all([visit(arg) for arg in inspect.signature(fn).parameters]):
+                    order.append(name)
+                    warmable[name] = True
+            return warmable[name]
+
+        for name in sorted(names):
+            visit(name)
+        return order
+
+    def _warm(self, module: str, order, done: dict):
+        for name in order:
+            fn = self._find(module, name)
+            kwargs = {}
+            for arg in inspect.signature(fn).parameters:
+                kwargs[arg] = done[arg][0] if arg in done else self._providers[arg]()
+            try:
+                done[name] = _setup(fn, kwargs)
+            except BaseException as exc:
+                done[name] = exc
+                return done
+        return done
+
+    def take(self, module: str, name: str):
+        """Return (value, teardown generator) warmed for a fixture, or None if it was not warmed"""
+        with self._lock:
+            task = self._started.get(module, {}).pop(name, None)
+        if task is None:
+            return None
+        result = task.result().get(name)
+        if result is None:
+            return None  # An earlier fixture in the chain failed; surface it where it belongs
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def close(self):
+        """Wait for warm-ups, then tear down warmed fixtures that were never taken, newest first"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._lock:
+            untaken = [(task, set(futures)) for futures in self._started.values()
+                       for task in {*futures.values()}]
+            self._started = {}
+        for task, names in untaken:
+            for name, result in reversed(list(task.result().items())):
+                if name in names and isinstance(result, tuple) and result[1] is not None:
+                    next(result[1], None)
+
+
+def _setup(fn, kwargs) -> tuple:
+    """Run a fixture up to its yield; returns (value, generator to finish at teardown)"""
+    if inspect.isgeneratorfunction(fn):
+        gen = fn(**kwargs)
+        return next(gen), gen
+    return fn(**kwargs), None
+
+
+prefetcher = Prefetcher()
+
+
+def warm_fixture(fn=None, *, scope: str = "module"):
+    """
+    Declare a module fixture that may be created ahead of time in the background
+    The fixture must only depend on other warm fixtures or on providers registered
+    with prefetcher.provide, and must not rely on test state
+    """
+    if fn is None:
+        return functools.partial(warm_fixture, scope=scope)
+
+    prefetcher.register(fn.__module__, fn.__name__, fn)
+
+    @functools.wraps(fn)
+    def fixture(request, **kwargs):
+        warmed = prefetcher.take(request.module.__name__, fn.__name__)
+        value, gen = warmed if warmed is not None else _setup(fn, kwargs)
+        yield value
+        if gen is not None:
+            next(gen, None)
+
+    # pytest reads the fixture's arguments from its signature; add request to fn's
+    signature = inspect.signature(fn)
+    fixture.__signature__ = signature.replace(parameters=[
+        inspect.Parameter("request", inspect.Parameter.POSITIONAL_OR_KEYWORD),
+        *signature.parameters.values(),
+    ])
+    return pytest.fixture(scope=scope)(fixture)
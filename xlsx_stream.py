@@ -0,0 +1,336 @@
+"""
+Streaming reads and writes of xlsx files
+An export response is spooled to a temporary file in chunks, then its first worksheet
+(or the active one) is parsed row by row with iterparse, clearing each row once yielded,
+so memory stays flat however many rows the export has. Only the shared strings table and
+the cell formats are held in memory.
+stream_xlsx goes the other way: it turns an iterator of rows into xlsx bytes chunk by chunk,
+for request bodies too large to build as an openpyxl Workbook.
+"""
+import io
+import tempfile
+import time
+import zipfile
+from datetime import date, datetime
+from xml.etree.ElementTree import iterparse, parse
+from xml.sax.saxutils import escape
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, get_column_letter, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, to_excel
+
+CHUNK_SIZE = 64 * 1024  # Bytes read from the response at a time
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _tag(name: str) -> str:
+    return f"{{{MAIN_NS}}}{name}"
+
+
+def _text(element) -> str:
+    """Text of a string item: a plain <t>, or the runs of rich text without phonetic hints"""
+    t = element.find(_tag("t"))
+    if t is not None:
+        return t.text or ""
+    return "".join(r.findtext(_tag("t")) or "" for r in element.iter(_tag("r")))
+
+
+def _number(value: str):
+    """Cast a numeric cell the way openpyxl does: int unless it has a decimal point or exponent"""
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def spool(response, chunk_size: int = CHUNK_SIZE):
+    """Copy a streamed response body into a temporary file; returns (file, bytes written)"""
+    file = tempfile.TemporaryFile()
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size):
+            file.write(chunk)
+            size += len(chunk)
+    except BaseException:
+        file.close()
+        raise
+    finally:
+        response.close()
+    file.seek(0)
+    return file, size
+
+
+class XlsxReader:
+    """
+    Row-by-row reader for one worksheet of an xlsx file
+    rows() yields tuples of cell values like openpyxl's iter_rows(values_only=True)
+    """
+
+    def __init__(self, file, sheet: str | None = None):
+        self._zip = zipfile.ZipFile(file)
+        self.epoch = CALENDAR_WINDOWS_1900
+        self.title, self._sheet_path = self._find_sheet(sheet)
+        self._strings = self._read_strings()
+        self._date_styles = self._read_date_styles()
+
+    def _find_sheet(self, name):
+        workbook = self._parse("xl/workbook.xml")
+        properties = workbook.find(_tag("workbookPr"))
+        if properties is not None and properties.get("date1904") in ("1", "true"):
+            self.epoch = CALENDAR_MAC_1904
+        sheets = workbook.find(_tag("sheets")).findall(_tag("sheet"))
+        if name is None:
+            view = workbook.find(f"{_tag('bookViews')}/{_tag('workbookView')}")
+            sheet = sheets[int(view.get("activeTab", 0)) if view is not None else 0]
+        else:
+            sheet = next((s for s in sheets if s.get("name") == name), None)
+            if sheet is None:
+                raise KeyError(f"Worksheet {name} not found")
+
+        rel_id = sheet.get(f"{{{DOC_REL_NS}}}id")
+        rels = self._parse("xl/_rels/workbook.xml.rels")
+        target = next(r.get("Target") for r in rels.iter(f"{{{PKG_REL_NS}}}Relationship") if r.get("Id") == rel_id)
+        path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        return sheet.get("name"), path
+
+    def _parse(self, path: str):
+        """Whole-tree parse, for the small workbook-level parts"""
+        with self._zip.open(path) as f:
+            return parse(f).getroot()
+
+    def _read_strings(self) -> list[str]:
+        if "xl/sharedStrings.xml" not in self._zip.namelist():
+            return []
+        strings = []
+        with self._zip.open("xl/sharedStrings.xml") as f:
+            for _, element in iterparse(f):
+                if element.tag == _tag("si"):
+                    strings.append(_text(element))
+                    element.clear()
+        return strings
+
+    def _read_date_styles(self) -> set[int]:
+        """Indexes of cell formats that display numbers as dates"""
+        if "xl/styles.xml" not in self._zip.namelist():
+            return set()
+        styles = self._parse("xl/styles.xml")
+        formats = dict(BUILTIN_FORMATS)
+        for fmt in styles.iter(_tag("numFmt")):
+            formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+        cell_xfs = styles.find(_tag("cellXfs"))
+        if cell_xfs is None:
+            return set()
+        return {
+            i for i, xf in enumerate(cell_xfs.findall(_tag("xf")))
+            if is_date_format(formats.get(int(xf.get("numFmtId", 0)), "General"))
+        }
+
+    def _value(self, cell):
+        kind = cell.get("t", "n")
+        if kind == "inlineStr":
+            inline = cell.find(_tag("is"))
+            return _text(inline) if inline is not None else None
+        value = cell.findtext(_tag("v"))
+        if value is None:
+            return None
+        if kind == "s":
+            return self._strings[int(value)]
+        if kind == "b":
+            return value == "1"
+        if kind == "d":
+            return datetime.fromisoformat(value)
+        if kind in ("str", "e"):
+            return value
+        number = _number(value)
+        if int(cell.get("s", 0)) in self._date_styles:
+            return from_excel(number, self.epoch)
+        return number
+
+    def rows(self, min_row: int = 1):
+        """
+        Yield rows from min_row on as tuples, padded to the sheet's width
+        Rows missing from the file come back as rows of None, so positions match row numbers
+        """
+        width = 0
+        expected = 1
+        with self._zip.open(self._sheet_path) as f:
+            sheet_data = None
+            for event, element in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if element.tag == _tag("sheetData"):
+                        sheet_data = element
+                    continue
+                if element.tag == _tag("dimension"):
+                    width = range_boundaries(element.get("ref"))[2] or 0
+                elif element.tag == _tag("row"):
+                    number = int(element.get("r", expected))
+                    values = {}
+                    for position, cell in enumerate(element.iter(_tag("c")), 1):
+                        ref = cell.get("r")
+                        column = column_index_from_string(coordinate_from_string(ref)[0]) if ref else position
+                        values[column] = self._value(cell)
+                    sheet_data.clear()  # Drop the parsed row so the tree never grows
+                    width = max(width, *values) if values else width
+                    for _ in range(max(expected, min_row), number):
+                        yield (None,) * width
+                    if number >= min_row:
+                        yield tuple(values.get(column) for column in range(1, width + 1))
+                    expected = number + 1
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XlsxExport(XlsxReader):
+    """
+    XlsxReader over a spooled export response, with download timings
+    Time to first row covers the wait for the response, the download and parsing the first row;
+    the zip directory sits at the end of the file, so no row can be read before the download ends
+    """
+
+    def __init__(self, response, sheet: str | None = None, *, chunk_size: int = CHUNK_SIZE):
+        start = time.perf_counter()
+        self._file, self.bytes = spool(response, chunk_size)
+        self.download_seconds = response.elapsed.total_seconds() + time.perf_counter() - start
+        self._started = start - response.elapsed.total_seconds()
+        self.first_row_seconds = None
+        try:
+            super().__init__(self._file, sheet)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def rows(self, min_row: int = 1):
+        for row in super().rows(min_row):
+            if self.first_row_seconds is None:
+                self.first_row_seconds = time.perf_counter() - self._started
+            yield row
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+CONTENT_TYPES = (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    f'<Relationships xmlns="{PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{DOC_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK_RELS = (
+    f'<Relationships xmlns="{PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{DOC_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{DOC_REL_NS}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Cell formats: 0 General, 1 date, 2 date and time
+STYLES = (
+    f'<styleSheet xmlns="{MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+class _Chunks(io.RawIOBase):
+    """Unseekable sink that collects what zipfile writes until the generator hands it out"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _cell(ref: str, value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    if isinstance(value, (datetime, date)):
+        style = 2 if isinstance(value, datetime) else 1
+        return f'<c r="{ref}" s="{style}"><v>{to_excel(value)!r}</v></c>'
+    text = escape(str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>'
+
+
+def _workbook(title: str) -> str:
+    return (
+        f'<workbook xmlns="{MAIN_NS}" xmlns:r="{DOC_REL_NS}">'
+        '<bookViews><workbookView activeTab="0"/></bookViews>'
+        f'<sheets><sheet name="{escape(title, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def stream_xlsx(rows, *, title: str = "Sheet", merged_cells=(), chunk_size: int = CHUNK_SIZE):
+    """
+    Yield a one-sheet xlsx file as byte chunks, writing rows as they are drawn from the iterator
+    Each row is a sequence of values (None leaves a cell empty, an empty row leaves the row blank);
+    strings are written inline, so nothing grows with the row count except the output
+    """
+    sink = _Chunks()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", CONTENT_TYPES)
+        package.writestr("_rels/.rels", ROOT_RELS)
+        package.writestr("xl/workbook.xml", _workbook(title))
+        package.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        package.writestr("xl/styles.xml", STYLES)
+        yield sink.drain()
+
+        columns = []  # Column letters, extended as wider rows appear
+        with package.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(f'<worksheet xmlns="{MAIN_NS}"><sheetData>'.encode())
+            for number, row in enumerate(rows, start=1):
+                while len(columns) < len(row):
+                    columns.append(get_column_letter(len(columns) + 1))
+                cells = "".join(_cell(f"{column}{number}", value) for column, value in zip(columns, row))
+                sheet.write(f'<row r="{number}">{cells}</row>'.encode())
+                if sink.size >= chunk_size:
+                    yield sink.drain()
+            merges = "".join(f'<mergeCell ref="{ref}"/>' for ref in merged_cells)
+            if merges:
+                merges = f'<mergeCells count="{len(merged_cells)}">{merges}</mergeCells>'
+            sheet.write(f"</sheetData>{merges}</worksheet>".encode())
+    yield sink.drain()